@@ -21,6 +21,8 @@ def create_app():
     from .routes.health_check import health_check_bp
     from .routes.time import time_bp
     from .routes.geotagging import geotagging_bp
+    from .routes.catalog import catalog_bp
+    from .routes.search import search_bp
 
     app.register_blueprint(files_bp, url_prefix="/api")
     app.register_blueprint(keywords_bp, url_prefix="/api")
@@ -32,5 +34,7 @@ def create_app():
     app.register_blueprint(health_check_bp, url_prefix="/api")
     app.register_blueprint(time_bp, url_prefix="/api")
     app.register_blueprint(geotagging_bp, url_prefix="/api")
+    app.register_blueprint(catalog_bp, url_prefix="/api")
+    app.register_blueprint(search_bp, url_prefix="/api")
 
     return app
\ No newline at end of file
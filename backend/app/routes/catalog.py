@@ -0,0 +1,29 @@
+import os
+from flask import Blueprint, request, jsonify
+from app.services.catalog_service import rescan_folder
+from app.services.metadata_catalog import metadata_catalog
+
+catalog_bp = Blueprint("catalog_bp", __name__)
+
+
+@catalog_bp.route("/catalog/rescan", methods=["POST"])
+def rescan():
+    """
+    Updates the metadata catalog for a folder, re-reading only new or changed files.
+    """
+    data = request.get_json()
+    if not data or "folder" not in data:
+        return jsonify({"error": "Folder is required"}), 400
+    folder_path = data["folder"]
+    if not os.path.isdir(folder_path):
+        return jsonify({"error": "Folder not found"}), 404
+    try:
+        return jsonify(rescan_folder(folder_path, bool(data.get("recursive"))))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@catalog_bp.route("/catalog/stats", methods=["GET"])
+def get_catalog_stats():
+    """Returns the size and hit/miss counters of the metadata catalog."""
+    return jsonify(metadata_catalog.stats())
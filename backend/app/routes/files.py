@@ -1,51 +1,214 @@
 import os
+import json
+import queue
+import hashlib
 from io import BytesIO
-from flask import Blueprint, request, jsonify, send_file
-from app.services.exif_service import get_image_data as get_image_data_service
+from datetime import datetime, timezone
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    send_file,
+    stream_with_context,
+)
+from werkzeug.http import is_resource_modified
+from app.services.exif_service import (
+    get_image_data as get_image_data_service,
+    get_original_image_mime,
+)
+from app.services.thumbnail_service import thumbnail_service
+from app.services.prefetch_service import prefetch_service
+from app.services.file_listing_service import list_folder_images
+from app.services.folder_watcher import folder_watcher
+from config import WATCHER_KEEPALIVE_SECONDS
 
 files_bp = Blueprint("files_bp", __name__)
 
 
 @files_bp.route("/images")
 def list_images():
+    """
+    Lists the images of a folder. Without further parameters this returns a plain
+    list of file names. With any of 'sort' (name, mtime, size; 'order=desc' to
+    reverse), 'limit', 'cursor', 'recursive' (with an optional 'maxDepth') or
+    'details', it returns {items: [{name, size, mtime}], nextCursor} instead, where
+    nextCursor fetches the following page.
+    """
     folder_path = request.args.get("folder")
     if not folder_path or not os.path.isdir(folder_path):
         return jsonify({"error": "Folder not found"}), 404
+
+    args = request.args
+    detailed = any(
+        key in args
+        for key in ("sort", "limit", "cursor", "recursive", "maxDepth", "details")
+    )
     try:
-        # We include RAW file extensions so they appear in the frontend gallery.
-        supported = (
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".gif",
-            ".bmp",
-            ".tiff",
-            ".cr2",
-            ".nef",
-            ".arw",
-            ".dng",
-        )
-        return jsonify(
-            [f for f in os.listdir(folder_path) if f.lower().endswith(supported)]
+        limit = int(args["limit"]) if "limit" in args else None
+        max_depth = int(args["maxDepth"]) if "maxDepth" in args else None
+    except ValueError:
+        return jsonify({"error": "limit and maxDepth must be integers"}), 400
+    if (limit is not None and limit < 1) or (max_depth is not None and max_depth < 1):
+        return jsonify({"error": "limit and maxDepth must be positive"}), 400
+    cursor = args.get("cursor")
+    # Pages are only stable in a defined order, so paging implies sorting by name.
+    sort = args.get("sort") or ("name" if limit or cursor else None)
+
+    try:
+        items, next_cursor = list_folder_images(
+            folder_path,
+            sort=sort,
+            descending=args.get("order") == "desc",
+            limit=limit,
+            cursor=cursor,
+            recursive=args.get("recursive", "").lower() in ("1", "true"),
+            max_depth=max_depth,
         )
+        # Start warming caches in gallery order while the client asks for metadata.
+        # Opening the folder (the first page) replaces the previous warm-up; the
+        # following pages are queued behind it.
+        paths = [os.path.join(folder_path, item["name"]) for item in items]
+        if cursor:
+            prefetch_service.extend(paths, folder=folder_path)
+        else:
+            folder_watcher.watch(folder_path)
+            prefetch_service.schedule(paths, folder=folder_path)
+        if detailed:
+            return jsonify({"items": items, "nextCursor": next_cursor})
+        return jsonify([item["name"] for item in items])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@files_bp.route("/events")
+def folder_events():
+    """
+    Server-sent events for the opened folder (or 'folder', if given). Each
+    'changes' event carries a debounced batch of {type, path[, oldPath]} items,
+    where type is added, changed, removed or renamed.
+    """
+    folder_path = request.args.get("folder")
+    if folder_path:
+        if not os.path.isdir(folder_path):
+            return jsonify({"error": "Folder not found"}), 404
+        folder_watcher.watch(folder_path)
+    subscriber = folder_watcher.subscribe()
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    events = subscriber.get(timeout=WATCHER_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    # Comment lines keep proxies and the browser from timing out.
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: changes\ndata: {json.dumps(events)}\n\n"
+        finally:
+            folder_watcher.unsubscribe(subscriber)
+
+    response = Response(stream_with_context(stream()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@files_bp.route("/prefetch", methods=["POST"])
+def prefetch():
+    """
+    Queues metadata and thumbnail warm-up for the given files, visible ones first.
+    Any work still queued from an earlier call or folder listing is dropped.
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get("files"), list):
+        return jsonify({"error": "File list is required"}), 400
+    queued = prefetch_service.schedule(data["files"], folder=data.get("folder"))
+    return jsonify({"queued": queued}), 202
+
+
+@files_bp.route("/prefetch/stats")
+def get_prefetch_stats():
+    """Returns the state of the background warm-up queue."""
+    return jsonify(prefetch_service.stats())
+
+
+def _image_validators(image_path: str, variant: str) -> tuple[str, datetime]:
+    """
+    Builds a strong ETag and Last-Modified value for an image response. The file's
+    size and mtime cover every change to it, including its orientation, and the
+    variant distinguishes the different renderings served for the same file.
+    """
+    stat = os.stat(image_path)
+    key = f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime_ns}|{variant}"
+    etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+    return etag, last_modified
+
+
+def _cached_image_response(path_or_file, mime_type, etag, last_modified):
+    """
+    Sends image data with validators so the browser revalidates instead of
+    downloading again; Werkzeug answers conditional and Range requests.
+    """
+    response = send_file(
+        path_or_file,
+        mimetype=mime_type,
+        conditional=True,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _not_modified_response(etag: str, last_modified: datetime):
+    """Answers a revalidation before any image data is read or rendered."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 @files_bp.route("/image_data")
 def get_image_data():
     image_path = request.args.get("path")
     if not image_path:
         return jsonify({"error": "Image path parameter is required"}), 400
+    if not os.path.isfile(image_path):
+        return jsonify({"error": "Image not found or preview unavailable"}), 404
 
     try:
+        etag, last_modified = _image_validators(image_path, "image_data")
+        not_modified = _not_modified_response(etag, last_modified)
+        if not_modified:
+            return not_modified
+
+        # Files the browser can show as they are stored are streamed from disk,
+        # which also gives byte-range support for large originals.
+        original_mime_type = get_original_image_mime(image_path)
+        if original_mime_type:
+            return _cached_image_response(
+                image_path, original_mime_type, etag, last_modified
+            )
+
         # We delegate the complex logic of fetching image data to the exif_service.
         # This service can handle multiple file types, including extracting
         # previews from RAW files, keeping this route clean and focused.
         image_bytes, mime_type = get_image_data_service(image_path)
 
         if image_bytes and mime_type:
-            return send_file(BytesIO(image_bytes), mimetype=mime_type)
+            return _cached_image_response(
+                BytesIO(image_bytes), mime_type, etag, last_modified
+            )
         else:
             # This case handles when a file does not exist, is an unsupported
             # format, or a preview could not be extracted from a RAW file.
@@ -54,3 +217,39 @@ def get_image_data():
     except Exception as e:
         # A general catch-all for unexpected errors during file processing.
         return jsonify({"error": str(e)}), 500
+
+
+@files_bp.route("/thumbnail")
+def get_thumbnail():
+    image_path = request.args.get("path")
+    if not image_path:
+        return jsonify({"error": "Image path parameter is required"}), 400
+    try:
+        size = int(request.args.get("size", 256))
+    except ValueError:
+        return jsonify({"error": "Size must be an integer"}), 400
+
+    if not os.path.isfile(image_path):
+        return jsonify({"error": "Image not found or preview unavailable"}), 404
+
+    try:
+        size = thumbnail_service.snap_size(size)
+        etag, last_modified = _image_validators(image_path, f"thumbnail:{size}")
+        not_modified = _not_modified_response(etag, last_modified)
+        if not_modified:
+            return not_modified
+
+        thumbnail_bytes = thumbnail_service.get_thumbnail(image_path, size)
+        if thumbnail_bytes:
+            return _cached_image_response(
+                BytesIO(thumbnail_bytes), "image/jpeg", etag, last_modified
+            )
+        return jsonify({"error": "Image not found or preview unavailable"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@files_bp.route("/thumbnail/cache-stats")
+def get_thumbnail_cache_stats():
+    """Returns size and hit/miss/eviction counters of the thumbnail disk cache."""
+    return jsonify(thumbnail_service.stats())
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.services.keyword_service import keyword_service
+from app.services.keyword_hierarchy import KeywordHierarchyError
 
 keywords_bp = Blueprint("keywords_bp", __name__)
 
@@ -49,13 +50,27 @@ def update_keyword(keyword_id):
     if not updates:
         return jsonify({"error": "Invalid request body"}), 400
 
-    updated_keyword = keyword_service.update(keyword_id, updates)
+    try:
+        updated_keyword = keyword_service.update(keyword_id, updates)
+    except KeywordHierarchyError as e:
+        return jsonify({"error": str(e)}), 400
     if updated_keyword:
         return jsonify(updated_keyword)
 
     return jsonify({"error": "Keyword not found"}), 404
 
 
+@keywords_bp.route("/keywords/<string:keyword_id>/descendants", methods=["GET"])
+def get_keyword_descendants(keyword_id):
+    """
+    Get all keywords below a keyword in the hierarchy.
+    """
+    if not keyword_service.find_by_id(keyword_id):
+        return jsonify({"error": "Keyword not found"}), 404
+
+    return jsonify(keyword_service.get_descendants(keyword_id))
+
+
 @keywords_bp.route("/keywords/<string:keyword_id>", methods=["DELETE"])
 def delete_keyword(keyword_id):
     """
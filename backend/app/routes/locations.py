@@ -1,13 +1,27 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from ..services import location_service
+from config import (
+    LOCATION_NEAREST_DEFAULT_K,
+    LOCATION_NEAREST_DEFAULT_RADIUS_KM,
+    LOCATION_NEAREST_MAX_RADIUS_KM,
+    LOCATION_NEAREST_MAX_COORDINATES,
+)
 
 locations_bp = Blueprint("locations_bp", __name__)
 
 
 @locations_bp.route("/locations", methods=["GET"])
 def get_locations():
-    presets = location_service.load_location_presets()
-    return jsonify(presets)
+    """
+    Returns the presets from a cached serialization. The ETag lets the browser
+    revalidate and get a 304 as long as the presets did not change.
+    """
+    body, etag = location_service.location_repository.get_response()
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 
 @locations_bp.route("/locations", methods=["POST"])
@@ -22,6 +36,60 @@ def add_location():
         return jsonify({"error": str(e)}), 409  # Conflict
 
 
+@locations_bp.route("/locations/nearest", methods=["POST"])
+def nearest_locations():
+    """
+    Returns the saved presets nearest to one or many GPS coordinates, e.g. all
+    photos of a trip at once. Body: {"coordinates": [{"latitude", "longitude"}],
+    "k"?, "radiusKm"?}. The results are in the order of the coordinates.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("coordinates"), list):
+        return jsonify({"error": "A list of coordinates is required"}), 400
+    if len(data["coordinates"]) > LOCATION_NEAREST_MAX_COORDINATES:
+        return (
+            jsonify(
+                {
+                    "error": f"At most {LOCATION_NEAREST_MAX_COORDINATES} "
+                    "coordinates are accepted"
+                }
+            ),
+            400,
+        )
+
+    try:
+        k = int(data.get("k", LOCATION_NEAREST_DEFAULT_K))
+        radius_km = float(data.get("radiusKm", LOCATION_NEAREST_DEFAULT_RADIUS_KM))
+    except (TypeError, ValueError):
+        return jsonify({"error": "k and radiusKm must be numbers"}), 400
+    if k < 1 or not 0 <= radius_km <= LOCATION_NEAREST_MAX_RADIUS_KM:
+        return jsonify({"error": "k or radiusKm is out of range"}), 400
+
+    coordinates = []
+    for point in data["coordinates"]:
+        try:
+            latitude = float(point["latitude"])
+            longitude = float(point["longitude"])
+        except (TypeError, ValueError, KeyError):
+            return jsonify({"error": f"Invalid coordinate: {point}"}), 400
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return jsonify({"error": f"Coordinate out of range: {point}"}), 400
+        coordinates.append((latitude, longitude))
+
+    results = location_service.find_nearest_presets(coordinates, k, radius_km)
+    return jsonify(
+        {
+            "results": [
+                [
+                    {"preset": preset, "distanceKm": round(distance, 4)}
+                    for preset, distance in matches
+                ]
+                for matches in results
+            ]
+        }
+    )
+
+
 @locations_bp.route("/locations/<string:preset_id>/track_usage", methods=["PUT"])
 def track_usage(preset_id):
     updated_preset = location_service.update_location_preset_usage(preset_id)
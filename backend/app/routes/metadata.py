@@ -1,14 +1,19 @@
 import os
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from collections import OrderedDict
 
 from app.metadata_schema import TAG_MAP
 from app.services.exif_service import (
     read_metadata_for_files,
+    iter_metadata_for_files,
     build_exiftool_args,
-    run_exiftool_command,
+    count_written_tags,
+    get_cached_metadata,
+    run_exiftool_batch,
 )
 from app.services.keyword_service import keyword_service
+from app.services.metadata_cache import metadata_cache
 
 metadata_bp = Blueprint("metadata_bp", __name__)
 
@@ -16,7 +21,8 @@ metadata_bp = Blueprint("metadata_bp", __name__)
 @metadata_bp.route("/metadata", methods=["POST"])
 def get_metadata_batch():
     """
-    Handles batch requests for image metadata.
+    Handles batch requests for image metadata. Clients sending
+    'Accept: application/x-ndjson' get a stream with one record per line instead.
     """
     data = request.get_json()
     if not data or "files" not in data:
@@ -26,6 +32,12 @@ def get_metadata_batch():
     if not isinstance(image_paths, list) or not image_paths:
         return jsonify([])
 
+    if request.accept_mimetypes.best == "application/x-ndjson":
+        return Response(
+            stream_with_context(_stream_metadata(image_paths)),
+            mimetype="application/x-ndjson",
+        )
+
     metadata_list = read_metadata_for_files(image_paths)
 
     results = []
@@ -47,6 +59,29 @@ def get_metadata_batch():
     return jsonify(results)
 
 
+def _stream_metadata(image_paths: list[str]):
+    """
+    Yields one NDJSON line per file as its ExifTool chunk completes, followed by
+    the records of the files that could not be read.
+    """
+    processed_files = set()
+    for path, metadata in iter_metadata_for_files(image_paths):
+        filename = os.path.basename(path)
+        processed_files.add(filename)
+        yield _ndjson_line({"filename": filename, "metadata": metadata})
+
+    for path in image_paths:
+        filename = os.path.basename(path)
+        if filename not in processed_files:
+            yield _ndjson_line(
+                {"filename": filename, "metadata": {"error": "Failed to read metadata"}}
+            )
+
+
+def _ndjson_line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
 @metadata_bp.route("/save_metadata", methods=["POST"])
 def save_metadata():
     """
@@ -62,22 +97,65 @@ def save_metadata():
     if keywords_to_learn:
         keyword_service.track_usage(keywords_to_learn)
 
+    # Unchanged tags are detected against the server's own read of each file,
+    # since the client's copy may be stale.
+    current_metadata = get_cached_metadata([f["path"] for f in files_to_update])
+    results = []
+    commands = []
+    command_results = []
+    for file_update in files_to_update:
+        args = build_exiftool_args(
+            file_update["original_metadata"],
+            file_update["new_metadata"],
+            current_metadata.get(file_update["path"]),
+        )
+        # Files whose metadata already matches are not rewritten at all.
+        result = {"path": file_update["path"], "status": "skipped", "message": ""}
+        if args:
+            commands.append(args + [file_update["path"]])
+            command_results.append((result, count_written_tags(args)))
+        results.append(result)
+
+    files_written = 0
+    tags_written = 0
     try:
-        for file_update in files_to_update:
-            args = build_exiftool_args(
-                file_update["original_metadata"], file_update["new_metadata"]
-            )
-            if args:
-                run_exiftool_command(args + [file_update["path"]])
-        return jsonify({"message": "Metadata saved successfully"})
+        outcomes = run_exiftool_batch(commands)
+        for (result, tag_count), outcome in zip(command_results, outcomes):
+            result["status"] = "success" if outcome.status == 0 else "error"
+            result["message"] = outcome.stderr.strip()
+            if outcome.status == 0:
+                result["tagsWritten"] = tag_count
+                files_written += 1
+                tags_written += tag_count
     except Exception as e:
-        stderr = getattr(e, "stderr", "").strip()
+        stderr = (getattr(e, "stderr", "") or "").strip()
         error_message = f"ExifTool failed: {stderr}"
         return (
             jsonify({"message": error_message, "details": str(e)}),
             500,
         )
 
+    summary = {
+        "results": results,
+        "filesWritten": files_written,
+        "filesSkipped": len(results) - len(command_results),
+        "tagsWritten": tags_written,
+    }
+    failed = [r for r in results if r["status"] == "error"]
+    if failed:
+        error_message = (
+            f"ExifTool failed for {len(failed)} of {len(results)} files: "
+            f"{failed[0]['message']}"
+        )
+        return jsonify({"message": error_message, **summary}), 500
+    return jsonify({"message": "Metadata saved successfully", **summary})
+
+
+@metadata_bp.route("/metadata/cache-stats", methods=["GET"])
+def get_metadata_cache_stats():
+    """Returns hit/miss/eviction counters of the in-memory metadata cache."""
+    return jsonify(metadata_cache.stats())
+
 
 @metadata_bp.route("/metadata-fields", methods=["GET"])
 def get_metadata_fields():
@@ -1,7 +1,12 @@
 import os
 from flask import Blueprint, request, jsonify
-from app.services.settings_service import get_setting
+from app.services.settings_service import get_setting, get_extension_casing
 from app.services.rename_service import generate_filename_from_pattern
+from app.services.exif_service import (
+    get_sidecar_paths,
+    invalidate_metadata,
+    refresh_metadata,
+)
 
 rename_bp = Blueprint("rename_bp", __name__)
 
@@ -16,14 +21,10 @@ def _get_new_filename_with_collision_check(old_path: str):
     if error:
         return None, None, error
 
-    extension_rules = {
-        rule["extension"]: rule["casing"]
-        for rule in get_setting("renameSettings.extensionRules", [])
-    }
     directory, old_filename = os.path.split(old_path)
     _, ext_base = os.path.splitext(old_filename)
 
-    casing = extension_rules.get(ext_base.lower(), "lowercase")
+    casing = get_extension_casing().get(ext_base.lower(), "lowercase")
     extension = ext_base.upper() if casing == "uppercase" else ext_base.lower()
 
     new_path = os.path.join(directory, f"{new_filename_base}{extension}")
@@ -62,18 +63,30 @@ def rename_files():
         return jsonify({"error": "Invalid request"}), 400
     image_paths = data["files"]
     rename_results = []
-    for old_path in image_paths:
-        _, old_filename = os.path.split(old_path)
-        new_path, new_filename, status = _get_new_filename_with_collision_check(
-            old_path
-        )
-        if status == "Success":
-            os.rename(old_path, new_path)
-            rename_results.append(
-                {"original": old_filename, "new": new_filename, "status": "Renamed"}
-            )
-        else:
-            rename_results.append(
-                {"original": old_filename, "new": new_filename, "status": status}
+    renamed = []  # (old path, new path)
+    try:
+        for old_path in image_paths:
+            _, old_filename = os.path.split(old_path)
+            new_path, new_filename, status = _get_new_filename_with_collision_check(
+                old_path
             )
+            if status == "Success":
+                os.rename(old_path, new_path)
+                renamed.append((old_path, new_path))
+                # An XMP sidecar has to follow its image to stay associated with it.
+                old_sidecar = get_sidecar_paths([old_path]).get(old_path)
+                if old_sidecar and os.path.isfile(old_sidecar):
+                    os.rename(old_sidecar, get_sidecar_paths([new_path])[new_path])
+                rename_results.append(
+                    {"original": old_filename, "new": new_filename, "status": "Renamed"}
+                )
+            else:
+                rename_results.append(
+                    {"original": old_filename, "new": new_filename, "status": status}
+                )
+    finally:
+        # Drops the old paths and indexes the files under their new names, in
+        # one read for the whole batch.
+        invalidate_metadata([path for pair in renamed for path in pair])
+        refresh_metadata([new_path for _, new_path in renamed])
     return jsonify(rename_results)
@@ -0,0 +1,56 @@
+from flask import Blueprint, request, jsonify
+from app.services.search_service import search_index, SearchQueryError, FACET_FIELDS
+
+search_bp = Blueprint("search_bp", __name__)
+
+
+@search_bp.route("/search", methods=["GET"])
+def search():
+    """
+    Searches all files whose metadata has been read. Parameters:
+    q (boolean keyword query), city/country/creator/keyword (repeatable, ORed per
+    facet), dateFrom/dateTo, bbox=minLat,minLon,maxLat,maxLon, folder, limit,
+    offset and facetLimit.
+    """
+    args = request.args
+    try:
+        limit = int(args.get("limit", 100))
+        offset = int(args.get("offset", 0))
+        facet_limit = int(args.get("facetLimit", 20))
+    except ValueError:
+        return jsonify({"error": "limit, offset and facetLimit must be integers"}), 400
+
+    bbox = None
+    if args.get("bbox"):
+        try:
+            bbox = tuple(float(v) for v in args["bbox"].split(","))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4:
+            return jsonify({"error": "bbox must be minLat,minLon,maxLat,maxLon"}), 400
+
+    filters = {
+        facet: args.getlist(facet) for facet in FACET_FIELDS if args.getlist(facet)
+    }
+    try:
+        return jsonify(
+            search_index.search(
+                keyword_query=args.get("q"),
+                filters=filters,
+                date_from=args.get("dateFrom"),
+                date_to=args.get("dateTo"),
+                bbox=bbox,
+                folder=args.get("folder"),
+                limit=max(limit, 0),
+                offset=max(offset, 0),
+                facet_limit=max(facet_limit, 0),
+            )
+        )
+    except SearchQueryError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@search_bp.route("/search/stats", methods=["GET"])
+def get_search_stats():
+    """Returns the size of the search indexes."""
+    return jsonify(search_index.stats())
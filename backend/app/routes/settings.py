@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
-from app.services.settings_service import load_settings, save_settings
+from app.services import settings_service
+from app.services.json_store import get_store_stats
 
 settings_bp = Blueprint("settings_bp", __name__)
 
@@ -7,7 +8,7 @@ settings_bp = Blueprint("settings_bp", __name__)
 @settings_bp.route("/settings", methods=["GET"])
 def get_settings():
     """Returns all user-configurable settings."""
-    return jsonify(load_settings())
+    return jsonify(settings_service.load_settings())
 
 
 @settings_bp.route("/settings", methods=["PUT"])
@@ -17,10 +18,7 @@ def update_settings():
     if not updated_settings:
         return jsonify({"error": "Invalid request body"}), 400
     try:
-        current_settings = load_settings()
-        current_settings.update(updated_settings)
-        save_settings(current_settings)
-        return jsonify(current_settings)
+        return jsonify(settings_service.update_settings(updated_settings))
     except Exception as e:
         return jsonify({"error": "Failed to save settings", "details": str(e)}), 500
 
@@ -33,9 +31,7 @@ def update_last_opened_folder():
         return jsonify({"error": "Path is required"}), 400
 
     try:
-        settings = load_settings()
-        settings["appBehavior"]["lastOpenedFolder"] = data["path"]
-        save_settings(settings)
+        settings_service.set_setting("appBehavior.lastOpenedFolder", data["path"])
         return jsonify({"message": "Last opened folder updated successfully."})
     except Exception as e:
         return (
@@ -44,3 +40,9 @@ def update_last_opened_folder():
             ),
             500,
         )
+
+
+@settings_bp.route("/settings/storage-stats", methods=["GET"])
+def get_storage_stats():
+    """Returns flush counts and latencies of the keyword, location and settings files."""
+    return jsonify(get_store_stats())
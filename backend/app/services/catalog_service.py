@@ -0,0 +1,65 @@
+import os
+from config import CATALOG_RESCAN_BATCH_SIZE
+from app.services import exif_service
+from app.services.metadata_cache import metadata_cache
+from app.services.metadata_catalog import metadata_catalog
+from app.services.search_service import search_index
+from app.services.file_listing_service import is_in_listing_scope, list_folder_images
+
+
+def rescan_folder(folder_path: str, recursive: bool = False) -> dict:
+    """
+    Brings the catalog up to date with a folder: only files that are new or whose
+    fingerprint changed are read, in batches of CATALOG_RESCAN_BATCH_SIZE, unless
+    the metadata cache already holds them, and entries of files that no longer
+    exist are removed. Only entries within the scope of the listing are compared,
+    so files below LISTING_MAX_DEPTH or in hidden folders are left alone.
+    Returns counters.
+    """
+    items, _ = list_folder_images(folder_path, recursive=recursive)
+    file_paths = [os.path.join(folder_path, item["name"]) for item in items]
+    fingerprints = exif_service.get_metadata_fingerprints(file_paths)
+    folder_key = os.path.normcase(os.path.abspath(folder_path))
+    stored = {
+        key: fingerprint
+        for key, fingerprint in metadata_catalog.get_folder_fingerprints(
+            folder_path, recursive
+        ).items()
+        if is_in_listing_scope(os.path.relpath(key, folder_key), recursive)
+    }
+
+    changed_paths = []
+    current_keys = set()
+    for path, fingerprint in fingerprints.items():
+        key = os.path.normcase(os.path.abspath(path))
+        current_keys.add(key)
+        if stored.get(key) != metadata_catalog.encoded_fingerprint(fingerprint):
+            changed_paths.append(path)
+
+    # Files whose current metadata is already cached are stored from the cache;
+    # reading them would return the cached item without storing it.
+    cached_entries = []
+    paths_to_read = []
+    for path in changed_paths:
+        item = metadata_cache.get(path, fingerprints[path])
+        if item is not None:
+            cached_entries.append((path, fingerprints[path], item))
+        else:
+            paths_to_read.append(path)
+    metadata_catalog.put_many(cached_entries)
+
+    updated = len(cached_entries)
+    for start in range(0, len(paths_to_read), CATALOG_RESCAN_BATCH_SIZE):
+        batch = paths_to_read[start : start + CATALOG_RESCAN_BATCH_SIZE]
+        updated += sum(1 for _ in exif_service.iter_metadata_for_files(batch))
+
+    removed = [key for key in stored if key not in current_keys]
+    metadata_catalog.invalidate(removed)
+    search_index.remove(removed)
+    return {
+        "files": len(file_paths),
+        "unchanged": len(file_paths) - len(changed_paths),
+        "updated": updated,
+        "failed": len(changed_paths) - updated,
+        "removed": len(removed),
+    }
@@ -1,12 +1,28 @@
 import os
 import subprocess
-import tempfile
 import json
+import base64
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 from datetime import datetime
 from PIL import Image
 import mimetypes
-from config import EXIFTOOL_PATH
+from config import (
+    EXIFTOOL_PATH,
+    EXIFTOOL_WRITE_BATCH_SIZE,
+    METADATA_READ_CHUNK_SIZE,
+    METADATA_READ_CONCURRENCY,
+    METADATA_PROCESS_WORKERS,
+    METADATA_FAST_READER,
+)
+from app.services.exiftool_pool import exiftool_pool, ExifToolResult
+from app.services.metadata_cache import metadata_cache
+from app.services.metadata_catalog import metadata_catalog
+from app.services.search_service import search_index
+from app.services.fast_metadata_reader import read_fast_metadata
 from app.services.settings_service import get_setting
 from app.metadata_schema import TAG_MAP
 
@@ -35,198 +51,769 @@ VALUE_HANDLERS = {
 }
 
 
-def process_metadata_field(exif_data: dict, sources_details: dict) -> dict:
-    present_values, primary_value = {}, None
-    source_tags = list(sources_details.keys())
-    for tag in source_tags:
-        if tag in exif_data:
-            value = exif_data[tag]
-            present_values[tag] = value
-            if primary_value is None:
-                primary_value = value
-    if not present_values:
+class _SourcePlan:
+    """A single source tag of a field, with its value handlers resolved."""
+
+    __slots__ = ("tag", "write_mode", "read", "write")
+
+    def __init__(self, tag: str, details: dict):
+        handlers = VALUE_HANDLERS.get(details.get("value_handler"), {})
+        self.tag = tag
+        self.write_mode = details.get("write_mode", "always")
+        self.read = handlers.get("read")
+        self.write = handlers.get("write")
+
+
+class _FieldPlan:
+    """Everything needed to read or write one TAG_MAP field without dict lookups."""
+
+    __slots__ = (
+        "key",
+        "is_list",
+        "sources",
+        "source_tags",
+        "mandatory_tags",
+        "fallback",
+    )
+
+    def __init__(self, key: str, details: dict):
+        sources = details.get("sources", {})
+        self.key = key
+        self.is_list = details.get("handler", "simple") == "list"
+        self.sources = tuple(_SourcePlan(tag, d) for tag, d in sources.items())
+        self.source_tags = tuple(sources.keys())
+        # On read, only sources explicitly marked 'always' are required for a
+        # field to count as consolidated.
+        self.mandatory_tags = tuple(
+            tag for tag, d in sources.items() if d.get("write_mode") == "always"
+        )
+        # When no value was found, the first optional source may still provide one
+        # through its read handler (e.g. Canon:TimeZone for the offset).
+        optional = next((s for s in self.sources if s.write_mode == "if_exists"), None)
+        self.fallback = optional if optional and optional.read else None
+
+
+class _MetadataPlan:
+    """TAG_MAP compiled once at import into flat tables for the read and write paths."""
+
+    __slots__ = ("fields", "fields_by_key", "read_args", "read_tags", "read_transforms")
+
+    def __init__(self, tag_map: dict):
+        self.fields = tuple(
+            _FieldPlan(key, details)
+            for key, details in tag_map.items()
+            if details.get("sources")
+        )
+        self.fields_by_key = {field.key: field for field in self.fields}
+        self.read_tags = frozenset(
+            s.tag for field in self.fields for s in field.sources
+        )
+        self.read_args = list(
+            dict.fromkeys(f"-{s.tag}" for field in self.fields for s in field.sources)
+        )
+        self.read_transforms = tuple(
+            {
+                s.tag: s.read for field in self.fields for s in field.sources if s.read
+            }.items()
+        )
+
+
+METADATA_PLAN = _MetadataPlan(TAG_MAP)
+
+
+def _consolidate_field(values: dict, field: _FieldPlan) -> dict:
+    if len(field.source_tags) == 1:
+        # Most fields have a single source, which is consolidated by definition.
+        value = values.get(field.source_tags[0])
+        return {"value": value, "isConsolidated": True}
+    present = [values[tag] for tag in field.source_tags if tag in values]
+    if not present:
         return {"value": None, "isConsolidated": True}
+    primary_value = next((v for v in present if v is not None), None)
     if not primary_value:
         return {"value": primary_value, "isConsolidated": True}
-    mandatory_sources = [
-        tag
-        for tag, details in sources_details.items()
-        if details.get("write_mode") == "always"
-    ]
-    all_mandatory_are_present = all(tag in present_values for tag in mandatory_sources)
-    all_values_are_same = len(set(str(v) for v in present_values.values())) == 1
+    all_mandatory_are_present = all(tag in values for tag in field.mandatory_tags)
+    all_values_are_same = len(set(str(v) for v in present)) == 1
     return {
         "value": primary_value,
         "isConsolidated": all_mandatory_are_present and all_values_are_same,
     }
 
 
-def read_metadata_for_files(file_paths: list[str]) -> list[dict]:
+def get_sidecar_extensions() -> set[str]:
+    """Returns the lowercased extensions of files in sidecar mode."""
+    return {
+        extension.lower()
+        for extension in get_setting("powerUser.xmpSidecarExtensions", [])
+    }
+
+
+def get_sidecar_paths(file_paths: list[str]) -> dict[str, str]:
+    """
+    Returns {file path: '.xmp' sidecar path} for the files whose extension is listed
+    in 'powerUser.xmpSidecarExtensions'. Their metadata is written to the sidecar
+    (named like the file, as ExifTool and Lightroom do) instead of the file itself.
+    """
+    sidecar_extensions = get_sidecar_extensions()
+    if not sidecar_extensions:
+        return {}
+    sidecars = {}
+    for path in file_paths:
+        stem, extension = os.path.splitext(path)
+        if extension.lower() in sidecar_extensions:
+            sidecars[path] = stem + ".xmp"
+    return sidecars
+
+
+def _merge_sidecar_record(raw_item: dict, sidecar_item: dict) -> dict:
+    """
+    Overlays a sidecar's record on the one of its image. Once a sidecar exists it
+    holds all XMP of the file, so the image's embedded XMP is ignored. For fields
+    the sidecar has a value for, the sidecar value also stands in for the non-XMP
+    sources, which are no longer written for this file.
+    """
+    merged = {
+        tag: value for tag, value in raw_item.items() if not tag.startswith("XMP-")
+    }
+    merged.update(
+        (tag, value) for tag, value in sidecar_item.items() if tag.startswith("XMP-")
+    )
+    for field in METADATA_PLAN.fields:
+        xmp_value = next(
+            (
+                merged[tag]
+                for tag in field.source_tags
+                if tag.startswith("XMP-") and tag in merged
+            ),
+            None,
+        )
+        if xmp_value is None:
+            continue
+        for tag in field.source_tags:
+            if not tag.startswith("XMP-") and (
+                tag in merged or tag in field.mandatory_tags
+            ):
+                merged[tag] = xmp_value
+    return merged
+
+
+def _read_raw_metadata(file_paths: list[str]) -> list[dict]:
+    """
+    Returns the raw '-G1 -n' JSON records for the given files, with the values of
+    existing XMP sidecars merged in. With METADATA_FAST_READER enabled, JPEG/TIFF
+    files are parsed in-process and only the remaining ones are sent to ExifTool.
+    """
+    sidecars = {
+        path: sidecar
+        for path, sidecar in get_sidecar_paths(file_paths).items()
+        if os.path.isfile(sidecar)
+    }
+    raw_data_list = []
+    if METADATA_FAST_READER:
+        remaining_paths = []
+        for path in file_paths:
+            record = None
+            if path not in sidecars:
+                record = read_fast_metadata(path, METADATA_PLAN.read_tags)
+            if record is not None:
+                raw_data_list.append(record)
+            else:
+                remaining_paths.append(path)
+        file_paths = remaining_paths
     if not file_paths:
-        return []
+        return raw_data_list
+
+    command = ["-j", "-G1", "-n", "-a"]
+    command.extend(METADATA_PLAN.read_args)
+    command.extend(file_paths)
+    # Sidecars are read in the same call and matched back to their images below.
+    command.extend(sidecars[path] for path in file_paths if path in sidecars)
+    # A single unreadable file makes ExifTool exit with status 1 while still
+    # printing the records of all other files, so those are kept.
+    output = exiftool_pool.execute(command, check=False)
+    if not output.strip():
+        return raw_data_list
+    records = json.loads(output.decode("utf-8"))
+    if not sidecars:
+        raw_data_list.extend(records)
+        return raw_data_list
+
+    sidecar_keys = {_path_key(sidecar): path for path, sidecar in sidecars.items()}
+    sidecar_records = {}
+    image_records = []
+    for record in records:
+        owner = sidecar_keys.get(_path_key(record.get("SourceFile", "")))
+        if owner is not None:
+            sidecar_records[_path_key(owner)] = record
+        else:
+            image_records.append(record)
+    for record in image_records:
+        sidecar_record = sidecar_records.get(_path_key(record.get("SourceFile", "")))
+        if sidecar_record is not None:
+            record = _merge_sidecar_record(record, sidecar_record)
+        raw_data_list.append(record)
+    return raw_data_list
+
+
+def _process_raw_item(raw_item: dict) -> dict:
+    """Consolidates one raw ExifTool record into the application's field structure."""
+    final_item = {"original": raw_item}
+    values = raw_item
+    for tag, read_func in METADATA_PLAN.read_transforms:
+        if tag in raw_item:
+            if values is raw_item:
+                values = raw_item.copy()
+            values[tag] = read_func(raw_item[tag])
+
+    for field in METADATA_PLAN.fields:
+        result = _consolidate_field(values, field)
+        if not result["value"] and field.fallback and field.fallback.tag in raw_item:
+            fallback_value = field.fallback.read(raw_item[field.fallback.tag])
+            if fallback_value:
+                result = {"value": fallback_value, "isConsolidated": False}
+        if field.is_list:
+            if isinstance(result["value"], str):
+                result["value"] = [result["value"]]
+            elif result["value"] is None:
+                result["value"] = []
+        final_item[field.key] = result
+
+    if "SourceFile" in raw_item:
+        final_item["SourceFile"] = raw_item["SourceFile"]
+    return final_item
+
+
+def _process_raw_items(raw_items: list[dict]) -> list[dict]:
+    """Processes a whole chunk of raw records; the unit of work sent to the process pool."""
+    return [_process_raw_item(raw_item) for raw_item in raw_items]
+
+
+_process_executor = None
+_process_executor_lock = threading.Lock()
+
+
+def _get_process_executor() -> ProcessPoolExecutor | None:
+    """Lazily creates the shared process pool used for consolidating large reads."""
+    global _process_executor
+    if METADATA_PROCESS_WORKERS <= 1:
+        return None
+    with _process_executor_lock:
+        if _process_executor is None:
+            _process_executor = ProcessPoolExecutor(
+                max_workers=METADATA_PROCESS_WORKERS
+            )
+        return _process_executor
+
+
+def _read_and_process_chunk(file_paths: list[str], parallel: bool) -> list[dict]:
+    global _process_executor
     try:
-        all_source_tags = [
-            tag
-            for details in TAG_MAP.values()
-            for tag in details.get("sources", {}).keys()
-        ]
-        command = [EXIFTOOL_PATH, "-j", "-G1", "-n", "-a"]
-        command.extend(list(set([f"-{tag}" for tag in all_source_tags])))
-        command.extend(file_paths)
-        result = subprocess.run(
-            command, capture_output=True, check=True, text=True, encoding="utf-8"
-        )
-        raw_data_list = json.loads(result.stdout)
-        processed_data = []
-        for raw_item in raw_data_list:
-            final_item = {"original": raw_item}
-            transformed_raw_item = raw_item.copy()
-            for details in TAG_MAP.values():
-                for source_tag, source_details in details.get("sources", {}).items():
-                    handler_name = source_details.get("value_handler")
-                    if handler_name and source_tag in transformed_raw_item:
-                        read_func = VALUE_HANDLERS.get(handler_name, {}).get("read")
-                        if read_func:
-                            transformed_raw_item[source_tag] = read_func(
-                                transformed_raw_item[source_tag]
-                            )
-            for app_key, details in TAG_MAP.items():
-                sources = details.get("sources")
-                if sources:
-                    final_item[app_key] = process_metadata_field(
-                        transformed_raw_item, sources
-                    )
-            offset_field = final_item.get("OffsetTimeOriginal")
-            if offset_field and not offset_field.get("value"):
-                canon_tz_tag, handler_details = next(
-                    (
-                        (tag, d)
-                        for tag, d in TAG_MAP["OffsetTimeOriginal"]["sources"].items()
-                        if d.get("write_mode") == "if_exists"
-                    ),
-                    (None, None),
-                )
-                if canon_tz_tag and canon_tz_tag in raw_item and handler_details:
-                    handler_name = handler_details.get("value_handler")
-                    if handler_name:
-                        read_func = VALUE_HANDLERS.get(handler_name, {}).get("read")
-                        if read_func:
-                            offset = read_func(raw_item[canon_tz_tag])
-                            if offset:
-                                offset_field["value"] = offset
-                                offset_field["isConsolidated"] = False
-            keywords_field = final_item.get("Keywords")
-            if keywords_field and isinstance(keywords_field.get("value"), str):
-                keywords_field["value"] = [keywords_field["value"]]
-            elif keywords_field and keywords_field.get("value") is None:
-                keywords_field["value"] = []
-            if "SourceFile" in raw_item:
-                final_item["SourceFile"] = raw_item["SourceFile"]
-            processed_data.append(final_item)
-        return processed_data
+        raw_data_list = _read_raw_metadata(file_paths)
     except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError):
         return []
 
+    executor = _get_process_executor() if parallel else None
+    if executor is not None:
+        try:
+            return executor.submit(_process_raw_items, raw_data_list).result()
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next read builds a fresh one.
+            with _process_executor_lock:
+                if _process_executor is executor:
+                    _process_executor = None
+    return _process_raw_items(raw_data_list)
+
+
+def _iter_processed_chunks(file_paths: list[str]):
+    """
+    Reads the given files in chunks of METADATA_READ_CHUNK_SIZE. Large reads run the
+    chunks concurrently on the ExifTool pool (via a thread pool, as the work is in
+    the subprocesses) and, if METADATA_PROCESS_WORKERS is set, consolidate them in
+    a process pool. Yields
+    (chunk_paths, processed_items) pairs in completion order.
+    """
+    if not file_paths:
+        return
+    chunks = [
+        file_paths[i : i + METADATA_READ_CHUNK_SIZE]
+        for i in range(0, len(file_paths), METADATA_READ_CHUNK_SIZE)
+    ]
+    if len(chunks) == 1 or METADATA_READ_CONCURRENCY <= 1:
+        for chunk in chunks:
+            yield chunk, _read_and_process_chunk(chunk, parallel=False)
+        return
+
+    executor = ThreadPoolExecutor(
+        max_workers=min(METADATA_READ_CONCURRENCY, len(chunks))
+    )
+    try:
+        futures = {
+            executor.submit(_read_and_process_chunk, chunk, True): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Stops queued chunks if the consumer goes away before the end.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _path_key(path: str) -> str:
+    # ExifTool reports SourceFile with forward slashes on Windows, so paths are
+    # normalized before being matched back to the requested ones.
+    return os.path.normcase(os.path.abspath(path))
+
+
+def get_metadata_fingerprints(file_paths: list[str]) -> dict[str, tuple | None]:
+    """
+    Returns {path: fingerprint} used to validate cached metadata: the file's
+    (size, mtime_ns), extended by the sidecar's fingerprint for files in sidecar
+    mode, or None for files that cannot be stat'ed.
+    """
+    fingerprints = {}
+    sidecars = get_sidecar_paths(file_paths)
+    for path in file_paths:
+        if path in fingerprints:
+            continue
+        fingerprint = metadata_cache.fingerprint(path)
+        if fingerprint is not None and path in sidecars:
+            # Editing the sidecar changes the file's metadata as well.
+            fingerprint += (metadata_cache.fingerprint(sidecars[path]),)
+        fingerprints[path] = fingerprint
+    return fingerprints
+
+
+def iter_metadata_for_files(file_paths: list[str]):
+    """
+    Yields (path, processed_metadata) pairs as soon as they are available: files
+    from the in-memory cache and the persistent catalog first, then each ExifTool
+    chunk as it completes, which is also stored in both. Files that could not be
+    read are not yielded. The yielded dicts may be shared with the metadata cache
+    and must not be mutated.
+    """
+    fingerprints = get_metadata_fingerprints(file_paths)
+    uncached = {}
+    for path, fingerprint in fingerprints.items():
+        cached = metadata_cache.get(path, fingerprint)
+        if cached is not None:
+            yield path, cached
+        else:
+            uncached[path] = fingerprint
+
+    paths_to_read = []
+    catalog_items = metadata_catalog.get_many(uncached) if uncached else {}
+    search_index.update_many(catalog_items.items())
+    for path in uncached:
+        item = catalog_items.get(path)
+        if item is not None:
+            metadata_cache.put(path, fingerprints[path], item)
+            yield path, item
+        else:
+            paths_to_read.append(path)
+
+    for chunk, processed_items in _iter_processed_chunks(paths_to_read):
+        processed_by_key = {
+            _path_key(item["SourceFile"]): item
+            for item in processed_items
+            if "SourceFile" in item
+        }
+        read_entries = []
+        for path in chunk:
+            final_item = processed_by_key.get(_path_key(path))
+            if final_item is not None:
+                read_entries.append((path, fingerprints[path], final_item))
+        metadata_catalog.put_many(read_entries)
+        search_index.update_many((path, item) for path, _, item in read_entries)
+        for path, fingerprint, final_item in read_entries:
+            metadata_cache.put(path, fingerprint, final_item)
+            yield path, final_item
+
+
+def get_cached_metadata(file_paths: list[str]) -> dict[str, dict]:
+    """
+    Returns {path: processed metadata} for the files whose cached or cataloged
+    entry still matches their fingerprint, without reading any file.
+    """
+    fingerprints = get_metadata_fingerprints(file_paths)
+    items = {}
+    uncached = {}
+    for path, fingerprint in fingerprints.items():
+        cached = metadata_cache.get(path, fingerprint)
+        if cached is not None:
+            items[path] = cached
+        else:
+            uncached[path] = fingerprint
+    if uncached:
+        items.update(metadata_catalog.get_many(uncached))
+    return items
+
+
+def invalidate_metadata(file_paths: list[str]):
+    """
+    Drops the cached, cataloged and indexed metadata of files we have just
+    modified, so that neither reads nor searches return the old values.
+    """
+    metadata_cache.invalidate(file_paths)
+    metadata_catalog.invalidate(file_paths)
+    search_index.remove(file_paths)
+
+
+def refresh_metadata(file_paths: list[str]):
+    """
+    Brings the cached, cataloged and indexed metadata of files up to date. Entries
+    whose fingerprint still matches are kept as they are; the other files are read
+    again. Files that no longer exist are skipped.
+    """
+    existing = [path for path in dict.fromkeys(file_paths) if os.path.isfile(path)]
+    try:
+        read_metadata_for_files(existing)
+    except (OSError, subprocess.SubprocessError) as e:
+        # The files are read again when they are next requested.
+        print(f"Error re-reading metadata after a write: {e}")
+
+
+def read_metadata_for_files(file_paths: list[str]) -> list[dict]:
+    """
+    Returns processed metadata for the given files, in input order. Files whose
+    (size, mtime) fingerprint is unchanged are served from the metadata cache or
+    the catalog; only the remaining ones are read with ExifTool. The returned
+    dicts may be shared with the cache and must not be mutated.
+    """
+    if not file_paths:
+        return []
+
+    items_by_path = dict(iter_metadata_for_files(file_paths))
+    return [items_by_path[path] for path in file_paths if path in items_by_path]
+
+
+def _normalize_list(value) -> list[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [item_str for item_str in (str(item).strip() for item in value) if item_str]
+
 
-def build_exiftool_args(original_metadata: dict, new_metadata: dict) -> list[str]:
+def _scalar_unchanged(current_value, new_value: str) -> bool:
     """
-    Builds arguments using a declarative, handler-based approach.
+    Compares a value to be written with the one ExifTool reported. ExifTool prints
+    numeric-looking strings as JSON numbers, so those are compared numerically.
     """
+    if current_value is None:
+        return new_value == ""
+    if isinstance(current_value, (int, float)) and not isinstance(current_value, bool):
+        try:
+            return float(new_value) == current_value
+        except ValueError:
+            return False
+    return str(current_value).strip() == new_value
+
+
+def _raw_record(metadata: dict) -> dict:
+    """Returns the raw 'original' record of a processed item, or a raw record as is."""
+    original = metadata.get("original")
+    return original if isinstance(original, dict) else metadata
+
+
+def build_exiftool_args(
+    original_metadata: dict, new_metadata: dict, current_metadata: dict | None = None
+) -> list[str]:
+    """
+    Builds arguments using a declarative, handler-based approach. Only source tags
+    whose value in `current_metadata`, the server's own fingerprint-validated read
+    of the file (see get_cached_metadata), differs from the new one are written,
+    so an empty list means the file does not need to be touched. Without it every
+    tag is written: `original_metadata` comes from the client and may be stale, so
+    it only tells which 'if_exists' sources the file has. Both may be processed
+    items or raw 'original' records.
+    """
+    current = _raw_record(current_metadata) if current_metadata is not None else None
+    existing = current if current is not None else _raw_record(original_metadata)
+
     args = []
     for app_key, new_value in new_metadata.items():
-        details = TAG_MAP.get(app_key)
-        if not details:
+        field = METADATA_PLAN.fields_by_key.get(app_key)
+        if not field:
             continue
-        handler = details.get("handler", "simple")
-        sources = details.get("sources", {})
 
-        for source_tag, source_details in sources.items():
-            write_mode = source_details.get("write_mode", "always")
-            if (write_mode == "always") or (
-                write_mode == "if_exists" and source_tag in original_metadata
+        for source in field.sources:
+            if source.write_mode != "always" and not (
+                source.write_mode == "if_exists" and source.tag in existing
             ):
-                value_to_write = new_value
-                handler_name = source_details.get("value_handler")
-                if handler_name:
-                    write_func = VALUE_HANDLERS.get(handler_name, {}).get("write")
-                    if write_func:
-                        converted_value = write_func(new_value)
-                        if converted_value is not None:
-                            value_to_write = converted_value
-
-                if handler == "list":
-                    if isinstance(value_to_write, list):
-                        args.append(f"-{source_tag}=")
-                        for item in value_to_write:
-                            item_str = str(item).strip()
-                            if item_str:
-                                args.append(f"-{source_tag}={item_str}")
-                else:
-                    args.append(f"-{source_tag}={str(value_to_write).strip()}")
+                continue
+            value_to_write = new_value
+            if source.write:
+                converted_value = source.write(new_value)
+                if converted_value is not None:
+                    value_to_write = converted_value
+
+            if field.is_list:
+                if isinstance(value_to_write, list):
+                    items = _normalize_list(value_to_write)
+                    if current is not None and items == _normalize_list(
+                        current.get(source.tag)
+                    ):
+                        continue
+                    args.append(f"-{source.tag}=")
+                    args.extend(f"-{source.tag}={item}" for item in items)
+            else:
+                value_str = str(value_to_write).strip()
+                if current is not None and _scalar_unchanged(
+                    current.get(source.tag), value_str
+                ):
+                    continue
+                args.append(f"-{source.tag}={value_str}")
     return args
 
 
+def count_written_tags(args: list[str]) -> int:
+    """Returns the number of distinct tags a list of write arguments assigns."""
+    return len({arg[1:].split("=", 1)[0] for arg in args if "=" in arg})
+
+
+# Tags (lowercased) of fields that can be stored in XMP. For files written to a
+# sidecar, their non-XMP sources are not written, since the sidecar overrides them.
+_XMP_COVERED_TAGS = frozenset(
+    tag.lower()
+    for field in METADATA_PLAN.fields
+    if any(t.startswith("XMP-") for t in field.source_tags)
+    for tag in field.source_tags
+)
+
+
+def _route_to_sidecar(
+    args: list[str], sidecars: dict[str, str], seeded: set[str]
+) -> list[list[str]]:
+    """
+    Splits one write command for a file in sidecar mode into the commands that
+    actually run: XMP tags go to the sidecar (seeded with the file's embedded XMP
+    when it is created), and only tags of fields without an XMP source are still
+    written to the file itself. Other commands are returned unchanged. `seeded`
+    holds the sidecars already seeded in this batch, so a later command for the
+    same file does not copy the embedded XMP over the earlier one's values.
+    """
+    targets = [arg for arg in args if not arg.startswith("-")]
+    if len(targets) != 1 or targets[0] not in sidecars:
+        return [args]
+    file_path, sidecar = targets[0], sidecars[targets[0]]
+
+    sidecar_args, file_args = [], []
+    for arg in args:
+        if arg == file_path:
+            continue
+        tag = arg[1:].split("=", 1)[0].rstrip("+-<").lower()
+        if "=" not in arg:
+            sidecar_args.append(arg)
+            file_args.append(arg)
+        elif tag.startswith("xmp"):
+            sidecar_args.append(arg)
+        elif tag not in _XMP_COVERED_TAGS:
+            file_args.append(arg)
+
+    commands = []
+    if any("=" in arg for arg in sidecar_args):
+        if sidecar not in seeded and not os.path.isfile(sidecar):
+            seeded.add(sidecar)
+            commands.append(["-tagsFromFile", file_path, "-XMP:all", sidecar])
+        commands.append(sidecar_args + [sidecar])
+    if any("=" in arg for arg in file_args):
+        commands.append(file_args + [file_path])
+    return commands
+
+
 def run_exiftool_command(args_list: list[str]):
-    """Executes an ExifTool command using a secure temporary file for arguments."""
-    arg_file_path = None
-    try:
-        with tempfile.NamedTemporaryFile(
-            "w", delete=False, encoding="utf-8", suffix=".txt"
-        ) as f:
-            f.write("\n".join(args_list))
-            arg_file_path = f.name
-        command = [EXIFTOOL_PATH, "-overwrite_original", "-m", "-@", arg_file_path]
-        subprocess.run(
-            command, capture_output=True, check=True, text=True, encoding="utf-8"
+    """
+    Executes an ExifTool write command on a pooled process. Arguments are streamed
+    over stdin, so values never pass through a shell or the command line.
+    """
+    result = run_exiftool_batch([args_list])[0]
+    if result.status != 0:
+        raise subprocess.CalledProcessError(
+            result.status, EXIFTOOL_PATH, result.stdout, result.stderr
         )
+
+
+def run_exiftool_batch(commands: list[list[str]]) -> list[ExifToolResult]:
+    """
+    Executes many ExifTool write commands (each a list of tag arguments followed by
+    its target file) as one '-execute'-separated argument stream on a single pooled
+    process. The stream is sent in chunks of EXIFTOOL_WRITE_BATCH_SIZE commands so
+    the per-command output never fills the pipe buffers. Commands for files in
+    sidecar mode are redirected to their sidecars. Returns one result per command,
+    in order; failures are reported per command instead of raised.
+    """
+    sidecars = get_sidecar_paths(
+        [arg for args in commands for arg in args if not arg.startswith("-")]
+    )
+    routed = []  # (index of the original command, is sidecar seeding, args)
+    seeded = set()
+    for index, args in enumerate(commands):
+        for command in _route_to_sidecar(args, sidecars, seeded):
+            routed.append((index, command[0] == "-tagsFromFile", command))
+
+    routed_results = []
+    try:
+        for start in range(0, len(routed), EXIFTOOL_WRITE_BATCH_SIZE):
+            chunk = routed[start : start + EXIFTOOL_WRITE_BATCH_SIZE]
+            routed_results.extend(
+                exiftool_pool.execute_many(
+                    [["-overwrite_original", "-m"] + args for _, _, args in chunk]
+                )
+            )
     finally:
-        if arg_file_path and os.path.exists(arg_file_path):
-            os.remove(arg_file_path)
+        # Invalidated first, in case a write left the file's fingerprint unchanged.
+        written = [arg for args in commands for arg in args if not arg.startswith("-")]
+        invalidate_metadata(written)
+        refresh_metadata(written)
+
+    # Fold the results of split commands back into one per original command. A
+    # seeding failure (e.g. no XMP in the file) does not fail the write itself.
+    results = [ExifToolResult(b"", "", 0) for _ in commands]
+    for (index, is_seed, _), result in zip(routed, routed_results):
+        if is_seed:
+            continue
+        folded = results[index]
+        results[index] = ExifToolResult(
+            folded.stdout + result.stdout,
+            folded.stderr + result.stderr,
+            max(folded.status, result.status),
+        )
+    return results
+
+
+_EXIF_ORIENTATION_TAG = 0x0112
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def _read_raw_preview(file_path: str) -> tuple[bytes | None, int]:
+    """
+    Extracts the embedded JPEG preview and the orientation of a RAW file in a
+    single ExifTool call; with -j, binary tags are returned base64-encoded.
+    """
+    output = exiftool_pool.execute(
+        ["-j", "-n", "-b", "-PreviewImage", "-Orientation", file_path]
+    )
+    data = json.loads(output.decode("utf-8"))[0]
+    preview = data.get("PreviewImage")
+    image_bytes = None
+    if isinstance(preview, str) and preview.startswith("base64:"):
+        image_bytes = base64.b64decode(preview[len("base64:") :])
+    return image_bytes, int(data.get("Orientation") or 1)
+
+
+def _read_exif_orientation(file_path: str) -> int:
+    """Reads the EXIF orientation with Pillow, which only parses the file header."""
+    try:
+        with Image.open(file_path) as image:
+            return int(image.getexif().get(_EXIF_ORIENTATION_TAG) or 1)
+    except Exception:
+        return 1
+
+
+def _set_jpeg_orientation(jpeg_bytes: bytes, orientation: int) -> bytes | None:
+    """
+    Losslessly tags a JPEG with an EXIF orientation by splicing in a minimal APP1
+    segment (and dropping any existing EXIF one), so the browser rotates it on
+    display without us decoding and re-encoding the pixels. Returns None if the
+    JPEG structure is not understood.
+    """
+    if not jpeg_bytes.startswith(b"\xff\xd8"):
+        return None
+    tiff = (
+        b"MM\x00\x2a\x00\x00\x00\x08"
+        + struct.pack(">H", 1)
+        + struct.pack(">HHIHH", _EXIF_ORIENTATION_TAG, 3, 1, orientation, 0)
+        + struct.pack(">I", 0)
+    )
+    payload = b"Exif\x00\x00" + tiff
+    exif_segment = b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+    head = [b"\xff\xd8"]
+    position = 2
+    inserted = False
+    while position + 4 <= len(jpeg_bytes) and jpeg_bytes[position] == 0xFF:
+        marker = jpeg_bytes[position + 1]
+        if marker == 0xDA or not 0xE0 <= marker <= 0xEF:
+            break
+        length = struct.unpack(">H", jpeg_bytes[position + 2 : position + 4])[0]
+        segment = jpeg_bytes[position : position + 2 + length]
+        if marker != 0xE0 and not inserted:
+            head.append(exif_segment)
+            inserted = True
+        if not (marker == 0xE1 and segment[4:10] == b"Exif\x00\x00"):
+            head.append(segment)
+        position += 2 + length
+    if position + 2 > len(jpeg_bytes) or jpeg_bytes[position] != 0xFF:
+        return None
+    if not inserted:
+        head.append(exif_segment)
+    return b"".join(head) + jpeg_bytes[position:]
+
+
+def get_original_image_mime(file_path: str) -> str | None:
+    """
+    Returns the mime type of a file the browser can display correctly as it is on
+    disk (so it can be streamed with range support), or None if it needs
+    get_image_data() to extract a preview or rotate it.
+    """
+    _, extension = os.path.splitext(file_path.lower())
+    if extension in get_setting("powerUser.rawExtensions", []):
+        return None
+    mime_type, _ = mimetypes.guess_type(file_path)
+    if mime_type == "image/jpeg" or (
+        mime_type and _read_exif_orientation(file_path) == 1
+    ):
+        return mime_type
+    return None
 
 
 def get_image_data(file_path: str) -> tuple[bytes | None, str | None]:
     """
     Extracts and correctly orients image data for any supported file type.
+    JPEG data is never re-encoded: originals already carry their EXIF orientation,
+    and RAW previews get it spliced in, so the browser applies the rotation.
     """
     if not os.path.isfile(file_path):
         return None, None
 
     _, extension = os.path.splitext(file_path.lower())
     raw_extensions = get_setting("powerUser.rawExtensions", [])
-    image_bytes = None
-    mime_type = None
 
     try:
         if extension in raw_extensions:
-            preview_command = [EXIFTOOL_PATH, "-PreviewImage", "-b", file_path]
-            result = subprocess.run(preview_command, capture_output=True, check=True)
-            image_bytes = result.stdout
+            image_bytes, orientation = _read_raw_preview(file_path)
             mime_type = "image/jpeg"
+            if image_bytes and orientation != 1:
+                tagged_bytes = _set_jpeg_orientation(image_bytes, orientation)
+                if tagged_bytes:
+                    return tagged_bytes, mime_type
         else:
             with open(file_path, "rb") as f:
                 image_bytes = f.read()
             mime_type, _ = mimetypes.guess_type(file_path)
+            if mime_type == "image/jpeg":
+                return image_bytes, mime_type
+            orientation = _read_exif_orientation(file_path)
 
         if not image_bytes:
             return None, None
-        orientation_command = [EXIFTOOL_PATH, "-j", "-n", "-Orientation", file_path]
-        orientation_result = subprocess.run(
-            orientation_command, capture_output=True, check=True, text=True
-        )
-        orientation_data = json.loads(orientation_result.stdout)
-        orientation = orientation_data[0].get("Orientation", 1)
-
         if orientation == 1:
             return image_bytes, mime_type
 
+        # Formats the browser will not rotate by itself are decoded and rotated here.
         image = Image.open(BytesIO(image_bytes))
-        orientation_map = {
-            3: Image.Transpose.ROTATE_180,
-            6: Image.Transpose.ROTATE_270,
-            8: Image.Transpose.ROTATE_90,
-        }
-        if orientation in orientation_map:
-            image = image.transpose(orientation_map[orientation])
+        if orientation in _ORIENTATION_TRANSPOSE:
+            image = image.transpose(_ORIENTATION_TRANSPOSE[orientation])
+        if image.mode != "RGB":
+            image = image.convert("RGB")
 
         byte_buffer = BytesIO()
         image.save(byte_buffer, format="JPEG")
@@ -0,0 +1,308 @@
+import atexit
+import os
+import queue
+import re
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+from config import EXIFTOOL_PATH, EXIFTOOL_POOL_SIZE
+
+
+class ExifToolResult(NamedTuple):
+    stdout: bytes
+    stderr: str
+    status: int
+
+
+class _StderrReader:
+    """
+    Drains a process's stderr on a background thread. ExifTool writes warnings
+    there while we are still waiting for its stdout, and would block once the
+    pipe buffer is full if nobody read them.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._condition = threading.Condition()
+        self._buffer = b""
+        self._closed = False
+        threading.Thread(target=self._run, name="exiftool-stderr", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                chunk = os.read(self._stream.fileno(), 65536)
+            except (OSError, ValueError):
+                chunk = b""
+            with self._condition:
+                if chunk:
+                    self._buffer += chunk
+                else:
+                    self._closed = True
+                self._condition.notify_all()
+            if not chunk:
+                return
+
+    def read_until(self, marker: re.Pattern) -> re.Match | None:
+        """Waits until the marker appears and consumes the output up to it."""
+        search_from = 0
+        with self._condition:
+            while True:
+                match = marker.search(self._buffer, search_from)
+                if match:
+                    self._buffer = self._buffer[match.end() :]
+                    return match
+                if self._closed:
+                    return None
+                # Markers are short, so only the tail of the old data needs rescanning.
+                search_from = max(0, len(self._buffer) - 64)
+                self._condition.wait()
+
+
+class ExifToolProcess:
+    """
+    A single long-lived ExifTool process running in '-stay_open' mode.
+    Arguments are streamed over stdin, one per line, and every command is framed
+    by a numbered '-execute' so its output can be told apart from the next one.
+    """
+
+    def __init__(self, executable: str = EXIFTOOL_PATH):
+        self.executable = executable
+        self._process = None
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._stdout_buffer = b""
+        self._stderr = None
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        command = [
+            self.executable,
+            "-stay_open",
+            "True",
+            "-@",
+            "-",
+            # Arguments arrive as UTF-8 text, so file names must be read the same way.
+            "-common_args",
+            "-charset",
+            "filename=utf8",
+        ]
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._stdout_buffer = b""
+        self._stderr = _StderrReader(self._process.stderr)
+
+    def stop(self):
+        """Asks ExifTool to exit gracefully, killing it if it does not comply."""
+        process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.stdin.write(b"-stay_open\nFalse\n")
+            process.stdin.flush()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+
+    def execute(self, args: list[str]) -> ExifToolResult:
+        return self.execute_many([args])[0]
+
+    def execute_many(
+        self, commands: list[list[str]], results: list | None = None
+    ) -> list[ExifToolResult]:
+        """
+        Sends several commands in one write and collects their results in order.
+        The caller is responsible for keeping the batch small enough that the
+        combined output does not fill the pipe buffers. Results are appended to
+        `results` as they arrive, so after a failure it holds those of the
+        commands that completed.
+        """
+        if results is None:
+            results = []
+        with self._lock:
+            if not self.is_alive():
+                self.start()
+
+            sequences = []
+            lines = []
+            for args in commands:
+                self._sequence += 1
+                sequences.append(self._sequence)
+                lines.extend(args)
+                # ExifTool echoes this to stderr once the command has finished,
+                # which both frames stderr and reports the command's exit status.
+                lines.extend(["-echo4", f"{{ready{self._sequence}:${{status}}}}"])
+                lines.append(f"-execute{self._sequence}")
+
+            try:
+                self._process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+                self._process.stdin.flush()
+                for sequence in sequences:
+                    results.append(self._read_result(sequence))
+                return results
+            except Exception:
+                # The stream is out of sync (or the process is gone); start over.
+                self.stop()
+                raise
+
+    def _read_result(self, sequence: int) -> ExifToolResult:
+        stdout_marker = re.compile(rb"\{ready%d\}\r?\n" % sequence)
+        # Releases before ExifTool 12.10 leave '${status}' unexpanded; treat that as success.
+        stderr_marker = re.compile(rb"\{ready%d:(-?\d+|\$\{status\})\}\r?\n" % sequence)
+
+        stdout_match, self._stdout_buffer = self._read_until(
+            self._process.stdout, self._stdout_buffer, stdout_marker
+        )
+        stderr_match = self._stderr.read_until(stderr_marker)
+        if stderr_match is None:
+            raise subprocess.CalledProcessError(
+                self._process.poll() or -1,
+                self.executable,
+                stderr="ExifTool process terminated unexpectedly",
+            )
+        stdout = stdout_match.string[: stdout_match.start()]
+        stderr = stderr_match.string[: stderr_match.start()]
+        status = stderr_match.group(1)
+        return ExifToolResult(
+            stdout=stdout,
+            stderr=stderr.decode("utf-8", errors="replace"),
+            status=0 if status == b"${status}" else int(status),
+        )
+
+    def _read_until(self, stream, buffer: bytes, marker: re.Pattern):
+        """Reads from a pipe until the marker appears; returns the match and the leftover."""
+        search_from = 0
+        while True:
+            match = marker.search(buffer, search_from)
+            if match:
+                return match, buffer[match.end() :]
+            # Markers are short, so only the tail of the old data needs rescanning.
+            search_from = max(0, len(buffer) - 64)
+            chunk = os.read(stream.fileno(), 65536)
+            if not chunk:
+                raise subprocess.CalledProcessError(
+                    self._process.poll() or -1,
+                    self.executable,
+                    stderr="ExifTool process terminated unexpectedly",
+                )
+            buffer += chunk
+
+
+# Options that modify files besides tag assignments such as '-TAG=VALUE'.
+_WRITE_OPTIONS = {
+    "-tagsfromfile",
+    "-overwrite_original",
+    "-overwrite_original_in_place",
+    "-delete_original",
+    "-delete_original!",
+    "-restore_original",
+    "-geotag",
+    "-o",
+    "-out",
+}
+
+
+def _writes(args: list[str]) -> bool:
+    """Tells whether a command may modify a file (conservatively)."""
+    return any(
+        arg.startswith("-")
+        and ("=" in arg or "<" in arg or arg.lower() in _WRITE_OPTIONS)
+        for arg in args
+    )
+
+
+def _error_text(error: Exception) -> str:
+    stderr = getattr(error, "stderr", None)
+    return stderr if isinstance(stderr, str) and stderr else str(error)
+
+
+class ExifToolPool:
+    """
+    A bounded pool of ExifToolProcess workers. Workers are started lazily, checked
+    for liveness before every use and transparently restarted after a crash.
+    """
+
+    def __init__(self, size: int = EXIFTOOL_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def worker(self):
+        """Checks out a worker for exclusive use, blocking while all are busy."""
+        process = self._acquire()
+        try:
+            yield process
+        finally:
+            self._idle.put(process)
+
+    def _acquire(self) -> ExifToolProcess:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return ExifToolProcess()
+        return self._idle.get()
+
+    def execute(self, args: list[str], check: bool = True) -> bytes:
+        """
+        Runs a single ExifTool command and returns its raw stdout. Mirrors
+        subprocess.run(check=True) by raising CalledProcessError on a non-zero status.
+        """
+        result = self.execute_many([args])[0]
+        if check and result.status != 0:
+            raise subprocess.CalledProcessError(
+                result.status, args, output=result.stdout, stderr=result.stderr
+            )
+        return result.stdout
+
+    def execute_many(self, commands: list[list[str]]) -> list[ExifToolResult]:
+        """
+        Runs several commands on one worker. If the worker crashes, the commands
+        that did not complete are retried once on a fresh process, unless one of
+        them writes: it may already have been applied, so those commands are
+        reported as failed instead of being run twice.
+        """
+        if not commands:
+            return []
+        with self.worker() as process:
+            results = []
+            try:
+                return process.execute_many(commands, results)
+            except (OSError, subprocess.CalledProcessError) as e:
+                remaining = commands[len(results) :]
+                if any(_writes(args) for args in remaining):
+                    message = f"ExifTool failed while writing: {_error_text(e)}"
+                    return results + [
+                        ExifToolResult(b"", message, 1) for _ in remaining
+                    ]
+                # execute_many() has already stopped the broken process, so this
+                # retry runs on a freshly started one.
+                return results + process.execute_many(remaining)
+
+    def close(self):
+        """Stops all idle workers. Called automatically at interpreter exit."""
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            process.stop()
+            with self._lock:
+                self._created -= 1
+
+
+exiftool_pool = ExifToolPool()
+atexit.register(exiftool_pool.close)
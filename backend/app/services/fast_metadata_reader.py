@@ -0,0 +1,384 @@
+# An in-process reader for the subset of metadata the application works with.
+# It parses the EXIF IFDs and the XMP packet of JPEG and TIFF files directly and
+# reproduces the record ExifTool prints for 'exiftool -j -G1 -n -a <tags>'.
+# Whenever a file contains anything this reader cannot reproduce faithfully
+# (maker notes, extended XMP, unusual structures, ...), it returns None and the
+# caller falls back to ExifTool.
+
+import os
+import re
+import mmap
+import struct
+import xml.etree.ElementTree as ET
+
+FAST_READER_EXTENSIONS = (".jpg", ".jpeg", ".tif", ".tiff")
+
+_XMP_APP1_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+_XMP_EXTENSION_HEADER = b"http://ns.adobe.com/xmp/extension/\x00"
+_EXIF_APP1_HEADER = b"Exif\x00\x00"
+
+_RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+_IPTC_EXT = "{http://iptc.org/std/Iptc4xmpExt/2008-02-29/}"
+_EXIF_NS = "{http://ns.adobe.com/exif/1.0/}"
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+# EXIF tags we read, per IFD, with the group-qualified name ExifTool reports.
+_IFD0_TAGS = {0x013B: "IFD0:Artist", 0x8298: "IFD0:Copyright"}
+_EXIF_IFD_TAGS = {
+    0x9003: "ExifIFD:DateTimeOriginal",
+    0x9004: "ExifIFD:CreateDate",
+    0x9011: "ExifIFD:OffsetTimeOriginal",
+}
+_MAKE, _EXIF_POINTER, _GPS_POINTER, _XMP_TAG, _MAKER_NOTE = (
+    0x010F,
+    0x8769,
+    0x8825,
+    0x02BC,
+    0x927C,
+)
+
+_DC_PROPERTIES = {
+    f"{_DC}title": ("XMP-dc:Title", "lang-alt"),
+    f"{_DC}subject": ("XMP-dc:Subject", "list"),
+    f"{_DC}creator": ("XMP-dc:Creator", "list"),
+    f"{_DC}rights": ("XMP-dc:Rights", "lang-alt"),
+    f"{_DC}date": ("XMP-dc:Date", "date-list"),
+}
+_LOCATION_PROPERTIES = {
+    f"{_IPTC_EXT}LocationCreated": "XMP-iptcExt:LocationCreated",
+    f"{_IPTC_EXT}LocationShown": "XMP-iptcExt:LocationShown",
+}
+_LOCATION_FIELDS = {
+    f"{_IPTC_EXT}Sublocation": ("Sublocation", None),
+    f"{_IPTC_EXT}City": ("City", None),
+    f"{_IPTC_EXT}ProvinceState": ("ProvinceState", None),
+    f"{_IPTC_EXT}CountryName": ("CountryName", None),
+    f"{_IPTC_EXT}CountryCode": ("CountryCode", None),
+    f"{_EXIF_NS}GPSLatitude": ("GPSLatitude", "gps"),
+    f"{_EXIF_NS}GPSLongitude": ("GPSLongitude", "gps"),
+}
+_XMP_GPS_PROPERTIES = (f"{_EXIF_NS}GPSLatitude", f"{_EXIF_NS}GPSLongitude")
+
+# ExifTool prints string values that look like numbers as JSON numbers.
+_JSON_NUMBER = re.compile(r"^-?(\d|[1-9]\d{1,14})(\.\d{1,16})?(e[-+]?\d{1,3})?$", re.I)
+_XMP_DATE = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}:\d{2})(:\d{2}(?:\.\d+)?)?)?(.*)$"
+)
+_XMP_GPS = re.compile(r"^(\d+(?:\.\d+)?),(\d+(?:\.\d+)?)(?:,(\d+(?:\.\d+)?))?([NSEW])$")
+
+
+class _Unsupported(Exception):
+    """Raised internally when a file needs ExifTool to be read faithfully."""
+
+
+def read_fast_metadata(file_path: str, tags: set[str]) -> dict | None:
+    """
+    Returns the '-G1 -n' record for the requested tags, or None if ExifTool must be
+    used instead. Only JPEG and TIFF files are handled.
+    """
+    if not file_path.lower().endswith(FAST_READER_EXTENSIONS):
+        return None
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < 8:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:2] == b"\xff\xd8":
+                    exif, xmp = _find_jpeg_segments(data)
+                else:
+                    exif, xmp = data, None
+                values = {}
+                if exif is not None:
+                    xmp_from_tiff = _read_exif(exif, values)
+                    xmp = xmp if xmp is not None else xmp_from_tiff
+                if xmp is not None:
+                    _read_xmp(xmp, values)
+    except (_Unsupported, OSError, ValueError, struct.error, ET.ParseError):
+        return None
+
+    record = {"SourceFile": file_path}
+    for tag, value in values.items():
+        if tag in tags:
+            record[tag] = value
+    return record
+
+
+def _find_jpeg_segments(data) -> tuple[bytes | None, bytes | None]:
+    """Returns the TIFF block of the EXIF APP1 segment and the XMP packet, if any."""
+    exif, xmp = None, None
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            raise _Unsupported()
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in (0xD9, 0xDA):
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            position += 2
+            continue
+        length = struct.unpack(">H", data[position + 2 : position + 4])[0]
+        start, end = position + 4, position + 2 + length
+        if marker == 0xE1:
+            if data[start : start + 6] == _EXIF_APP1_HEADER:
+                if exif is not None:
+                    raise _Unsupported()
+                exif = data[start + 6 : end]
+            elif data[start : start + len(_XMP_APP1_HEADER)] == _XMP_APP1_HEADER:
+                if xmp is not None:
+                    raise _Unsupported()
+                xmp = data[start + len(_XMP_APP1_HEADER) : end]
+            elif (
+                data[start : start + len(_XMP_EXTENSION_HEADER)]
+                == _XMP_EXTENSION_HEADER
+            ):
+                raise _Unsupported()
+        position = end
+    return exif, xmp
+
+
+class _Tiff:
+    # Type 13 (IFD) is a LONG used by some writers for sub-IFD pointers.
+    _FORMATS = {3: "H", 4: "I", 13: "I"}
+    _SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8, 13: 4}
+
+    def __init__(self, data):
+        self.data = data
+        if data[:2] == b"II":
+            self.order = "<"
+        elif data[:2] == b"MM":
+            self.order = ">"
+        else:
+            raise _Unsupported()
+        if struct.unpack(self.order + "H", data[2:4])[0] != 42:
+            raise _Unsupported()
+        self.ifd0 = struct.unpack(self.order + "I", data[4:8])[0]
+
+    def entries(self, offset: int) -> dict:
+        """Returns {tag id: (type, raw bytes)} for one IFD."""
+        data, order = self.data, self.order
+        if offset + 2 > len(data):
+            raise _Unsupported()
+        count = struct.unpack(order + "H", data[offset : offset + 2])[0]
+        result = {}
+        for i in range(count):
+            entry = offset + 2 + i * 12
+            tag, kind, n = struct.unpack(order + "HHI", data[entry : entry + 8])
+            if kind not in self._SIZES:
+                continue
+            size = self._SIZES[kind] * n
+            if size <= 4:
+                raw = data[entry + 8 : entry + 8 + size]
+            else:
+                value_offset = struct.unpack(order + "I", data[entry + 8 : entry + 12])[
+                    0
+                ]
+                if value_offset + size > len(data):
+                    raise _Unsupported()
+                raw = data[value_offset : value_offset + size]
+            result[tag] = (kind, bytes(raw))
+        return result
+
+    def integer(self, entry) -> int:
+        kind, raw = entry
+        if kind not in self._FORMATS:
+            raise _Unsupported()
+        return struct.unpack(
+            self.order + self._FORMATS[kind], raw[: self._SIZES[kind]]
+        )[0]
+
+    def rationals(self, entry) -> list[float]:
+        kind, raw = entry
+        if kind != 5:
+            raise _Unsupported()
+        values = []
+        for i in range(0, len(raw), 8):
+            numerator, denominator = struct.unpack(self.order + "II", raw[i : i + 8])
+            if denominator == 0:
+                raise _Unsupported()
+            values.append(numerator / denominator)
+        return values
+
+
+def _exif_string(entry) -> str:
+    kind, raw = entry
+    if kind != 2:
+        raise _Unsupported()
+    text, _, rest = raw.partition(b"\x00")
+    # A second null-separated part (e.g. the editor's copyright) needs ExifTool.
+    if rest.strip(b"\x00"):
+        raise _Unsupported()
+    return text.decode("utf-8")
+
+
+def _read_exif(block, values: dict):
+    """Reads IFD0, the EXIF IFD and the GPS IFD. Returns the TIFF XMP packet, if any."""
+    tiff = _Tiff(block)
+    ifd0 = tiff.entries(tiff.ifd0)
+
+    if _MAKE in ifd0 and _exif_string(ifd0[_MAKE]).lower().startswith("canon"):
+        # Canon:TimeZone lives in the maker notes, which we do not decode.
+        raise _Unsupported()
+
+    for tag_id, tag in _IFD0_TAGS.items():
+        if tag_id in ifd0:
+            values[tag] = _json_value(_exif_string(ifd0[tag_id]))
+
+    if _EXIF_POINTER in ifd0:
+        exif_ifd = tiff.entries(tiff.integer(ifd0[_EXIF_POINTER]))
+        for tag_id, tag in _EXIF_IFD_TAGS.items():
+            if tag_id in exif_ifd:
+                values[tag] = _json_value(_exif_string(exif_ifd[tag_id]))
+
+    if _GPS_POINTER in ifd0:
+        gps = tiff.entries(tiff.integer(ifd0[_GPS_POINTER]))
+        for ref_id, value_id, tag, negative in (
+            (1, 2, "Composite:GPSLatitude", "S"),
+            (3, 4, "Composite:GPSLongitude", "W"),
+        ):
+            if (ref_id in gps) != (value_id in gps):
+                raise _Unsupported()
+            if value_id in gps:
+                parts = tiff.rationals(gps[value_id]) + [0.0, 0.0]
+                degrees = parts[0] + (parts[1] + parts[2] / 60) / 60
+                if _exif_string(gps[ref_id]).upper().startswith(negative):
+                    degrees = -degrees
+                values[tag] = _perl_number(degrees)
+
+    if _XMP_TAG in ifd0:
+        return ifd0[_XMP_TAG][1]
+    return None
+
+
+def _read_xmp(packet, values: dict):
+    root = ET.fromstring(bytes(packet).strip(b"\x00 \r\n\t"))
+    descriptions = [
+        description
+        for rdf in root.iter(f"{_RDF}RDF")
+        for description in rdf
+        if description.tag == f"{_RDF}Description"
+    ]
+    for description in descriptions:
+        for name, text in description.attrib.items():
+            if name in _DC_PROPERTIES:
+                tag, kind = _DC_PROPERTIES[name]
+                _store(values, tag, _convert(text, kind))
+            elif name in _LOCATION_PROPERTIES or name in _XMP_GPS_PROPERTIES:
+                raise _Unsupported()
+        for element in description:
+            if element.tag in _DC_PROPERTIES:
+                tag, kind = _DC_PROPERTIES[element.tag]
+                value = _xmp_property_value(element, kind)
+                if value is not None:
+                    _store(values, tag, value)
+            elif element.tag in _LOCATION_PROPERTIES:
+                _read_location(element, _LOCATION_PROPERTIES[element.tag], values)
+            elif element.tag in _XMP_GPS_PROPERTIES:
+                # XMP-exif GPS feeds ExifTool's composite tags; leave that to ExifTool.
+                raise _Unsupported()
+
+
+def _store(values: dict, tag: str, value):
+    if tag in values:
+        raise _Unsupported()
+    values[tag] = value
+
+
+def _xmp_property_value(element, kind: str):
+    container = next(
+        (c for c in element if c.tag in (f"{_RDF}Alt", f"{_RDF}Bag", f"{_RDF}Seq")),
+        None,
+    )
+    if container is None:
+        if len(element):
+            raise _Unsupported()
+        return _convert(element.text or "", kind)
+
+    items = [li for li in container if li.tag == f"{_RDF}li"]
+    if any(len(li) for li in items):
+        raise _Unsupported()
+    if kind == "lang-alt":
+        default = next((li for li in items if li.get(_XML_LANG) == "x-default"), None)
+        if default is None:
+            raise _Unsupported()
+        return _convert(default.text or "", kind)
+    converted = [_convert(li.text or "", kind) for li in items]
+    if not converted:
+        return None
+    # ExifTool prints single-item lists as plain values.
+    return converted[0] if len(converted) == 1 else converted
+
+
+def _read_location(element, prefix: str, values: dict):
+    """Flattens an IPTC Extension location structure into its ExifTool tag names."""
+    bag = next((c for c in element if c.tag == f"{_RDF}Bag"), None)
+    if bag is None:
+        raise _Unsupported()
+    items = [li for li in bag if li.tag == f"{_RDF}li"]
+    if len(items) != 1:
+        raise _Unsupported()
+
+    item = items[0]
+    if item.get(f"{_RDF}parseType") == "Resource":
+        fields = {child.tag: child.text or "" for child in item if not len(child)}
+    else:
+        descriptions = [c for c in item if c.tag == f"{_RDF}Description"]
+        if len(descriptions) != 1:
+            raise _Unsupported()
+        fields = dict(descriptions[0].attrib)
+        fields.update(
+            {child.tag: child.text or "" for child in descriptions[0] if not len(child)}
+        )
+
+    for name, text in fields.items():
+        if name not in _LOCATION_FIELDS:
+            continue
+        suffix, kind = _LOCATION_FIELDS[name]
+        _store(values, f"{prefix}{suffix}", _convert(text, kind))
+
+
+def _convert(text: str, kind: str | None):
+    if kind == "date-list":
+        return _json_value(_xmp_date(text))
+    if kind == "gps":
+        return _xmp_gps(text)
+    return _json_value(text)
+
+
+def _xmp_date(text: str) -> str:
+    match = _XMP_DATE.match(text.strip())
+    if not match:
+        raise _Unsupported()
+    year, month, day, hour_minute, seconds, zone = match.groups()
+    result = f"{year}:{month}:{day}"
+    if hour_minute:
+        result += f" {hour_minute}{seconds or ''}{zone}"
+    elif zone:
+        raise _Unsupported()
+    return result
+
+
+def _xmp_gps(text: str) -> float:
+    match = _XMP_GPS.match(text.strip())
+    if not match:
+        raise _Unsupported()
+    degrees, minutes, seconds, direction = match.groups()
+    value = float(degrees) + (float(minutes) + float(seconds or 0) / 60) / 60
+    return _perl_number(-value if direction in "SW" else value)
+
+
+def _perl_number(value: float) -> float | int:
+    """Rounds like Perl's default number stringification, which ExifTool prints."""
+    return _json_value(f"{value:.15g}")
+
+
+def _json_value(text: str):
+    if _JSON_NUMBER.match(text):
+        number = float(text)
+        return (
+            int(text) if number.is_integer() and text.lstrip("-").isdigit() else number
+        )
+    return text
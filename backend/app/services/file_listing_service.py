@@ -0,0 +1,141 @@
+import os
+import json
+import base64
+import heapq
+from config import LISTING_MAX_DEPTH
+from app.services.settings_service import get_setting
+
+SORT_KEYS = ("name", "mtime", "size")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not fit the query."""
+
+
+def get_listed_extensions() -> tuple[str, ...]:
+    """
+    Returns the lowercased extensions shown in the gallery: the regular image
+    formats plus the RAW formats from the settings. Sidecars are never listed.
+    """
+    extensions = tuple(get_setting("powerUser.imageExtensions", ())) + tuple(
+        get_setting("powerUser.rawExtensions", ())
+    )
+    return tuple(
+        extension.lower() for extension in extensions if extension.lower() != ".xmp"
+    )
+
+
+def _scan(folder_path: str, extensions: tuple[str, ...], max_depth: int):
+    """
+    Yields (relative name, DirEntry) for every image below `folder_path`, descending
+    at most `max_depth - 1` levels of subfolders. DirEntry caches its stat result,
+    which on Windows comes with the directory listing itself.
+    """
+    pending = [(folder_path, "", 1)]
+    while pending:
+        directory, prefix, depth = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = prefix + entry.name
+                    if entry.is_file() and entry.name.lower().endswith(extensions):
+                        yield name, entry
+                    elif (
+                        depth < max_depth
+                        and not entry.name.startswith(".")
+                        and entry.is_dir(follow_symlinks=False)
+                    ):
+                        pending.append((entry.path, name + os.sep, depth + 1))
+        except OSError:
+            # An unreadable subfolder must not break the whole listing.
+            if directory == folder_path:
+                raise
+
+
+def is_in_listing_scope(relative_name: str, recursive: bool = False) -> bool:
+    """
+    Tells whether a path relative to a folder lies where list_folder_images looks
+    for images: at most LISTING_MAX_DEPTH levels deep (the folder itself when not
+    recursive) and not inside a hidden subfolder.
+    """
+    folders = relative_name.split(os.sep)[:-1]
+    max_depth = LISTING_MAX_DEPTH if recursive else 1
+    return len(folders) < max_depth and not any(
+        folder.startswith(".") for folder in folders
+    )
+
+
+def _sort_value(item: dict, sort: str):
+    if sort == "name":
+        return item["name"].lower()
+    return item[sort]
+
+
+def encode_cursor(sort: str, descending: bool, item: dict) -> str:
+    payload = [sort, descending, _sort_value(item, sort), item["name"]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_sort, cursor_descending, value, name = payload
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if cursor_sort != sort or cursor_descending != descending:
+        raise InvalidCursorError("Cursor does not match the requested sort order")
+    return value, name
+
+
+def list_folder_images(
+    folder_path: str,
+    sort: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+    cursor: str | None = None,
+    recursive: bool = False,
+    max_depth: int | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    Lists the images of a folder as {name, size, mtime} dicts, where name is the path
+    relative to the folder. Without a sort key, entries are returned in directory
+    order. With a limit, only that page is returned together with a cursor for the
+    next one (None on the last page); a page costs one directory scan and a
+    partial sort instead of sorting the whole folder.
+    """
+    if sort is not None and sort not in SORT_KEYS:
+        raise ValueError(f"Unsupported sort key '{sort}'")
+    if recursive:
+        max_depth = min(max_depth or LISTING_MAX_DEPTH, LISTING_MAX_DEPTH)
+    else:
+        max_depth = 1
+
+    items = []
+    for name, entry in _scan(folder_path, get_listed_extensions(), max_depth):
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        items.append({"name": name, "size": stat.st_size, "mtime": stat.st_mtime})
+
+    if sort is None:
+        if cursor is not None:
+            raise InvalidCursorError("A cursor requires a sort key")
+        return (items[:limit] if limit else items), None
+
+    def key(item):
+        return (_sort_value(item, sort), item["name"])
+
+    if cursor is not None:
+        after = tuple(decode_cursor(cursor, sort, descending))
+        if descending:
+            items = [item for item in items if key(item) < after]
+        else:
+            items = [item for item in items if key(item) > after]
+
+    if limit is None or limit >= len(items):
+        items.sort(key=key, reverse=descending)
+        return items, None
+    select = heapq.nlargest if descending else heapq.nsmallest
+    page = select(limit, items, key=key)
+    return page, encode_cursor(sort, descending, page[-1])
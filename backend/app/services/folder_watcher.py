@@ -0,0 +1,281 @@
+import os
+import queue
+import threading
+from config import (
+    WATCHER_DEBOUNCE_SECONDS,
+    WATCHER_POLL_INTERVAL,
+    WATCHER_STOP_TIMEOUT_SECONDS,
+)
+from app.services.exif_service import (
+    get_sidecar_extensions,
+    invalidate_metadata,
+    refresh_metadata,
+)
+from app.services.file_listing_service import get_listed_extensions
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog is optional; fall back to polling the folder.
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """Forwards watchdog's native (inotify, FSEvents, ReadDirectoryChangesW) events."""
+
+    def __init__(self, watcher: "FolderWatcher"):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.record("added", event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.record("changed", event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.watcher.record("removed", event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.record("renamed", event.dest_path, event.src_path)
+
+
+class _FolderPoller:
+    """Detects changes by comparing directory snapshots when watchdog is unavailable."""
+
+    def __init__(self, watcher: "FolderWatcher", folder_path: str):
+        self.watcher = watcher
+        self.folder_path = folder_path
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _snapshot(self) -> dict:
+        snapshot = {}
+        try:
+            with os.scandir(self.folder_path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.path] = (
+                            stat.st_ino,
+                            stat.st_size,
+                            stat.st_mtime_ns,
+                        )
+        except OSError:
+            pass
+        return snapshot
+
+    def _run(self):
+        previous = self._snapshot()
+        while not self._stop.wait(WATCHER_POLL_INTERVAL):
+            current = self._snapshot()
+            removed = {path: previous[path] for path in previous.keys() - current}
+            # A file that disappeared and reappeared under another name with the
+            # same inode was renamed.
+            removed_by_inode = {
+                state[0]: path for path, state in removed.items() if state[0]
+            }
+            for path in current.keys() - previous:
+                old_path = removed_by_inode.pop(current[path][0], None)
+                if old_path:
+                    removed.pop(old_path)
+                    self.watcher.record("renamed", path, old_path)
+                else:
+                    self.watcher.record("added", path)
+            for path in removed:
+                self.watcher.record("removed", path)
+            for path in current.keys() & previous:
+                if current[path] != previous[path]:
+                    self.watcher.record("changed", path)
+            previous = current
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+
+def _join(observer):
+    """Waits for a stopped observer's thread, bounded so a stuck one cannot hang us."""
+    if observer is not None:
+        observer.join(WATCHER_STOP_TIMEOUT_SECONDS)
+
+
+class FolderWatcher:
+    """
+    Watches the currently opened folder and publishes debounced change events
+    ({type: added|changed|removed|renamed, path[, oldPath]}) to subscribers.
+    Before the events go out, removed files are purged from the metadata stores
+    and the others are re-read if their fingerprint changed, so a client reacting
+    to them reads fresh data and search finds the new values. Our own saves have
+    already been re-read and are left alone. Thumbnails need no invalidation as
+    their cache key includes the file's size and mtime.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._folder = None
+        self._observer = None
+        self._pending = {}  # path -> event, in arrival order
+        self._timer = None
+        self._subscribers = set()
+
+    @property
+    def folder(self) -> str | None:
+        return self._folder
+
+    def watch(self, folder_path: str):
+        """Starts watching `folder_path`, replacing the previously watched folder."""
+        folder_path = os.path.abspath(folder_path)
+        with self._lock:
+            if folder_path == self._folder:
+                return
+            previous = self._stop_observer()
+            self._folder = folder_path
+            self._pending.clear()
+            if Observer is not None:
+                self._observer = Observer()
+                self._observer.schedule(
+                    _WatchdogHandler(self), folder_path, recursive=False
+                )
+            else:
+                self._observer = _FolderPoller(self, folder_path)
+            self._observer.start()
+        _join(previous)
+
+    def stop(self):
+        with self._lock:
+            previous = self._stop_observer()
+            self._folder = None
+        _join(previous)
+
+    def _stop_observer(self):
+        # Called with the lock held. Returns the stopped observer, which the
+        # caller joins after releasing the lock: its thread may be waiting for
+        # the lock in record() to deliver a last event.
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return observer
+
+    def record(self, event_type: str, path: str, old_path: str | None = None):
+        """Queues a raw event and (re)starts the debounce timer."""
+        if any(p and p.lower().endswith(".xmp") for p in (path, old_path)):
+            # Any sidecar activity changes the metadata of its image.
+            image = self._image_for(path) or (
+                self._image_for(old_path) if old_path else None
+            )
+            if image is None:
+                return
+            event_type, path, old_path = "changed", image, None
+        else:
+            path = self._image_for(path)
+            old_path = self._image_for(old_path) if old_path else None
+            if path is None and old_path is None:
+                return
+            if path is None:
+                event_type, path, old_path = "removed", old_path, None
+            elif old_path is None and event_type == "renamed":
+                event_type = "added"
+
+        with self._lock:
+            self._merge(event_type, path, old_path)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(WATCHER_DEBOUNCE_SECONDS, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _image_for(self, path: str) -> str | None:
+        """
+        Maps a path to the image whose metadata it affects: images themselves, and
+        the image an '.xmp' sidecar belongs to. Only files in sidecar mode read a
+        sidecar, so of a RAW+JPEG pair it is the RAW's. Other files are ignored.
+        """
+        stem, extension = os.path.splitext(path)
+        extension = extension.lower()
+        if extension == ".xmp":
+            for image_extension in sorted(get_sidecar_extensions()):
+                for candidate in (
+                    stem + image_extension,
+                    stem + image_extension.upper(),
+                ):
+                    if os.path.isfile(candidate):
+                        return candidate
+            return None
+        return path if extension in get_listed_extensions() else None
+
+    def _merge(self, event_type: str, path: str, old_path: str | None):
+        # Called with the lock held. Collapses a burst of events per file into
+        # the net effect, e.g. a file written in several steps is one 'added'.
+        if event_type == "renamed":
+            previous = self._pending.pop(old_path, None)
+            if previous and previous["type"] == "added":
+                self._pending[path] = {"type": "added", "path": path}
+            else:
+                self._pending[path] = {
+                    "type": "renamed",
+                    "path": path,
+                    "oldPath": old_path,
+                }
+            return
+
+        previous = self._pending.get(path)
+        if previous is None:
+            self._pending[path] = {"type": event_type, "path": path}
+            return
+        if previous["type"] == "added":
+            if event_type == "removed":
+                del self._pending[path]
+            return
+        if previous["type"] == "removed" and event_type == "added":
+            self._pending[path] = {"type": "changed", "path": path}
+            return
+        if event_type == "removed":
+            self._pending[path] = {"type": "removed", "path": path}
+
+    def _flush(self):
+        with self._lock:
+            events = list(self._pending.values())
+            self._pending.clear()
+            self._timer = None
+            subscribers = list(self._subscribers)
+        if not events:
+            return
+        invalidate_metadata(
+            [event["path"] for event in events if event["type"] == "removed"]
+            + [event["oldPath"] for event in events if "oldPath" in event]
+        )
+        refresh_metadata(
+            [event["path"] for event in events if event["type"] != "removed"]
+        )
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(events)
+            except queue.Full:
+                # A stalled client misses events and has to reload the folder.
+                pass
+
+    def subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+
+folder_watcher = FolderWatcher()
@@ -5,7 +5,7 @@ import gpxpy
 from datetime import datetime, timezone, timedelta
 
 from config import GEOPY_USER_AGENT
-from app.services.settings_service import load_settings
+from app.services.settings_service import get_country_names
 
 
 def enrich_coordinates(coordinates: List[Dict[str, float]]) -> List[Dict[str, Any]]:
@@ -13,10 +13,8 @@ def enrich_coordinates(coordinates: List[Dict[str, float]]) -> List[Dict[str, An
     Enriches a list of GPS coordinates with address details using reverse geocoding.
     It uses the user-configured country mappings for standardization.
     """
-    settings = load_settings()
-    country_mappings = settings.get("countryMappings", [])
-    # Create a lookup map from uppercase code to the user's defined name
-    code_to_name_map = {m["code"].upper(): m["name"] for m in country_mappings}
+    # A lookup map from uppercase code to the user's defined name
+    code_to_name_map = get_country_names()
 
     geolocator = Nominatim(user_agent=GEOPY_USER_AGENT)
     enriched_locations = []
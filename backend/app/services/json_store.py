@@ -0,0 +1,216 @@
+import os
+import json
+import atexit
+import tempfile
+import threading
+import time
+from typing import Any, Callable
+from config import JSON_STORE_FLUSH_DELAY, JSON_STORE_RELOAD_INTERVAL
+
+_stores = []
+
+
+class JsonStore:
+    """
+    Keeps the contents of one JSON data file (keywords, locations, settings) in
+    memory and writes it behind: a mutation only marks the store dirty, and all
+    mutations within JSON_STORE_FLUSH_DELAY seconds are written by one background
+    flush. The file is replaced atomically through a temporary file, so a crash
+    never leaves it half written. Pending changes are flushed at exit.
+
+    Callers that read, modify and write back the data hold `lock` for the whole
+    sequence. `version` changes whenever the data may have changed, so derived
+    views can be cached against it. With `reload_on_change`, a file edited by
+    hand is read again once its mtime or size changes (checked at most every
+    JSON_STORE_RELOAD_INTERVAL seconds); pending changes of our own win.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_factory: Callable[[], Any],
+        flush_delay: float = JSON_STORE_FLUSH_DELAY,
+        create_missing: bool = True,
+        reload_on_change: bool = False,
+    ):
+        self.path = path
+        self.default_factory = default_factory
+        self.flush_delay = flush_delay
+        self.create_missing = create_missing
+        self.reload_on_change = reload_on_change
+        self.lock = threading.RLock()
+        # Serializes flushes, which write outside `lock`, so an older snapshot
+        # never replaces a newer one.
+        self._write_lock = threading.Lock()
+        self.version = 0
+        self._data = None
+        self._loaded = False
+        self._file_state = None
+        self._next_check = 0.0
+        self._reloads = 0
+        self._dirty = False
+        self._timer = None
+        self._flushes = 0
+        self._flush_errors = 0
+        self._mutations = 0
+        self._last_flush_ms = None
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        _stores.append(self)
+
+    def get(self) -> Any:
+        """Returns the live data, reading the file on first use."""
+        with self.lock:
+            if not self._loaded:
+                self._load()
+            elif self.reload_on_change and not self._dirty:
+                now = time.monotonic()
+                if now >= self._next_check:
+                    self._next_check = now + JSON_STORE_RELOAD_INTERVAL
+                    if self._stat() != self._file_state:
+                        self._reloads += 1
+                        self._load()
+            return self._data
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        # Called with the lock held.
+        self._file_state = self._stat()
+        self._next_check = time.monotonic() + JSON_STORE_RELOAD_INTERVAL
+        self._data = self._read()
+        self._loaded = True
+        self.version += 1
+
+    def _read(self) -> Any:
+        default = self.default_factory()
+        if not os.path.exists(self.path):
+            if self.create_missing:
+                # Create the file with the defaults on the next flush.
+                self._mark_dirty()
+            return default
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+            # A malformed file is left alone until the data is changed.
+            return default
+        return data if isinstance(data, type(default)) else default
+
+    def set(self, data: Any):
+        """Replaces the data and schedules a flush."""
+        with self.lock:
+            self._data = data
+            self._loaded = True
+            self._mark_dirty()
+
+    def mark_dirty(self):
+        """Schedules a flush after the live data was changed in place."""
+        with self.lock:
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        # Called with the lock held. The timer is not restarted by further
+        # mutations, so a stream of changes is still written every flush_delay.
+        self._dirty = True
+        self._mutations += 1
+        self.version += 1
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Writes pending changes now. Safe to call at any time. Only serializing the
+        data holds `lock`; writing and syncing the file do not block readers.
+        """
+        with self._write_lock:
+            started = time.perf_counter()
+            with self.lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                generation = self._mutations
+                try:
+                    content = json.dumps(self._data, indent=2, ensure_ascii=False)
+                except (TypeError, ValueError) as e:
+                    self._flush_failed(e)
+                    return
+            try:
+                self._write(content)
+            except OSError as e:
+                with self.lock:
+                    self._flush_failed(e)
+                return
+            file_state = self._stat()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self.lock:
+                # Changes made during the write are still pending; their
+                # mutation has scheduled another flush.
+                self._dirty = self._mutations != generation
+                self._file_state = file_state
+                self._flushes += 1
+                self._last_flush_ms = elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._total_flush_ms += elapsed_ms
+
+    def _flush_failed(self, error: Exception):
+        # Called with the lock held. The data stays dirty and is retried with the
+        # next mutation or at exit.
+        print(f"Error saving {self.path}: {error}")
+        self._flush_errors += 1
+
+    def _write(self, content: str):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(
+            prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "path": self.path,
+                "pending": self._dirty,
+                "mutations": self._mutations,
+                "flushes": self._flushes,
+                "flushErrors": self._flush_errors,
+                "reloads": self._reloads,
+                "lastFlushMs": self._last_flush_ms,
+                "maxFlushMs": self._max_flush_ms,
+                "avgFlushMs": (
+                    self._total_flush_ms / self._flushes if self._flushes else None
+                ),
+            }
+
+
+def flush_all():
+    """Writes the pending changes of every store. Called automatically at exit."""
+    for store in _stores:
+        store.flush()
+
+
+def get_store_stats() -> dict:
+    return {os.path.basename(store.path): store.stats() for store in _stores}
+
+
+atexit.register(flush_all)
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class KeywordHierarchyError(ValueError):
+    """Raised for a parent change that would make a keyword its own ancestor."""
+
+
+class KeywordHierarchy:
+    """
+    An ancestor-closure table of the keyword tree: each keyword's ancestor ids,
+    nearest first, plus the children of each keyword. Ancestor lists are
+    lookups, descendants are collected from the children, and moving a subtree
+    only recomputes the closure of the moved keywords.
+    """
+
+    def __init__(self, keywords: Iterable[Dict[str, Any]] = ()):
+        self._parents = {}  # keyword id -> parent id (known keywords only)
+        self._children = {}  # keyword id -> set of child ids
+        self._ancestors = {}  # keyword id -> tuple of ancestor ids, nearest first
+        declared = {kw["id"]: kw.get("data", {}).get("parent") for kw in keywords}
+        for keyword_id, parent_id in declared.items():
+            self._children.setdefault(keyword_id, set())
+            if parent_id in declared:
+                self._parents[keyword_id] = parent_id
+                self._children.setdefault(parent_id, set()).add(keyword_id)
+        for keyword_id in declared:
+            self._ancestors[keyword_id] = self._walk(keyword_id)
+
+    def _walk(self, keyword_id: str) -> Tuple[str, ...]:
+        # Only used for data loaded from disk, which may contain cycles created
+        # by hand; the walk stops at the first repeated keyword.
+        ancestors = []
+        seen = {keyword_id}
+        parent_id = self._parents.get(keyword_id)
+        while parent_id is not None and parent_id not in seen:
+            ancestors.append(parent_id)
+            seen.add(parent_id)
+            parent_id = self._parents.get(parent_id)
+        return tuple(ancestors)
+
+    def ancestors(self, keyword_id: str) -> Tuple[str, ...]:
+        return self._ancestors.get(keyword_id, ())
+
+    def children(self, keyword_id: str) -> List[str]:
+        return list(self._children.get(keyword_id, ()))
+
+    def descendants(self, keyword_id: str) -> List[str]:
+        """Returns the ids below a keyword, breadth first."""
+        result = []
+        seen = {keyword_id}
+        queue = [keyword_id]
+        for current in queue:
+            for child_id in self._children.get(current, ()):
+                if child_id not in seen:
+                    seen.add(child_id)
+                    result.append(child_id)
+                    queue.append(child_id)
+        return result
+
+    def check_parent(self, keyword_id: str, parent_id: Optional[str]):
+        """Raises KeywordHierarchyError if `parent_id` is the keyword or below it."""
+        if parent_id is None:
+            return
+        if parent_id == keyword_id or keyword_id in self._ancestors.get(parent_id, ()):
+            raise KeywordHierarchyError(
+                "A keyword cannot be moved below itself or one of its descendants"
+            )
+
+    def add(self, keyword_id: str, parent_id: Optional[str] = None):
+        self._children.setdefault(keyword_id, set())
+        self._ancestors[keyword_id] = ()
+        self.set_parent(keyword_id, parent_id)
+
+    def set_parent(self, keyword_id: str, parent_id: Optional[str]):
+        """Moves a keyword and its subtree below `parent_id` (None for the root)."""
+        self.check_parent(keyword_id, parent_id)
+        if parent_id not in self._children:
+            # Unknown parents are kept in the keyword's data but end the ancestry.
+            parent_id = None
+        old_parent_id = self._parents.pop(keyword_id, None)
+        if old_parent_id is not None:
+            self._children[old_parent_id].discard(keyword_id)
+        if parent_id is not None:
+            self._parents[keyword_id] = parent_id
+            self._children[parent_id].add(keyword_id)
+            self._ancestors[keyword_id] = (parent_id,) + self._ancestors[parent_id]
+        else:
+            self._ancestors[keyword_id] = ()
+        for descendant_id in self.descendants(keyword_id):
+            parent = self._parents[descendant_id]
+            self._ancestors[descendant_id] = (parent,) + self._ancestors[parent]
+
+    def remove(self, keyword_id: str):
+        """Removes a keyword; its children become roots."""
+        for child_id in self.children(keyword_id):
+            self.set_parent(child_id, None)
+        parent_id = self._parents.pop(keyword_id, None)
+        if parent_id is not None:
+            self._children[parent_id].discard(keyword_id)
+        self._children.pop(keyword_id, None)
+        self._ancestors.pop(keyword_id, None)
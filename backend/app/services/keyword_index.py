@@ -0,0 +1,443 @@
+import bisect
+import heapq
+import unicodedata
+from typing import Any, Dict, Iterable, List, Tuple
+from app.services.sorting_service import (
+    get_recency_settings,
+    parse_last_used,
+    usage_score,
+)
+
+# Substrings up to this length are indexed directly; longer queries intersect
+# the postings of their n-grams of this length and verify the candidates.
+NGRAM_SIZE = 3
+
+# Typo-tolerant matching (SymSpell): every term is indexed under the variants
+# of its first FUZZY_PREFIX_LENGTH characters with up to FUZZY_MAX_DISTANCE
+# characters deleted. Queries shorter than FUZZY_MIN_QUERY_LENGTH are not
+# matched fuzzily.
+FUZZY_MAX_DISTANCE = 1
+FUZZY_PREFIX_LENGTH = 7
+FUZZY_MIN_QUERY_LENGTH = 4
+
+# Short queries matching more terms than this walk the keywords in rank order and
+# stop at the limit instead of ranking every match.
+RANKED_WALK_MIN_MATCHES = 256
+
+
+def fold(text: str) -> str:
+    """Lowercases text and strips diacritics, e.g. 'München' -> 'munchen'."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _deletes(text: str, max_distance: int) -> set[str]:
+    """Returns the text and all variants with up to max_distance characters deleted."""
+    variants = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:index] + variant[index + 1 :]
+            for variant in frontier
+            if len(variant) > 1
+            for index in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Returns the optimal string alignment distance (insertions, deletions,
+    substitutions and adjacent transpositions), or max_distance + 1 once it is
+    known to be larger.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class KeywordIndex:
+    """
+    A search index over keyword names and synonyms for autocomplete: an n-gram
+    index for matches anywhere in a term and a deletion index for misspelled
+    queries. Terms are folded
+    to lowercase without diacritics. Keywords are added and removed one at a
+    time, so the index follows add/update/delete without being rebuilt.
+    """
+
+    def __init__(self, keywords: Iterable[Dict[str, Any]] = ()):
+        self._ngrams = {}  # n-gram -> set of term ids
+        # deletion variant of a term prefix -> term id, or a set of term ids if
+        # several terms share it (most variants are unique to one term)
+        self._deletions = {}
+        # term id -> (normalized term, keyword id, original term, position)
+        self._terms = {}
+        self._term_ids_by_keyword = {}  # keyword id -> list of term ids
+        self._keywords = {}  # keyword id -> keyword
+        self._name_keys = {}  # keyword id -> (length, lowercased name) tie-breaker
+        self._free_term_ids = []
+        self._next_term_id = 0
+        # All keywords in rank order, built by the first broad query and then kept
+        # up to date: usage score -> sorted (name key, keyword id) list.
+        self._tiers = None
+        self._tier_scores = []  # ascending
+        self._scores = {}  # keyword id -> score it is filed under
+        self._recent = []  # heap of (last used, keyword id) holding the recency bonus
+        self._rank_settings = None  # (recency bonus, recency threshold)
+        self._name_ordered = {}  # short query -> matching keyword ids, see below
+        for keyword in keywords:
+            self.add(keyword)
+
+    @staticmethod
+    def _normalize(term: str) -> str:
+        return fold(term)
+
+    @staticmethod
+    def _fuzzy_keys(term: str) -> set[str]:
+        return _deletes(term[:FUZZY_PREFIX_LENGTH], FUZZY_MAX_DISTANCE)
+
+    @staticmethod
+    def _grams(term: str) -> set[str]:
+        return {
+            term[start : start + size]
+            for size in range(1, NGRAM_SIZE + 1)
+            for start in range(len(term) - size + 1)
+        }
+
+    def add(self, keyword: Dict[str, Any]):
+        """Indexes a keyword's name and synonyms, replacing a previous entry."""
+        keyword_id = keyword["id"]
+        if keyword_id in self._keywords:
+            self.remove(keyword_id)
+        self._keywords[keyword_id] = keyword
+        name = keyword["name"].lower()
+        self._name_keys[keyword_id] = (len(name), name)
+        term_ids = self._term_ids_by_keyword[keyword_id] = []
+        names = [keyword["name"]] + keyword.get("data", {}).get("synonyms", [])
+        for position, original in enumerate(names):
+            if not isinstance(original, str) or not (term := self._normalize(original)):
+                continue
+            if self._free_term_ids:
+                term_id = self._free_term_ids.pop()
+            else:
+                term_id = self._next_term_id
+                self._next_term_id += 1
+            self._terms[term_id] = (term, keyword_id, original, position)
+            term_ids.append(term_id)
+
+            for gram in self._grams(term):
+                self._ngrams.setdefault(gram, set()).add(term_id)
+                self._name_ordered.pop(gram, None)
+            for variant in self._fuzzy_keys(term):
+                ids = self._deletions.get(variant)
+                if ids is None:
+                    self._deletions[variant] = term_id
+                elif isinstance(ids, set):
+                    ids.add(term_id)
+                else:
+                    self._deletions[variant] = {ids, term_id}
+        if self._tiers is not None:
+            self._place(keyword_id)
+
+    def update_usage(self, keyword_id: str):
+        """Re-ranks a keyword after its use count or last use changed in place."""
+        if self._tiers is not None and keyword_id in self._keywords:
+            self._unplace(keyword_id)
+            self._place(keyword_id)
+
+    def remove(self, keyword_id: str):
+        if self._tiers is not None:
+            self._unplace(keyword_id)
+        self._keywords.pop(keyword_id, None)
+        self._name_keys.pop(keyword_id, None)
+        for term_id in self._term_ids_by_keyword.pop(keyword_id, []):
+            term = self._terms.pop(term_id)[0]
+            for gram in self._grams(term):
+                self._name_ordered.pop(gram, None)
+                ids = self._ngrams.get(gram)
+                if ids is not None:
+                    ids.discard(term_id)
+                    if not ids:
+                        del self._ngrams[gram]
+            for variant in self._fuzzy_keys(term):
+                ids = self._deletions.get(variant)
+                if isinstance(ids, set):
+                    ids.discard(term_id)
+                    if len(ids) == 1:
+                        self._deletions[variant] = ids.pop()
+                elif ids == term_id:
+                    del self._deletions[variant]
+            self._free_term_ids.append(term_id)
+
+    def _score(self, keyword_id: str) -> int:
+        """Scores a keyword under the current rank settings, noting a recency bonus."""
+        keyword = self._keywords[keyword_id]
+        recency_bonus, recency_threshold = self._rank_settings
+        use_count = keyword.get("useCount", 0) or 0
+        score = usage_score(
+            use_count, keyword.get("lastUsed"), recency_threshold, recency_bonus
+        )
+        if recency_bonus and score - use_count == recency_bonus:
+            # The bonus lapses once the threshold passes the last use.
+            last_used = parse_last_used(keyword["lastUsed"])
+            heapq.heappush(self._recent, (last_used, keyword_id))
+        return score
+
+    def _place(self, keyword_id: str):
+        score = self._scores[keyword_id] = self._score(keyword_id)
+        entries = self._tiers.get(score)
+        if entries is None:
+            entries = self._tiers[score] = []
+            bisect.insort(self._tier_scores, score)
+        bisect.insort(entries, (self._name_keys[keyword_id], keyword_id))
+
+    def _unplace(self, keyword_id: str):
+        score = self._scores.pop(keyword_id, None)
+        if score is None:
+            return
+        entries = self._tiers[score]
+        del entries[
+            bisect.bisect_left(entries, (self._name_keys[keyword_id], keyword_id))
+        ]
+        if not entries:
+            del self._tiers[score]
+            del self._tier_scores[bisect.bisect_left(self._tier_scores, score)]
+
+    def _ensure_ranking(self, recency_bonus: int, recency_threshold):
+        settings = self._rank_settings
+        self._rank_settings = (recency_bonus, recency_threshold)
+        if (
+            self._tiers is None
+            or settings[0] != recency_bonus
+            or recency_threshold < settings[1]
+        ):
+            # First use, or the settings changed: file every keyword again.
+            self._recent = []
+            self._scores = {}
+            self._tiers = {}
+            for keyword_id in self._keywords:
+                score = self._scores[keyword_id] = self._score(keyword_id)
+                self._tiers.setdefault(score, []).append(
+                    (self._name_keys[keyword_id], keyword_id)
+                )
+            for entries in self._tiers.values():
+                entries.sort()
+            self._tier_scores = sorted(self._tiers)
+            return
+        # Keywords whose recency bonus has lapsed since move down.
+        while self._recent and self._recent[0][0] <= recency_threshold:
+            _, keyword_id = heapq.heappop(self._recent)
+            self.update_usage(keyword_id)
+
+    def _ranked_matches(self, query: str, term_ids) -> Iterable[Tuple[str, str]]:
+        """
+        Yields (keyword id, matched term) for the keywords with a term in
+        `term_ids`, in the order search() ranks them: by score, then prefix
+        matches first, then by name. A score tier with more keywords than there
+        are matches is served from the query's matches in name order instead of
+        being walked.
+        """
+        for score in reversed(self._tier_scores):
+            entries = self._tiers[score]
+            if len(entries) > len(term_ids):
+                for keyword_id in self._matches_in_name_order(query, term_ids):
+                    if self._scores[keyword_id] == score:
+                        yield keyword_id, self._best_term(keyword_id, query, term_ids)[
+                            1
+                        ]
+                continue
+            infix_matches = []
+            for _, keyword_id in entries:
+                best = self._best_term(keyword_id, query, term_ids)
+                if best is None:
+                    continue
+                if best[0][0]:
+                    infix_matches.append((keyword_id, best[1]))
+                else:
+                    yield keyword_id, best[1]
+            yield from infix_matches
+
+    def _best_term(self, keyword_id: str, query: str, term_ids):
+        """Returns the keyword's best ((not a prefix match, position), term) or None."""
+        best = None
+        for term_id in self._term_ids_by_keyword[keyword_id]:
+            if term_id in term_ids:
+                term, _, original, position = self._terms[term_id]
+                rank = (not term.startswith(query), position)
+                if best is None or rank < best[0]:
+                    best = (rank, original)
+        return best
+
+    def _matches_in_name_order(self, query: str, term_ids) -> list[str]:
+        """
+        Returns the ids of the keywords matching a short query, prefix matches
+        first, each by name. It does not depend on usage, so it is cached until a
+        keyword containing the query is added or removed.
+        """
+        ordered = self._name_ordered.get(query)
+        if ordered is None:
+            keyword_ids = {self._terms[term_id][1] for term_id in term_ids}
+            ordered = self._name_ordered[query] = sorted(
+                keyword_ids,
+                key=lambda keyword_id: (
+                    self._best_term(keyword_id, query, term_ids)[0][0],
+                    self._name_keys[keyword_id],
+                    keyword_id,
+                ),
+            )
+        return ordered
+
+    def _substring_matches(self, query: str) -> Iterable[int]:
+        if len(query) <= NGRAM_SIZE:
+            return self._ngrams.get(query, ())
+        postings = []
+        for start in range(len(query) - NGRAM_SIZE + 1):
+            ids = self._ngrams.get(query[start : start + NGRAM_SIZE])
+            if not ids:
+                return ()
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return [term_id for term_id in candidates if query in self._terms[term_id][0]]
+
+    def _fuzzy_matches(self, query: str) -> dict[str, tuple[int, int, str]]:
+        """
+        Returns {keyword id: (distance, position, original term)} for terms within a
+        small edit distance of the query, or of their own beginning as long as the
+        query, so that a misspelled word is found while it is still being typed.
+        """
+        max_distance = FUZZY_MAX_DISTANCE
+        candidates = set()
+        for variant in _deletes(query[:FUZZY_PREFIX_LENGTH], max_distance):
+            ids = self._deletions.get(variant)
+            if isinstance(ids, set):
+                candidates.update(ids)
+            elif ids is not None:
+                candidates.add(ids)
+
+        matches = {}
+        for term_id in candidates:
+            term, keyword_id, original, position = self._terms[term_id]
+            distance = edit_distance(query, term, max_distance)
+            if distance > max_distance and len(term) > len(query):
+                distance = edit_distance(query, term[: len(query)], max_distance)
+            if distance > max_distance:
+                continue
+            current = matches.get(keyword_id)
+            if current is None or (distance, position) < current[:2]:
+                matches[keyword_id] = (distance, position, original)
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Returns up to `limit` (keyword, matched term) pairs whose name or a synonym
+        contains the query, ranked like smart_sort by usage and recency. Ties prefer
+        prefix matches, then the shorter and alphabetically first name. If fewer
+        than `limit` keywords match, near misses of the query fill the rest,
+        closest first.
+        """
+        query = self._normalize(query)
+        if not query or limit <= 0:
+            return []
+
+        recency_bonus, recency_threshold = get_recency_settings()
+        if len(query) < FUZZY_MIN_QUERY_LENGTH and len(query) <= NGRAM_SIZE:
+            term_ids = self._ngrams.get(query, ())
+            if len(term_ids) > RANKED_WALK_MIN_MATCHES:
+                # A short query matching much of the vocabulary: the best ranked
+                # keywords are found long before all matches would be ranked.
+                self._ensure_ranking(recency_bonus, recency_threshold)
+                results = []
+                seen_names = set()
+                for keyword_id, term in self._ranked_matches(query, term_ids):
+                    keyword = self._keywords[keyword_id]
+                    if keyword["name"] not in seen_names:
+                        seen_names.add(keyword["name"])
+                        results.append((keyword, term))
+                        if len(results) == limit:
+                            break
+                return results
+
+        # The best matching term per keyword: a prefix match, then list order.
+        best = {}
+        for term_id in self._substring_matches(query):
+            term, keyword_id, original, position = self._terms[term_id]
+            rank = (not term.startswith(query), position)
+            current = best.get(keyword_id)
+            if current is None or rank < current[0]:
+                best[keyword_id] = (rank, original)
+
+        keywords = self._keywords
+        name_keys = self._name_keys
+
+        def score(keyword_id):
+            keyword = keywords[keyword_id]
+            return usage_score(
+                keyword.get("useCount", 0),
+                keyword.get("lastUsed"),
+                recency_threshold,
+                recency_bonus,
+            )
+
+        results = []
+        seen_names = set()
+        self._take(
+            {keyword_id: match[1] for keyword_id, match in best.items()},
+            lambda kw_id: (-score(kw_id), best[kw_id][0][0], name_keys[kw_id]),
+            limit,
+            results,
+            seen_names,
+        )
+        if len(results) < limit and len(query) >= FUZZY_MIN_QUERY_LENGTH:
+            fuzzy = {
+                keyword_id: match
+                for keyword_id, match in self._fuzzy_matches(query).items()
+                if keyword_id not in best
+            }
+            self._take(
+                {keyword_id: match[2] for keyword_id, match in fuzzy.items()},
+                lambda kw_id: (fuzzy[kw_id][0], -score(kw_id), name_keys[kw_id]),
+                limit,
+                results,
+                seen_names,
+            )
+        return results
+
+    def _take(self, matched_terms, sort_key, limit, results, seen_names):
+        """
+        Appends the best of {keyword id: matched term} to `results` (a top-k heap
+        selection) until it holds `limit` entries. A keyword may be listed twice
+        under one name; only the best of them is kept.
+        """
+        candidates = dict(matched_terms)
+        while len(results) < limit and candidates:
+            top = heapq.nsmallest(limit - len(results), candidates, key=sort_key)
+            for keyword_id in top:
+                keyword = self._keywords[keyword_id]
+                if keyword["name"] not in seen_names:
+                    seen_names.add(keyword["name"])
+                    results.append((keyword, candidates[keyword_id]))
+                del candidates[keyword_id]
+
+    def stats(self) -> dict:
+        return {
+            "keywords": len(self._keywords),
+            "terms": len(self._terms),
+            "ngrams": len(self._ngrams),
+            "deletions": len(self._deletions),
+        }
@@ -1,91 +1,73 @@
-import os
-import json
 import uuid
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from config import KEYWORDS_PATH
+from app.services.keyword_index import KeywordIndex
+from app.services.keyword_hierarchy import KeywordHierarchy
+from app.services.json_store import JsonStore
 
 
 class KeywordService:
     def __init__(self, filepath=KEYWORDS_PATH):
         self.filepath = filepath
-        self.keywords = self._load_keywords()
-        # Create a quick lookup map for ID-to-object and ID-to-name
-        self._id_map = {kw["id"]: kw for kw in self.keywords}
-        self._id_to_name_map = {kw["id"]: kw["name"] for kw in self.keywords}
-
-    def _load_keywords(self) -> List[Dict[str, Any]]:
-        # If the file doesn't exist, create it with an empty list and return.
-        if not os.path.exists(self.filepath):
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                json.dump([], f)
-            return []
-
-        try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # We expect the data to be a list. If not, the file is considered
-                # invalid, and we return an empty list to prevent errors.
-                if isinstance(data, list):
-                    return data
-                return []
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            # Handles cases where the file is empty or malformed.
-            return []
+        # A missing file is created with an empty list, and a file that does not
+        # hold a list is considered invalid and read as an empty list.
+        self._store = JsonStore(filepath, list)
+        self.keywords = self._store.get()
+        self._rebuild_maps()
+        self._index = KeywordIndex(self.keywords)
+        self._hierarchy = KeywordHierarchy(self.keywords)
 
     def _save_keywords(self):
-        # Sort keywords by name for consistency in the JSON file
+        # Sort keywords by name for consistency in the JSON file, which the
+        # store writes in the background.
         self.keywords.sort(key=lambda x: x.get("name", "").lower())
-        try:
-            with open(self.filepath, "w", encoding="utf-8") as f:
-                json.dump(self.keywords, f, indent=2, ensure_ascii=False)
-            # After saving, rebuild the internal maps
-            self._id_map = {kw["id"]: kw for kw in self.keywords}
-            self._id_to_name_map = {kw["id"]: kw["name"] for kw in self.keywords}
-        except IOError as e:
-            print(f"Error saving keywords file: {e}")
+        self._store.set(self.keywords)
+
+    def _rebuild_maps(self):
+        # Quick lookup maps for ID-to-object and ID-to-name, and for finding a
+        # keyword by its normalized primary name or one of its synonyms
+        self._id_map = {}
+        self._id_to_name_map = {}
+        self._name_map = {}
+        self._synonym_map = {}
+        for kw in self.keywords:
+            self._register(kw)
+
+    def _register(self, kw: Dict[str, Any]):
+        self._id_map[kw["id"]] = kw
+        self._id_to_name_map[kw["id"]] = kw["name"]
+        # The first keyword in file order wins if a name is used twice
+        self._name_map.setdefault(kw["name"].lower(), kw)
+        for synonym in kw.get("data", {}).get("synonyms", []):
+            self._synonym_map.setdefault(synonym.lower(), kw)
 
     def get_all(self) -> List[Dict[str, Any]]:
         return self.keywords
 
     def _get_parent_hierarchy(self, keyword_id: str) -> List[str]:
-        """Traces a keyword's ancestry back to the root."""
-        parents = []
-        current = self._id_map.get(keyword_id)
-        while current and current.get("data", {}).get("parent"):
-            parent_id = current["data"]["parent"]
-            parent_name = self._id_to_name_map.get(parent_id)
-            if parent_name and parent_name not in parents:
-                parents.append(parent_name)
-            current = self._id_map.get(parent_id)
-        return parents
-
-    def get_suggestions(self, query: str) -> List[Dict[str, Any]]:
+        """Returns the names of a keyword's ancestors, nearest first."""
+        parent_names = (
+            self._id_to_name_map[parent_id]
+            for parent_id in self._hierarchy.ancestors(keyword_id)
+        )
+        return list(dict.fromkeys(parent_names))
+
+    def get_descendants(self, keyword_id: str) -> List[Dict[str, Any]]:
+        """Returns all keywords below a keyword, breadth first."""
+        return [
+            self._id_map[kw_id] for kw_id in self._hierarchy.descendants(keyword_id)
+        ]
+
+    def get_suggestions(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Generates rich suggestions for the frontend autocomplete."""
-        if not query:
-            return []
-
-        normalized_query = query.lower()
-        suggestions = []
-        seen_primary_names = set()
-
-        for kw in self.keywords:
-            primary_name = kw["name"]
-
-            if primary_name in seen_primary_names:
-                continue
-
-            all_searchable_terms = [primary_name] + kw.get("data", {}).get(
-                "synonyms", []
-            )
-            matched_term = None
-
-            for term in all_searchable_terms:
-                if normalized_query in term.lower():
-                    matched_term = term
-                    break
+        with self._store.lock:
+            if not query:
+                return []
 
-            if matched_term:
+            suggestions = []
+            for kw, matched_term in self._index.search(query, limit):
+                primary_name = kw["name"]
                 parent_id = kw.get("data", {}).get("parent")
                 parent_name = self._id_to_name_map.get(parent_id) if parent_id else None
                 synonyms = kw.get("data", {}).get("synonyms", [])
@@ -103,24 +85,27 @@ class KeywordService:
                         "allTermsToAdd": all_terms_to_add,
                     }
                 )
-                seen_primary_names.add(primary_name)
 
-        return suggestions[:10]
+            return suggestions
 
     def find_by_id(self, keyword_id: str) -> Optional[Dict[str, Any]]:
         return self._id_map.get(keyword_id)
 
     def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Finds a keyword object by its primary name or one of its synonyms."""
-        for keyword in self.keywords:
-            if keyword["name"].lower() == name.lower():
-                return keyword
-            synonyms = [s.lower() for s in keyword.get("data", {}).get("synonyms", [])]
-            if name.lower() in synonyms:
-                return keyword
-        return None
+        normalized_name = name.lower()
+        return self._name_map.get(normalized_name) or self._synonym_map.get(
+            normalized_name
+        )
 
     def add(self, name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._store.lock:
+            new_keyword = self._create(name, data)
+            self._save_keywords()
+            return new_keyword
+
+    def _create(self, name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Adds a keyword in memory; the caller persists it."""
         now = datetime.now(timezone.utc).isoformat()
         new_keyword = {
             "id": str(uuid.uuid4()),
@@ -134,70 +119,87 @@ class KeywordService:
             },
         }
         self.keywords.append(new_keyword)
-        self._save_keywords()
+        self._register(new_keyword)
+        self._index.add(new_keyword)
+        self._hierarchy.add(new_keyword["id"], new_keyword["data"]["parent"])
         return new_keyword
 
     def update(
         self, keyword_id: str, updates: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
-        keyword = self.find_by_id(keyword_id)
-        if not keyword:
-            return None
-
-        if "name" in updates:
-            keyword["name"] = updates["name"]
-
-        if "data" in updates and isinstance(updates["data"], dict):
-            if "parent" in updates["data"]:
-                keyword["data"]["parent"] = updates["data"]["parent"]
-            if "synonyms" in updates["data"]:
-                keyword["data"]["synonyms"] = updates["data"]["synonyms"]
-
-        self._save_keywords()
-        return keyword
+        with self._store.lock:
+            keyword = self.find_by_id(keyword_id)
+            if not keyword:
+                return None
+
+            new_data = updates.get("data")
+            if isinstance(new_data, dict) and "parent" in new_data:
+                # Rejects moves below the keyword itself before anything is changed.
+                self._hierarchy.check_parent(keyword_id, new_data["parent"])
+
+            old_names = (keyword["name"], list(keyword["data"].get("synonyms", [])))
+            if "name" in updates:
+                keyword["name"] = updates["name"]
+
+            if "data" in updates and isinstance(updates["data"], dict):
+                if "parent" in updates["data"]:
+                    keyword["data"]["parent"] = updates["data"]["parent"]
+                    self._hierarchy.set_parent(keyword_id, keyword["data"]["parent"])
+                if "synonyms" in updates["data"]:
+                    keyword["data"]["synonyms"] = updates["data"]["synonyms"]
+
+            if (keyword["name"], keyword["data"].get("synonyms", [])) != old_names:
+                # Another keyword may share an old name, so the name lookups are
+                # rebuilt; a parent change alone leaves them as they are.
+                self._rebuild_maps()
+                self._index.add(keyword)
+            self._save_keywords()
+            return keyword
 
     def delete(self, keyword_id: str) -> bool:
-        keyword = self.find_by_id(keyword_id)
-        if not keyword:
-            return False
-
-        # Set parent to null for any children of the deleted keyword
-        for k in self.keywords:
-            if k.get("data", {}).get("parent") == keyword_id:
-                k["data"]["parent"] = None
-
-        self.keywords = [k for k in self.keywords if k["id"] != keyword_id]
-        self._save_keywords()
-        return True
+        with self._store.lock:
+            keyword = self.find_by_id(keyword_id)
+            if not keyword:
+                return False
+
+            # Set parent to null for any children of the deleted keyword
+            for child_id in self._hierarchy.children(keyword_id):
+                self._id_map[child_id]["data"]["parent"] = None
+
+            self.keywords = [k for k in self.keywords if k["id"] != keyword_id]
+            self._index.remove(keyword_id)
+            self._hierarchy.remove(keyword_id)
+            self._rebuild_maps()
+            self._save_keywords()
+            return True
 
     def track_usage(self, keyword_names: List[str]):
         """
         Updates usage stats for given keywords. If a keyword doesn't exist, it's created.
-        This replaces the old 'learn_keywords' functionality.
+        This replaces the old 'learn_keywords' functionality. All counters and new
+        keywords are applied in memory and the file is written once.
         """
-        if not keyword_names:
-            return
-
-        now_iso = datetime.now(timezone.utc).isoformat()
-
-        for name in keyword_names:
-            if not isinstance(name, str) or not (clean_name := name.strip()):
-                continue
-
-            entry = self.find_by_name(clean_name)
-            if entry:
+        with self._store.lock:
+            if not keyword_names:
+                return
+
+            now_iso = datetime.now(timezone.utc).isoformat()
+
+            for name in keyword_names:
+                if not isinstance(name, str) or not (clean_name := name.strip()):
+                    continue
+
+                entry = self.find_by_name(clean_name)
+                if not entry:
+                    # Keyword not found, create a new one (preserving old behavior)
+                    entry = self._create(
+                        name=clean_name, data={"parent": None, "synonyms": []}
+                    )
                 entry["useCount"] = entry.get("useCount", 0) + 1
                 entry["lastUsed"] = now_iso
-            else:
-                # Keyword not found, create a new one (preserving old behavior)
-                self.add(name=clean_name, data={"parent": None, "synonyms": []})
-                # We need to re-find it to update usage, add() already saved.
-                new_entry = self.find_by_name(clean_name)
-                if new_entry:
-                    new_entry["useCount"] = 1
-                    new_entry["lastUsed"] = now_iso
-
-        self._save_keywords()
+                self._index.update_usage(entry["id"])
+
+            self._save_keywords()
 
 
 keyword_service = KeywordService()
@@ -0,0 +1,189 @@
+import math
+import heapq
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Size of the latitude/longitude grid cells presets are bucketed in (about 5.5 km
+# north-south), sized for the small radii photos are matched with.
+CELL_DEGREES = 0.05
+_LATITUDE_CELLS = round(180 / CELL_DEGREES)
+_LONGITUDE_CELLS = round(360 / CELL_DEGREES)
+
+
+def parse_coordinates(data: dict) -> tuple[float, float] | None:
+    """Returns (latitude, longitude) from a preset's data, or None if it has none."""
+    try:
+        latitude = float(data.get("Latitude"))
+        longitude = float(data.get("Longitude"))
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _latitude_cell(latitude: float) -> int:
+    return min(int((latitude + 90) // CELL_DEGREES), _LATITUDE_CELLS - 1)
+
+
+def _longitude_cell(longitude: float) -> int:
+    return int((longitude + 180) // CELL_DEGREES) % _LONGITUDE_CELLS
+
+
+class LocationSpatialIndex:
+    """
+    Buckets location presets in a CELL_DEGREES latitude/longitude grid. A query
+    visits the cells around the coordinate nearest first, within the radius'
+    bounding box (which wraps around the antimeridian and widens towards the
+    poles), and measures only the presets in them. Presets are added, moved and
+    removed individually.
+    """
+
+    def __init__(self):
+        self._points = {}  # preset id -> (latitude, longitude, cell)
+        self._cells = {}  # (latitude cell, longitude cell) -> set of preset ids
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def clear(self):
+        self._points.clear()
+        self._cells.clear()
+
+    def put(self, preset_id: str, data: dict):
+        """Adds or moves a preset; presets without valid coordinates are dropped."""
+        self.remove(preset_id)
+        coordinates = parse_coordinates(data or {})
+        if coordinates is None:
+            return
+        latitude, longitude = coordinates
+        cell = (_latitude_cell(latitude), _longitude_cell(longitude))
+        self._points[preset_id] = (latitude, longitude, cell)
+        self._cells.setdefault(cell, set()).add(preset_id)
+
+    def remove(self, preset_id: str):
+        point = self._points.pop(preset_id, None)
+        if point is None:
+            return
+        ids = self._cells[point[2]]
+        ids.discard(preset_id)
+        if not ids:
+            del self._cells[point[2]]
+
+    def _window(self, latitude: float, radius_km: float) -> tuple[range, int]:
+        """
+        Returns the latitude cells and the number of longitude cells on either
+        side of the query's cell that the radius' bounding box covers.
+        """
+        lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+        min_lat, max_lat = latitude - lat_delta, latitude + lat_delta
+        lat_cells = range(
+            _latitude_cell(max(min_lat, -90)), _latitude_cell(min(max_lat, 90)) + 1
+        )
+        widest = max(abs(min_lat), abs(max_lat))
+        lon_span = _LONGITUDE_CELLS // 2
+        if widest < 90:
+            lon_delta = lat_delta / math.cos(math.radians(widest))
+            lon_span = min(lon_span, int(lon_delta // CELL_DEGREES) + 1)
+        return lat_cells, lon_span
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int, radius_km: float
+    ) -> list[tuple[float, str]]:
+        """Returns up to k (distance in km, preset id) within radius_km, nearest first."""
+        if k <= 0 or radius_km < 0 or not self._points:
+            return []
+        lat_cells, lon_span = self._window(latitude, radius_km)
+        lon_count = min(2 * lon_span + 1, _LONGITUDE_CELLS)
+        if len(lat_cells) * lon_count > len(self._cells):
+            # A large radius: measuring every preset is cheaper than visiting
+            # the mostly empty cells.
+            matches = []
+            for preset_id, point in self._points.items():
+                distance = haversine_km(latitude, longitude, point[0], point[1])
+                if distance <= radius_km:
+                    matches.append((distance, preset_id))
+            return heapq.nsmallest(k, matches)
+        return self._nearest_in_rings(
+            latitude, longitude, k, radius_km, lat_cells, lon_span
+        )
+
+    def _nearest_in_rings(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius_km: float,
+        lat_cells: range,
+        lon_span: int,
+    ) -> list[tuple[float, str]]:
+        # Visits the cells in square rings around the query's cell and stops as
+        # soon as no point in the next ring can be closer than the k-th match.
+        center_lat = _latitude_cell(latitude)
+        center_lon = _longitude_cell(longitude)
+        min_lat_offset = lat_cells.start - center_lat
+        max_lat_offset = lat_cells.stop - 1 - center_lat
+        # With the full circle of longitudes, the offset opposite the query is
+        # only visited from one side.
+        min_lon_offset = -lon_span
+        if 2 * lon_span + 1 > _LONGITUDE_CELLS:
+            min_lon_offset += 1
+        max_ring = max(-min_lat_offset, max_lat_offset, lon_span)
+        cos_lat = math.cos(math.radians(latitude))
+
+        best = []  # max-heap of (-distance, preset id), at most k long
+        limit = radius_km
+        for ring in range(max_ring + 1):
+            if ring >= 2:
+                # A point in this ring is at least ring - 1 cells away in
+                # latitude or in longitude.
+                gap = math.radians((ring - 1) * CELL_DEGREES)
+                widest = min(90.0, abs(latitude) + (ring + 1) * CELL_DEGREES)
+                lon_a = (
+                    cos_lat * math.cos(math.radians(widest)) * math.sin(gap / 2) ** 2
+                )
+                bound = min(
+                    EARTH_RADIUS_KM * gap,
+                    2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(lon_a))),
+                )
+                if bound > limit:
+                    break
+            for lat_offset in range(
+                max(-ring, min_lat_offset), min(ring, max_lat_offset) + 1
+            ):
+                if abs(lat_offset) == ring:
+                    lon_offsets = range(
+                        max(-ring, min_lon_offset), min(ring, lon_span) + 1
+                    )
+                else:
+                    lon_offsets = [
+                        o for o in (-ring, ring) if min_lon_offset <= o <= lon_span
+                    ]
+                for lon_offset in lon_offsets:
+                    cell = (
+                        center_lat + lat_offset,
+                        (center_lon + lon_offset) % _LONGITUDE_CELLS,
+                    )
+                    for preset_id in self._cells.get(cell, ()):
+                        point = self._points[preset_id]
+                        distance = haversine_km(latitude, longitude, point[0], point[1])
+                        if distance > limit:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-distance, preset_id))
+                        else:
+                            heapq.heappushpop(best, (-distance, preset_id))
+                        if len(best) == k:
+                            limit = -best[0][0]
+        return sorted((-distance, preset_id) for distance, preset_id in best)
@@ -1,89 +1,202 @@
-import os
 import json
 import uuid
+import hashlib
 from datetime import datetime, timezone
 from config import LOCATIONS_PATH
+from app.services.json_store import JsonStore
+from app.services.location_index import LocationSpatialIndex
 
 
-def load_location_presets() -> list[dict]:
-    """Loads location presets from JSON, or returns an empty list."""
-    if not os.path.exists(LOCATIONS_PATH):
-        return []
-    try:
-        with open(LOCATIONS_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+class LocationPresetRepository:
+    """
+    Holds the location presets in memory with indexes by ID and by lowercase
+    name, so lookups and name conflict checks are O(1), and a spatial index of
+    their coordinates for nearest-preset queries. The presets are persisted
+    through a write-behind JsonStore; when locations.json is edited on disk,
+    the store reloads it and the indexes are rebuilt on next access.
+    """
+
+    def __init__(self, filepath: str = LOCATIONS_PATH):
+        self._store = JsonStore(
+            filepath, list, create_missing=False, reload_on_change=True
+        )
+        self.lock = self._store.lock
+        self._indexed_version = None
+        self._by_id = {}
+        self._by_name = {}
+        self._spatial = LocationSpatialIndex()
+        self._response = None  # (store version, body, etag)
+
+    def _presets(self) -> list[dict]:
+        """Returns the live presets list, rebuilding the indexes if it was reloaded."""
+        with self.lock:
+            presets = self._store.get()
+            if self._indexed_version != self._store.version:
+                self._by_id = {p.get("id"): p for p in presets}
+                self._by_name = {}
+                self._spatial.clear()
+                for preset in presets:
+                    self._by_name.setdefault(preset["name"].lower(), preset)
+                    self._spatial.put(preset.get("id"), preset.get("data"))
+                self._indexed_version = self._store.version
+            return presets
+
+    def _saved(self):
+        # Called with the lock held after an in-place change that kept the
+        # indexes up to date, so the new store version needs no rebuild.
+        self._store.mark_dirty()
+        self._indexed_version = self._store.version
+
+    def get_all(self) -> list[dict]:
+        return self._presets()
+
+    def find_by_id(self, preset_id: str) -> dict | None:
+        with self.lock:
+            self._presets()
+            return self._by_id.get(preset_id)
+
+    def find_by_name(self, name: str) -> dict | None:
+        with self.lock:
+            self._presets()
+            return self._by_name.get(name.lower())
+
+    def get_response(self) -> tuple[str, str]:
+        """
+        Returns the presets serialized as JSON and their ETag. Both are cached
+        until the presets change.
+        """
+        with self.lock:
+            presets = self._presets()
+            version = self._store.version
+            if self._response is None or self._response[0] != version:
+                body = json.dumps(presets, ensure_ascii=False)
+                etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+                self._response = (version, body, etag)
+            return self._response[1], self._response[2]
+
+    def nearest(
+        self, coordinates: list[tuple[float, float]], k: int, radius_km: float
+    ) -> list[list[tuple[dict, float]]]:
+        """
+        Returns, for each (latitude, longitude), up to k (preset, distance in km)
+        within radius_km, nearest first.
+        """
+        with self.lock:
+            self._presets()
+            return [
+                [
+                    (self._by_id[preset_id], distance)
+                    for distance, preset_id in self._spatial.nearest(
+                        latitude, longitude, k, radius_km
+                    )
+                ]
+                for latitude, longitude in coordinates
+            ]
+
+    def add(self, name: str, preset_data: dict) -> dict:
+        with self.lock:
+            presets = self._presets()
+
+            # Prevent creating presets with duplicate names (case-insensitive)
+            if name.lower() in self._by_name:
+                # Check if this is an update to an existing item by a different ID
+                # This case is handled by update_preset. If we are here, it's a new item with a conflicting name.
+                raise ValueError(f"A preset with the name '{name}' already exists.")
+
+            now = datetime.now(timezone.utc).isoformat()
+
+            new_preset = {
+                "id": str(uuid.uuid4()),
+                "name": name,
+                "useCount": 0,
+                "lastUsed": None,
+                "createdAt": now,
+                "data": preset_data,
+            }
+
+            presets.append(new_preset)
+            self._by_id[new_preset["id"]] = new_preset
+            self._by_name[name.lower()] = new_preset
+            self._spatial.put(new_preset["id"], preset_data)
+            self._saved()
+            return new_preset
+
+    def update(self, preset_id: str, name: str, data: dict) -> dict | None:
+        with self.lock:
+            self._presets()
+            preset_to_update = self._by_id.get(preset_id)
+            if not preset_to_update:
+                return None
+
+            # Check if the new name conflicts with another preset's name
+            conflict = self._by_name.get(name.lower())
+            if conflict is not None and conflict.get("id") != preset_id:
+                raise ValueError(
+                    f"A different preset with the name '{name}' already exists."
+                )
+
+            if self._by_name.get(preset_to_update["name"].lower()) is preset_to_update:
+                del self._by_name[preset_to_update["name"].lower()]
+            preset_to_update["name"] = name
+            preset_to_update["data"] = data
+            self._by_name[name.lower()] = preset_to_update
+            self._spatial.put(preset_id, data)
+            self._saved()
+            return preset_to_update
+
+    def delete(self, preset_id: str) -> bool:
+        with self.lock:
+            presets = self._presets()
+            preset = self._by_id.pop(preset_id, None)
+            if preset is None:
+                return False
+            presets.remove(preset)
+            if self._by_name.get(preset["name"].lower()) is preset:
+                del self._by_name[preset["name"].lower()]
+            self._spatial.remove(preset_id)
+            self._saved()
+            return True
+
+    def track_usage(self, preset_id: str) -> dict | None:
+        with self.lock:
+            preset_to_update = self.find_by_id(preset_id)
+            if not preset_to_update:
+                return None
+
+            preset_to_update["useCount"] = preset_to_update.get("useCount", 0) + 1
+            preset_to_update["lastUsed"] = datetime.now(timezone.utc).isoformat()
+            self._saved()
+            return preset_to_update
+
+
+location_repository = LocationPresetRepository()
 
 
-def save_location_presets(data: list[dict]):
-    """Saves the location presets data to the JSON file."""
-    with open(LOCATIONS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def load_location_presets() -> list[dict]:
+    """Returns the location presets, or an empty list."""
+    return location_repository.get_all()
 
 
 def add_location_preset(name: str, preset_data: dict) -> dict:
     """Adds a new location preset and saves it to the file."""
-    presets = load_location_presets()
-
-    # Prevent creating presets with duplicate names (case-insensitive)
-    existing_names = {p["name"].lower() for p in presets}
-    if name.lower() in existing_names:
-        # Check if this is an update to an existing item by a different ID
-        # This case is handled by update_preset. If we are here, it's a new item with a conflicting name.
-        raise ValueError(f"A preset with the name '{name}' already exists.")
-
-    now = datetime.now(timezone.utc).isoformat()
-
-    new_preset = {
-        "id": str(uuid.uuid4()),
-        "name": name,
-        "useCount": 0,
-        "lastUsed": None,
-        "createdAt": now,
-        "data": preset_data,
-    }
-
-    presets.append(new_preset)
-    save_location_presets(presets)
-    return new_preset
+    return location_repository.add(name, preset_data)
 
 
 def update_preset(preset_id: str, name: str, data: dict) -> dict | None:
     """Finds a preset by ID and updates its name and data."""
-    presets = load_location_presets()
-    preset_to_update = None
-    for preset in presets:
-        if preset.get("id") == preset_id:
-            preset_to_update = preset
-            break
-
-    if not preset_to_update:
-        return None
-
-    # Check if the new name conflicts with another preset's name
-    new_name_lower = name.lower()
-    for preset in presets:
-        if preset.get("id") != preset_id and preset["name"].lower() == new_name_lower:
-            raise ValueError(
-                f"A different preset with the name '{name}' already exists."
-            )
-
-    preset_to_update["name"] = name
-    preset_to_update["data"] = data
-    save_location_presets(presets)
-    return preset_to_update
+    return location_repository.update(preset_id, name, data)
 
 
 def delete_preset(preset_id: str) -> bool:
     """Finds a preset by ID and removes it from the list."""
-    presets = load_location_presets()
-    original_length = len(presets)
-    presets = [p for p in presets if p.get("id") != preset_id]
-    if len(presets) < original_length:
-        save_location_presets(presets)
-        return True
-    return False
+    return location_repository.delete(preset_id)
+
+
+def find_nearest_presets(
+    coordinates: list[tuple[float, float]], k: int, radius_km: float
+) -> list[list[tuple[dict, float]]]:
+    """Finds the k nearest presets within radius_km of each coordinate."""
+    return location_repository.nearest(coordinates, k, radius_km)
 
 
 def update_location_preset_usage(preset_id: str) -> dict | None:
@@ -91,20 +204,4 @@ def update_location_preset_usage(preset_id: str) -> dict | None:
     Finds a preset by its ID, increments its usage count, updates its
     last used timestamp, and saves the updated list.
     """
-    presets = load_location_presets()
-    preset_to_update = None
-
-    for preset in presets:
-        if preset.get("id") == preset_id:
-            preset_to_update = preset
-            break
-
-    if not preset_to_update:
-        return None
-
-    preset_to_update["useCount"] = preset_to_update.get("useCount", 0) + 1
-    preset_to_update["lastUsed"] = datetime.now(timezone.utc).isoformat()
-
-    save_location_presets(presets)
-
-    return preset_to_update
+    return location_repository.track_usage(preset_id)
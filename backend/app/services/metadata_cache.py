@@ -0,0 +1,85 @@
+import os
+import threading
+from collections import OrderedDict
+from config import METADATA_CACHE_SIZE
+
+
+class MetadataCache:
+    """
+    A bounded LRU cache of processed metadata, keyed by file path and validated
+    against the file's (size, mtime_ns) fingerprint. A file that changed on disk
+    simply misses, so explicit invalidation is only needed for our own writes
+    that may land within the filesystem's timestamp resolution.
+    """
+
+    def __init__(self, max_entries: int = METADATA_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def fingerprint(path: str) -> tuple[int, int] | None:
+        """Returns (size, mtime_ns) for a file, or None if it cannot be stat'ed."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: str, fingerprint: tuple[int, int] | None) -> dict | None:
+        """
+        Returns the cached item if its fingerprint still matches. The returned dict
+        is shared with the cache and must be treated as read-only.
+        """
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or fingerprint is None or entry[0] != fingerprint:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, path: str, fingerprint: tuple[int, int] | None, item: dict):
+        if fingerprint is None or self.max_entries <= 0:
+            return
+        key = self._key(path)
+        with self._lock:
+            self._entries[key] = (fingerprint, item)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, paths: list[str]):
+        with self._lock:
+            for path in paths:
+                if self._entries.pop(self._key(path), None) is not None:
+                    self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+metadata_cache = MetadataCache()
@@ -0,0 +1,194 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from config import METADATA_CATALOG_PATH
+from app.metadata_schema import TAG_MAP
+
+# Processed items depend on the schema, so a changed TAG_MAP empties the catalog.
+_SCHEMA_SIGNATURE = hashlib.sha1(
+    json.dumps(TAG_MAP, sort_keys=True).encode("utf-8")
+).hexdigest()
+
+# SQLite limits the number of host parameters per statement.
+_QUERY_BATCH_SIZE = 500
+
+
+class MetadataCatalog:
+    """
+    A persistent SQLite store of processed metadata, so that a library does not
+    have to be read with ExifTool again in every session. Like the in-memory
+    MetadataCache, entries are keyed by the normalized path and only served while
+    the stored fingerprint matches the file.
+    """
+
+    def __init__(self, db_path: str = METADATA_CATALOG_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    @staticmethod
+    def _encode_fingerprint(fingerprint) -> str:
+        return json.dumps(fingerprint)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, creating the schema on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        with self._init_lock:
+            if not self._initialized:
+                self._create_schema(connection)
+                self._initialized = True
+        return connection
+
+    def _create_schema(self, connection: sqlite3.Connection):
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_info (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                )
+                """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS files_folder ON files (folder)"
+            )
+            row = connection.execute(
+                "SELECT value FROM catalog_info WHERE key = 'schema'"
+            ).fetchone()
+            if row is None or row[0] != _SCHEMA_SIGNATURE:
+                connection.execute("DELETE FROM files")
+                connection.execute(
+                    "INSERT OR REPLACE INTO catalog_info VALUES ('schema', ?)",
+                    (_SCHEMA_SIGNATURE,),
+                )
+
+    def get_many(self, fingerprints: dict[str, tuple]) -> dict[str, dict]:
+        """
+        Returns {path: item} for the given {path: fingerprint} entries whose stored
+        fingerprint still matches. Paths without a fingerprint are skipped.
+        """
+        wanted = {
+            self._key(path): (path, self._encode_fingerprint(fingerprint))
+            for path, fingerprint in fingerprints.items()
+            if fingerprint is not None
+        }
+        keys = list(wanted)
+        results = {}
+        connection = self._connection()
+        for start in range(0, len(keys), _QUERY_BATCH_SIZE):
+            batch = keys[start : start + _QUERY_BATCH_SIZE]
+            rows = connection.execute(
+                "SELECT path, fingerprint, metadata FROM files WHERE path IN "
+                f"({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, fingerprint, metadata in rows:
+                path, expected = wanted[key]
+                if fingerprint == expected:
+                    results[path] = json.loads(metadata)
+        with self._init_lock:
+            self._hits += len(results)
+            self._misses += len(wanted) - len(results)
+        return results
+
+    def put_many(self, entries: list[tuple[str, tuple, dict]]):
+        """Stores (path, fingerprint, item) entries in a single transaction."""
+        rows = []
+        for path, fingerprint, item in entries:
+            if fingerprint is None:
+                continue
+            key = self._key(path)
+            rows.append(
+                (
+                    key,
+                    os.path.dirname(key),
+                    fingerprint[0],
+                    fingerprint[1],
+                    self._encode_fingerprint(fingerprint),
+                    json.dumps(item, ensure_ascii=False),
+                )
+            )
+        if not rows:
+            return
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        with self._init_lock:
+            self._writes += len(rows)
+
+    def get_folder_fingerprints(
+        self, folder_path: str, recursive: bool = False
+    ) -> dict[str, str]:
+        """Returns {normalized path: encoded fingerprint} of the files stored for a folder."""
+        folder = self._key(folder_path)
+        connection = self._connection()
+        if recursive:
+            # All keys below the folder sort between 'folder + sep' and the next prefix.
+            prefix = folder.rstrip(os.sep) + os.sep
+            rows = connection.execute(
+                "SELECT path, fingerprint FROM files WHERE path >= ? AND path < ?",
+                (prefix, prefix[:-1] + chr(ord(os.sep) + 1)),
+            )
+        else:
+            rows = connection.execute(
+                "SELECT path, fingerprint FROM files WHERE folder = ?", (folder,)
+            )
+        return dict(rows.fetchall())
+
+    def encoded_fingerprint(self, fingerprint) -> str | None:
+        return None if fingerprint is None else self._encode_fingerprint(fingerprint)
+
+    def iter_items(self):
+        """Yields (normalized path, item) for every stored file."""
+        rows = self._connection().execute("SELECT path, metadata FROM files")
+        while True:
+            batch = rows.fetchmany(_QUERY_BATCH_SIZE)
+            if not batch:
+                return
+            for path, metadata in batch:
+                yield path, json.loads(metadata)
+
+    def invalidate(self, paths: list[str]):
+        keys = [(self._key(path),) for path in paths]
+        if not keys:
+            return
+        connection = self._connection()
+        with connection:
+            connection.executemany("DELETE FROM files WHERE path = ?", keys)
+
+    def stats(self) -> dict:
+        connection = self._connection()
+        (entries,) = connection.execute("SELECT COUNT(*) FROM files").fetchone()
+        with self._init_lock:
+            return {
+                "entries": entries,
+                "path": self.db_path,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+            }
+
+
+metadata_catalog = MetadataCatalog()
@@ -0,0 +1,139 @@
+import threading
+from collections import deque
+from config import (
+    PREFETCH_WORKERS,
+    PREFETCH_MAX_FILES,
+    PREFETCH_METADATA_CHUNK_SIZE,
+    PREFETCH_THUMBNAIL_SIZE,
+)
+from app.services.exif_service import read_metadata_for_files
+from app.services.thumbnail_service import thumbnail_service
+
+
+class _PrefetchJob:
+    """The queued warm-up tasks for one folder, in the order they should run."""
+
+    __slots__ = ("folder", "tasks")
+
+    def __init__(self, folder: str | None, tasks: deque):
+        self.folder = folder
+        self.tasks = tasks
+
+
+class PrefetchService:
+    """
+    Warms the metadata cache and the thumbnail cache for the files the client is
+    about to show. Only one job is active at a time: scheduling a new one drops
+    whatever is still queued for the previous folder. Files are processed in the
+    order given, so the client should list the visible ones first.
+    """
+
+    def __init__(self, workers: int = PREFETCH_WORKERS):
+        self.workers = workers
+        self._condition = threading.Condition()
+        self._job = None
+        self._threads = []
+        self._scheduled = 0
+        self._completed = 0
+        self._cancelled = 0
+        self._failed = 0
+
+    def schedule(self, file_paths: list[str], folder: str | None = None) -> int:
+        """
+        Replaces the current job with warm-up work for `file_paths` and returns the
+        number of files queued. Each chunk of metadata is followed by the
+        thumbnails of the same files, so the first screen is ready first.
+        """
+        return self._enqueue(file_paths, folder, replace=True)
+
+    def extend(self, file_paths: list[str], folder: str | None = None) -> int:
+        """
+        Appends warm-up work for `file_paths` to the current job if it is for the
+        same folder, e.g. for the next page of a listing, without dropping what is
+        still queued. Otherwise it starts a new job like schedule().
+        """
+        return self._enqueue(file_paths, folder, replace=False)
+
+    def _enqueue(self, file_paths: list[str], folder: str | None, replace: bool) -> int:
+        if self.workers <= 0:
+            return 0
+        file_paths = list(dict.fromkeys(file_paths))[:PREFETCH_MAX_FILES]
+        tasks = deque()
+        for i in range(0, len(file_paths), PREFETCH_METADATA_CHUNK_SIZE):
+            chunk = file_paths[i : i + PREFETCH_METADATA_CHUNK_SIZE]
+            tasks.append((self._prefetch_metadata, chunk))
+            tasks.extend((self._prefetch_thumbnail, path) for path in chunk)
+
+        with self._condition:
+            if not replace and self._job is not None and self._job.folder == folder:
+                self._job.tasks.extend(tasks)
+            else:
+                if self._job is not None:
+                    self._cancelled += len(self._job.tasks)
+                self._job = _PrefetchJob(folder, tasks)
+            self._scheduled += len(tasks)
+            self._start_workers()
+            self._condition.notify_all()
+        return len(file_paths)
+
+    def cancel(self, folder: str | None = None):
+        """Drops the queued work, or only that of `folder` if one is given."""
+        with self._condition:
+            if self._job is None:
+                return
+            if folder is not None and self._job.folder != folder:
+                return
+            self._cancelled += len(self._job.tasks)
+            self._job = None
+
+    def _start_workers(self):
+        # Called with the condition held; threads are created on first use.
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._run, name=f"prefetch-{len(self._threads)}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        with self._condition:
+            while self._job is None or not self._job.tasks:
+                self._job = None
+                self._condition.wait()
+            return self._job.tasks.popleft()
+
+    def _run(self):
+        while True:
+            task, argument = self._next_task()
+            try:
+                task(argument)
+            except Exception:
+                # Warm-up is best effort; the real request will report the error.
+                with self._condition:
+                    self._failed += 1
+                continue
+            with self._condition:
+                self._completed += 1
+
+    @staticmethod
+    def _prefetch_metadata(file_paths: list[str]):
+        read_metadata_for_files(file_paths)
+
+    @staticmethod
+    def _prefetch_thumbnail(file_path: str):
+        thumbnail_service.get_thumbnail(file_path, PREFETCH_THUMBNAIL_SIZE)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "folder": self._job.folder if self._job else None,
+                "pending": len(self._job.tasks) if self._job else 0,
+                "workers": self.workers,
+                "scheduled": self._scheduled,
+                "completed": self._completed,
+                "cancelled": self._cancelled,
+                "failed": self._failed,
+            }
+
+
+prefetch_service = PrefetchService()
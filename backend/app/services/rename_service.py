@@ -3,7 +3,59 @@ import re
 import subprocess
 import json
 from datetime import datetime
-from config import EXIFTOOL_PATH
+from app.services.exiftool_pool import exiftool_pool
+from app.services.exif_service import get_sidecar_paths, read_metadata_for_files
+
+# Placeholders that can be answered from the raw record kept in the metadata
+# cache and catalog: ExifTool resolves these tag names to exactly these tags, and
+# their values print the same with and without '-n'.
+_CATALOG_TAGS = {
+    "DateTimeOriginal": "ExifIFD:DateTimeOriginal",
+    "Title": "XMP-dc:Title",
+}
+
+
+def _read_catalog_values(file_path: str, tags: list[str]) -> dict | None:
+    """
+    Returns the values of the given tags from the cached raw record, or None if
+    any of them has to be read with ExifTool.
+    """
+    if not all(tag in _CATALOG_TAGS for tag in tags):
+        return None
+    sidecar = get_sidecar_paths([file_path]).get(file_path)
+    if sidecar and os.path.isfile(sidecar):
+        # ExifTool would let any tag of the sidecar take precedence.
+        return None
+    items = read_metadata_for_files([file_path])
+    if not items:
+        return None
+    original = items[0].get("original", {})
+    values = {}
+    for tag in tags:
+        if _CATALOG_TAGS[tag] not in original:
+            # ExifTool may still find the tag in another group.
+            return None
+        values[tag] = original[_CATALOG_TAGS[tag]]
+    return values
+
+
+def _read_tag_values(file_path: str, tags: list[str]) -> dict:
+    """Reads arbitrary tags with ExifTool, preferring values from an XMP sidecar."""
+    command = ["-json", "-s"]
+    for tag in tags:
+        command.append(f"-{tag}")
+    command.append(file_path)
+    sidecar = get_sidecar_paths([file_path]).get(file_path)
+    if sidecar and os.path.isfile(sidecar):
+        command.append(sidecar)
+
+    output = exiftool_pool.execute(command)
+    records = json.loads(output.decode("utf-8"))
+    metadata = records[0]
+    # Values written to the sidecar take precedence over the file's own.
+    for sidecar_record in records[1:]:
+        metadata.update(sidecar_record)
+    return metadata
 
 
 def generate_filename_from_pattern(
@@ -26,13 +78,9 @@ def generate_filename_from_pattern(
 
         requested_tags = list(set([p[0] for p in placeholders]))
 
-        command = [EXIFTOOL_PATH, "-json", "-s"]
-        for tag in requested_tags:
-            command.append(f"-{tag}")
-        command.append(file_path)
-
-        result = subprocess.run(command, capture_output=True, check=True)
-        metadata = json.loads(result.stdout.decode("utf-8"))[0]
+        metadata = _read_catalog_values(file_path, requested_tags)
+        if metadata is None:
+            metadata = _read_tag_values(file_path, requested_tags)
 
         for tag in requested_tags:
             if tag not in metadata:
@@ -0,0 +1,462 @@
+import os
+import re
+import bisect
+import heapq
+import threading
+from collections import Counter
+from itertools import chain
+from app.services.metadata_catalog import metadata_catalog
+
+# Facet name -> application field whose values are indexed for it.
+FACET_FIELDS = {
+    "keyword": "Keywords",
+    "city": "CityCreated",
+    "country": "CountryCreated",
+    "creator": "Creator",
+}
+
+_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+
+
+class SearchQueryError(ValueError):
+    """Raised for a keyword query that cannot be parsed."""
+
+
+def _terms(value) -> set[str]:
+    """Normalizes a field value (a string or a list of strings) to index terms."""
+    if value is None:
+        return set()
+    values = value if isinstance(value, list) else [value]
+    return {str(v).strip().lower() for v in values if str(v).strip()}
+
+
+def _normalize_date(value) -> str | None:
+    """
+    Returns 'YYYY:MM:DD HH:MM:SS' for EXIF/XMP style dates (or 'YYYY-MM-DD'), so
+    that dates sort correctly as strings. Missing time parts are padded.
+    """
+    if not value:
+        return None
+    match = re.match(
+        r"^(\d{4})[:-](\d{2})[:-](\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?)?",
+        str(value),
+    )
+    if not match:
+        return None
+    year, month, day, hour, minute, second = match.groups()
+    return f"{year}:{month}:{day} {hour or '00'}:{minute or '00'}:{second or '00'}"
+
+
+def _coordinate(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_EMPTY = frozenset()
+
+
+class _Document:
+    __slots__ = ("key", "path", "terms", "date", "latitude", "longitude")
+
+    def __init__(self, key, path, terms, date, latitude, longitude):
+        self.key = key
+        self.path = path
+        self.terms = terms  # {facet: set of terms}
+        self.date = date
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+class SearchIndex:
+    """
+    In-memory inverted indexes over processed metadata: a postings set per facet
+    value (keyword, city, country, creator), a sorted date index and a
+    latitude-sorted GPS index. Documents are added or replaced as files are read,
+    so the index follows the metadata cache and the catalog incrementally. It is
+    seeded from the catalog on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._ids = {}  # normalized path -> document id
+        self._documents = {}  # document id -> _Document
+        self._free_ids = []
+        self._next_id = 0
+        self._postings = {facet: {} for facet in FACET_FIELDS}
+        self._folders = {}  # normalized folder -> set of ids
+        self._dates = []  # sorted (date, path, id), the order results are listed in
+        self._latitudes = []  # sorted (latitude, id)
+        # Entries of removed or replaced documents that are still in the lists
+        # above. They are dropped, and new entries sorted in, on the next query.
+        self._stale_dates = set()
+        self._stale_latitudes = set()
+        self._unsorted = False
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def _ensure_loaded(self):
+        # Called with the lock held.
+        if self._loaded:
+            return
+        self._loaded = True
+        for path, item in metadata_catalog.iter_items():
+            self._update(item.get("SourceFile") or path, item)
+
+    def update(self, path: str, item: dict):
+        """Adds or replaces the indexed document of a file."""
+        with self._lock:
+            self._update(path, item)
+
+    def update_many(self, entries: list[tuple[str, dict]]):
+        with self._lock:
+            for path, item in entries:
+                self._update(path, item)
+
+    def _update(self, path: str, item: dict):
+        key = self._key(path)
+        doc_id = self._ids.get(key)
+        if doc_id is not None:
+            self._remove_document(doc_id)
+        elif self._free_ids:
+            doc_id = self._ids[key] = self._free_ids.pop()
+        else:
+            doc_id = self._ids[key] = self._next_id
+            self._next_id += 1
+
+        def value(field):
+            return (item.get(field) or {}).get("value")
+
+        document = _Document(
+            key,
+            os.path.normpath(path),
+            {facet: _terms(value(field)) for facet, field in FACET_FIELDS.items()},
+            _normalize_date(value("DateTimeOriginal")),
+            _coordinate(value("LatitudeCreated")),
+            _coordinate(value("LongitudeCreated")),
+        )
+        self._documents[doc_id] = document
+        self._folders.setdefault(os.path.dirname(key), set()).add(doc_id)
+        for facet, terms in document.terms.items():
+            postings = self._postings[facet]
+            for term in terms:
+                postings.setdefault(term, set()).add(doc_id)
+        # Appended and sorted on the next query, so that bulk loads and re-indexing
+        # stay O(n log n) per batch.
+        if document.date:
+            self._add_entry(
+                self._dates, self._stale_dates, (document.date, document.path, doc_id)
+            )
+        if document.latitude is not None and document.longitude is not None:
+            self._add_entry(
+                self._latitudes, self._stale_latitudes, (document.latitude, doc_id)
+            )
+
+    def _add_entry(self, entries: list, stale: set, entry: tuple):
+        if entry in stale:
+            # The document was re-indexed with the same value; its old entry is
+            # still in the list and becomes valid again.
+            stale.discard(entry)
+        else:
+            entries.append(entry)
+            self._unsorted = True
+
+    def _ensure_sorted(self):
+        # Called with the lock held.
+        if self._stale_dates:
+            stale = self._stale_dates
+            self._dates = [entry for entry in self._dates if entry not in stale]
+            stale.clear()
+        if self._stale_latitudes:
+            stale = self._stale_latitudes
+            self._latitudes = [entry for entry in self._latitudes if entry not in stale]
+            stale.clear()
+        if self._unsorted:
+            self._dates.sort()
+            self._latitudes.sort()
+            self._unsorted = False
+
+    def _remove_document(self, doc_id: int):
+        document = self._documents.pop(doc_id)
+        for facet, terms in document.terms.items():
+            postings = self._postings[facet]
+            for term in terms:
+                ids = postings.get(term)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del postings[term]
+        folder = os.path.dirname(document.key)
+        ids = self._folders.get(folder)
+        if ids is not None:
+            ids.discard(doc_id)
+            if not ids:
+                del self._folders[folder]
+        if document.date:
+            self._stale_dates.add((document.date, document.path, doc_id))
+        if document.latitude is not None and document.longitude is not None:
+            self._stale_latitudes.add((document.latitude, doc_id))
+
+    def remove(self, paths: list[str]):
+        """Drops the documents of files that no longer exist."""
+        with self._lock:
+            for path in paths:
+                doc_id = self._ids.pop(self._key(path), None)
+                if doc_id is not None:
+                    self._remove_document(doc_id)
+                    self._free_ids.append(doc_id)
+
+    def _parse_keyword_query(self, query: str) -> set[int]:
+        """
+        Evaluates a boolean keyword query such as 'beach AND (sunset OR "golden
+        hour") NOT people'. Adjacent terms are ANDed; NOT binds to the next term.
+        """
+        tokens = []
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = _TOKEN.match(query, position)
+            if not match:
+                raise SearchQueryError("Invalid keyword query")
+            position = match.end()
+            opening, closing, quoted, word = match.groups()
+            if opening:
+                tokens.append("(")
+            elif closing:
+                tokens.append(")")
+            elif quoted is not None:
+                tokens.append(("term", quoted))
+            elif word.upper() in ("AND", "OR", "NOT"):
+                tokens.append(word.upper())
+            else:
+                tokens.append(("term", word))
+            while position < len(query) and query[position].isspace():
+                position += 1
+
+        keywords = self._postings["keyword"]
+        universe = self._documents.keys()
+
+        def parse_or(index):
+            result, index = parse_and(index)
+            while index < len(tokens) and tokens[index] == "OR":
+                right, index = parse_and(index + 1)
+                result = result | right
+            return result, index
+
+        def parse_and(index):
+            result, index = parse_not(index)
+            while index < len(tokens) and tokens[index] not in ("OR", ")"):
+                if tokens[index] == "AND":
+                    index += 1
+                right, index = parse_not(index)
+                result = result & right
+            return result, index
+
+        def parse_not(index):
+            if index < len(tokens) and tokens[index] == "NOT":
+                operand, index = parse_not(index + 1)
+                return universe - operand, index
+            return parse_atom(index)
+
+        def parse_atom(index):
+            if index >= len(tokens):
+                raise SearchQueryError("Unexpected end of keyword query")
+            token = tokens[index]
+            if token == "(":
+                result, index = parse_or(index + 1)
+                if index >= len(tokens) or tokens[index] != ")":
+                    raise SearchQueryError("Missing ')' in keyword query")
+                return result, index + 1
+            if isinstance(token, tuple):
+                return keywords.get(token[1].strip().lower(), _EMPTY), index + 1
+            raise SearchQueryError(f"Unexpected '{token}' in keyword query")
+
+        if not tokens:
+            return universe
+        result, index = parse_or(0)
+        if index != len(tokens):
+            raise SearchQueryError(f"Unexpected '{tokens[index]}' in keyword query")
+        return result
+
+    def _date_range(self, date_from: str | None, date_to: str | None) -> set[int]:
+        start = 0
+        end = len(self._dates)
+        if date_from:
+            normalized = _normalize_date(date_from)
+            if not normalized:
+                raise SearchQueryError(f"Invalid date '{date_from}'")
+            start = bisect.bisect_left(self._dates, (normalized,))
+        if date_to:
+            normalized = _normalize_date(date_to)
+            if not normalized:
+                raise SearchQueryError(f"Invalid date '{date_to}'")
+            if len(str(date_to)) <= 10:
+                # A date without a time includes the whole day.
+                normalized = normalized[:11] + "23:59:59"
+            # Sorts after every entry of that date and before any later date.
+            end = bisect.bisect_left(self._dates, (normalized + "\0",))
+        return {doc_id for _, _, doc_id in self._dates[start:end]}
+
+    def _bounding_box(self, bbox: tuple[float, float, float, float]) -> set[int]:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        start = bisect.bisect_left(self._latitudes, (min_lat, -1))
+        end = bisect.bisect_right(self._latitudes, (max_lat, float("inf")))
+        result = set()
+        for _, doc_id in self._latitudes[start:end]:
+            longitude = self._documents[doc_id].longitude
+            if min_lon <= max_lon:
+                inside = min_lon <= longitude <= max_lon
+            else:
+                # The box crosses the antimeridian.
+                inside = longitude >= min_lon or longitude <= max_lon
+            if inside:
+                result.add(doc_id)
+        return result
+
+    def _facet_counts(self, result, limit: int) -> dict:
+        """
+        Counts facet values over the result by walking the terms of its documents,
+        which costs O(len(result)) instead of one set intersection per value. When
+        the result covers most documents, the complement is subtracted from the
+        postings sizes instead.
+        """
+        if limit <= 0:
+            return {facet: [] for facet in self._postings}
+        documents = self._documents
+        complement = None
+        if len(result) * 2 > len(documents):
+            complement = documents.keys() - result
+        facets = {}
+        for facet, postings in self._postings.items():
+            counts = Counter(
+                chain.from_iterable(
+                    documents[doc_id].terms[facet]
+                    for doc_id in (result if complement is None else complement)
+                )
+            )
+            if complement is not None:
+                counts = {
+                    term: len(ids) - counts.get(term, 0)
+                    for term, ids in postings.items()
+                }
+            top = heapq.nsmallest(
+                limit,
+                ((-count, term) for term, count in counts.items() if count > 0),
+            )
+            facets[facet] = [{"value": term, "count": -count} for count, term in top]
+        return facets
+
+    def search(
+        self,
+        keyword_query: str | None = None,
+        filters: dict[str, list[str]] | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        folder: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+        facet_limit: int = 20,
+    ) -> dict:
+        """
+        Returns {total, results, facets}. Filters are ANDed; the values given for one
+        facet in `filters` ({'city': [...], ...}) are ORed. Results are sorted by
+        date, then path.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._ensure_sorted()
+            candidates = []
+            if keyword_query and keyword_query.strip():
+                candidates.append(self._parse_keyword_query(keyword_query))
+            for facet, values in (filters or {}).items():
+                if facet not in self._postings:
+                    raise SearchQueryError(f"Unknown facet '{facet}'")
+                postings = self._postings[facet]
+                matched = _EMPTY
+                for value in values:
+                    matched = matched | postings.get(value.strip().lower(), _EMPTY)
+                candidates.append(matched)
+            if date_from or date_to:
+                candidates.append(self._date_range(date_from, date_to))
+            if bbox:
+                candidates.append(self._bounding_box(bbox))
+
+            if folder:
+                # The folder and all of its subfolders.
+                folder_key = self._key(folder)
+                prefix = folder_key.rstrip(os.sep) + os.sep
+                matched = set()
+                for path, ids in self._folders.items():
+                    if path == folder_key or path.startswith(prefix):
+                        matched |= ids
+                candidates.append(matched)
+
+            if candidates:
+                # Intersecting the smallest sets first keeps the work proportional
+                # to the most selective filter.
+                candidates.sort(key=len)
+                result = candidates[0]
+                for other in candidates[1:]:
+                    result = result & other
+            else:
+                result = self._documents.keys()
+
+            return {
+                "total": len(result),
+                "results": self._page(result, offset, limit),
+                "facets": self._facet_counts(result, facet_limit),
+            }
+
+    def _page(self, result, offset: int, limit: int) -> list[str]:
+        """
+        Returns the paths of one page of results, ordered by date (undated files
+        last) and then path. Large result sets are walked in the order of the date
+        index instead of being sorted; both paths use the same total order, so the
+        pages of one query never overlap whichever path serves them.
+        """
+        documents = self._documents
+        wanted = offset + limit
+        if len(result) <= 4 * wanted or len(result) * 8 < len(documents):
+            ordered = sorted(
+                result,
+                key=lambda doc_id: (
+                    documents[doc_id].date is None,
+                    documents[doc_id].date or "",
+                    documents[doc_id].path,
+                    doc_id,
+                ),
+            )
+            return [documents[doc_id].path for doc_id in ordered[offset:wanted]]
+
+        page = []
+        for _, _, doc_id in self._dates:
+            if doc_id in result:
+                page.append(doc_id)
+                if len(page) == wanted:
+                    break
+        if len(page) < wanted:
+            undated = sorted(
+                (documents[doc_id].path, doc_id)
+                for doc_id in result
+                if documents[doc_id].date is None
+            )
+            page.extend(doc_id for _, doc_id in undated[: wanted - len(page)])
+        return [documents[doc_id].path for doc_id in page[offset:]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._ensure_sorted()
+            return {
+                "documents": len(self._documents),
+                "terms": {facet: len(p) for facet, p in self._postings.items()},
+                "dated": len(self._dates),
+                "geotagged": len(self._latitudes),
+            }
+
+
+search_index = SearchIndex()
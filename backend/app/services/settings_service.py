@@ -1,5 +1,8 @@
-import json
+import copy
+from collections.abc import Mapping
+from types import MappingProxyType
 from config import SETTINGS_PATH
+from app.services.json_store import JsonStore
 
 DEFAULT_SETTINGS = {
     "appBehavior": {
@@ -35,7 +38,12 @@ DEFAULT_SETTINGS = {
         ],
     },
     "powerUser": {
+        # Non-RAW formats listed in the gallery, next to the RAW formats below.
+        "imageExtensions": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff"],
         "rawExtensions": [".cr2", ".nef", ".arw", ".dng"],
+        # Extensions whose metadata is written to an '.xmp' sidecar instead of the
+        # file itself, e.g. [".cr2", ".nef", ".arw"] to avoid rewriting large RAWs.
+        "xmpSidecarExtensions": [],
         "sorting": {
             "recencyBonus": 100,
             "recencyDays": 7,
@@ -295,45 +303,136 @@ DEFAULT_SETTINGS = {
 }
 
 
+# Reading never writes: a missing file is only created by the first change.
+_store = JsonStore(
+    SETTINGS_PATH,
+    lambda: copy.deepcopy(DEFAULT_SETTINGS),
+    create_missing=False,
+    reload_on_change=True,
+)
+
+
+def _freeze(value):
+    """Returns a read-only copy: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    """Returns a mutable deep copy of a frozen value."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class _SettingsSnapshot:
+    """The settings merged with the defaults, frozen, plus derived lookup tables."""
+
+    def __init__(self, version: int, settings: dict):
+        merged = copy.deepcopy(settings)
+        _ensure_default_keys(merged, DEFAULT_SETTINGS)
+        self.version = version
+        self.data = _freeze(merged)
+        self.country_names = {
+            m["code"].upper(): m["name"]
+            for m in merged.get("countryMappings") or []
+            if m.get("code") and m.get("name")
+        }
+        self.extension_casing = {
+            rule["extension"].lower(): rule["casing"]
+            for rule in (merged.get("renameSettings") or {}).get("extensionRules")
+            or []
+            if rule.get("extension")
+        }
+
+
+_snapshot = None
+
+
+def get_snapshot() -> _SettingsSnapshot:
+    """
+    Returns the current settings snapshot. It is rebuilt only after the settings
+    were changed through this module or settings.json was edited on disk.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    with _store.lock:
+        data = _store.get()
+        if snapshot is None or snapshot.version != _store.version:
+            snapshot = _snapshot = _SettingsSnapshot(_store.version, data)
+    return snapshot
+
+
 def load_settings() -> dict:
-    """Loads settings, creating or repairing the file with defaults if necessary."""
-    try:
-        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-            settings = json.load(f)
-            # Recursively ensure all default keys exist
-            _ensure_default_keys(settings, DEFAULT_SETTINGS)
-            save_settings(settings)
-            return settings
-    except (FileNotFoundError, json.JSONDecodeError):
-        save_settings(DEFAULT_SETTINGS)
-        return DEFAULT_SETTINGS
+    """Returns a mutable copy of the settings, including any missing default keys."""
+    return _thaw(get_snapshot().data)
 
 
 def save_settings(data: dict):
-    """Saves the settings data to the settings.json file."""
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Saves the settings data; settings.json is written behind."""
+    _store.set(data)
+
+
+def update_settings(updates: dict) -> dict:
+    """Merges top-level sections into the settings and saves them."""
+    with _store.lock:
+        settings = load_settings()
+        settings.update(updates)
+        save_settings(settings)
+        return settings
+
+
+def set_setting(key, value):
+    """Sets a single nested setting value, e.g. 'appBehavior.lastOpenedFolder'."""
+    with _store.lock:
+        settings = load_settings()
+        *parents, last = key.split(".")
+        target = settings
+        for k in parents:
+            target = target.setdefault(k, {})
+        target[last] = value
+        save_settings(settings)
 
 
 def get_setting(key, default=None):
-    """Utility function to get a single nested setting value."""
-    settings = load_settings()
-    keys = key.split(".")
-    value = settings
-    for k in keys:
-        if isinstance(value, dict):
+    """
+    Utility function to get a single nested setting value. Dicts and lists are
+    returned read-only (as mappings and tuples).
+    """
+    value = get_snapshot().data
+    for k in key.split("."):
+        if isinstance(value, Mapping):
             value = value.get(k)
         else:
             return default
     return value if value is not None else default
 
 
-def _ensure_default_keys(settings, defaults):
+def get_country_names() -> dict[str, str]:
+    """Returns {uppercase country code: name} from the country mappings."""
+    return get_snapshot().country_names
+
+
+def get_extension_casing() -> dict[str, str]:
+    """Returns {lowercase extension: 'lowercase'|'uppercase'} from the rename rules."""
+    return get_snapshot().extension_casing
+
+
+def _ensure_default_keys(settings, defaults) -> bool:
     """Recursively add missing default keys to the settings object."""
+    changed = False
     for key, value in defaults.items():
         if key not in settings:
-            settings[key] = value
+            settings[key] = copy.deepcopy(value)
+            changed = True
         elif isinstance(value, dict) and isinstance(settings.get(key), dict):
-            _ensure_default_keys(settings[key], value)
+            changed = _ensure_default_keys(settings[key], value) or changed
         elif isinstance(value, dict):
-            settings[key] = value
+            settings[key] = copy.deepcopy(value)
+            changed = True
+    return changed
@@ -1,7 +1,48 @@
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from app.services.settings_service import get_setting
 
 
+@lru_cache(maxsize=4096)
+def parse_last_used(last_used_str: str) -> datetime | None:
+    try:
+        # The 'Z' at the end of an ISO 8601 string signifies UTC,
+        # which fromisoformat can handle directly in Python 3.11+.
+        # For compatibility, we'll handle it manually.
+        if last_used_str.endswith("Z"):
+            last_used_str = last_used_str[:-1] + "+00:00"
+        return datetime.fromisoformat(last_used_str)
+    except (ValueError, TypeError):
+        # Handle cases where lastUsed is not a valid date string.
+        return None
+
+
+def get_recency_settings() -> tuple[int, datetime]:
+    """Returns (recency bonus, threshold after which a use counts as recent)."""
+    recency_bonus = get_setting("powerUser.sorting.recencyBonus", 100)
+    recency_days = get_setting("powerUser.sorting.recencyDays", 7)
+    return recency_bonus, datetime.now(timezone.utc) - timedelta(days=recency_days)
+
+
+def usage_score(
+    usage_count: int,
+    last_used_str: str | None,
+    recency_threshold: datetime,
+    recency_bonus: int,
+) -> int:
+    """Scores an item by its usage count plus a bonus if it was used recently."""
+    bonus = 0
+    if last_used_str:
+        last_used_date = parse_last_used(last_used_str)
+        try:
+            if last_used_date is not None and last_used_date > recency_threshold:
+                bonus = recency_bonus
+        except TypeError:
+            # A naive date cannot be compared with the aware threshold.
+            pass
+    return (usage_count or 0) + bonus
+
+
 def smart_sort(items_map: dict, query: str) -> list:
     """
     Filters a dictionary of items by a query string and then sorts them
@@ -15,11 +56,7 @@ def smart_sort(items_map: dict, query: str) -> list:
     Returns:
         A sorted list of item names (the keys of the input map).
     """
-    recency_bonus = get_setting("powerUser.sorting.recencyBonus", 100)
-    recency_days = get_setting("powerUser.sorting.recencyDays", 7)
-
-    now = datetime.now(timezone.utc)
-    recency_threshold = now - timedelta(days=recency_days)
+    recency_bonus, recency_threshold = get_recency_settings()
 
     # 1. Filter the items based on the query.
     filtered_items = {
@@ -28,26 +65,12 @@ def smart_sort(items_map: dict, query: str) -> list:
 
     # 2. Score each filtered item.
     def calculate_score(item_data: dict) -> int:
-        base_score = item_data.get("usageCount", 0)
-        last_used_str = item_data.get("lastUsed")
-
-        bonus = 0
-        if last_used_str:
-            try:
-                # The 'Z' at the end of an ISO 8601 string signifies UTC,
-                # which fromisoformat can handle directly in Python 3.11+.
-                # For compatibility, we'll handle it manually.
-                if last_used_str.endswith("Z"):
-                    last_used_str = last_used_str[:-1] + "+00:00"
-                last_used_date = datetime.fromisoformat(last_used_str)
-
-                if last_used_date > recency_threshold:
-                    bonus = recency_bonus
-            except (ValueError, TypeError):
-                # Handle cases where lastUsed is not a valid date string.
-                pass
-
-        return base_score + bonus
+        return usage_score(
+            item_data.get("usageCount", 0),
+            item_data.get("lastUsed"),
+            recency_threshold,
+            recency_bonus,
+        )
 
     # 3. Sort the filtered items by their calculated score.
     sorted_keys = sorted(
@@ -0,0 +1,154 @@
+import os
+import hashlib
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from PIL import Image, ImageOps
+from config import THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_MAX_BYTES
+from app.services.exif_service import get_image_data
+
+# Thumbnail edge lengths are snapped to these sizes so that slightly different
+# requests from the client share one cache entry.
+THUMBNAIL_SIZES = (128, 256, 400, 800)
+THUMBNAIL_QUALITY = 85
+
+
+class ThumbnailService:
+    """
+    Produces downscaled, correctly oriented JPEG thumbnails and keeps them in a
+    size-capped, content-addressed disk cache with LRU eviction.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = THUMBNAIL_CACHE_DIR,
+        max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None  # OrderedDict of cache file name -> size, oldest first
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def snap_size(size: int) -> int:
+        """Returns the smallest supported thumbnail size that is at least `size`."""
+        return next((s for s in THUMBNAIL_SIZES if s >= size), THUMBNAIL_SIZES[-1])
+
+    def _load_index(self):
+        """Builds the LRU index from the cache directory, using mtime as last access."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        files.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in files)
+        self._total_bytes = sum(self._entries.values())
+
+    def _cache_name(self, file_path: str, stat: os.stat_result, size: int) -> str:
+        # The orientation is baked into the thumbnail. It can only change by
+        # rewriting the file, which changes the mtime and therefore the key.
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{size}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg"
+
+    def get_thumbnail(self, file_path: str, size: int) -> bytes | None:
+        """Returns JPEG thumbnail bytes for a file, rendering and caching it on a miss."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        size = self.snap_size(size)
+        cache_name = self._cache_name(file_path, stat, size)
+        cache_path = os.path.join(self.cache_dir, cache_name)
+
+        with self._lock:
+            if self._entries is None:
+                self._load_index()
+            cached = cache_name in self._entries
+            if cached:
+                self._entries.move_to_end(cache_name)
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if cached:
+            try:
+                with open(cache_path, "rb") as f:
+                    thumbnail_bytes = f.read()
+                os.utime(cache_path)
+                return thumbnail_bytes
+            except OSError:
+                # The file vanished behind our back; forget it and render again.
+                with self._lock:
+                    self._total_bytes -= self._entries.pop(cache_name, 0)
+
+        thumbnail_bytes = self._render(file_path, size)
+        if thumbnail_bytes:
+            self._store(cache_name, thumbnail_bytes)
+        return thumbnail_bytes
+
+    def _render(self, file_path: str, size: int) -> bytes | None:
+        image_bytes, _ = get_image_data(file_path)
+        if not image_bytes:
+            return None
+        try:
+            image = Image.open(BytesIO(image_bytes))
+            # For JPEGs this lets the decoder skip most of the DCT work.
+            image.draft("RGB", (size, size))
+            image.thumbnail((size, size))
+            # JPEG data is delivered with its EXIF orientation instead of rotated.
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            byte_buffer = BytesIO()
+            image.save(byte_buffer, format="JPEG", quality=THUMBNAIL_QUALITY)
+            return byte_buffer.getvalue()
+        except Exception:
+            return None
+
+    def _store(self, cache_name: str, thumbnail_bytes: bytes):
+        cache_path = os.path.join(self.cache_dir, cache_name)
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(thumbnail_bytes)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            return
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(cache_name, 0)
+            self._entries[cache_name] = len(thumbnail_bytes)
+            self._total_bytes += len(thumbnail_bytes)
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                name, entry_size = self._entries.popitem(last=False)
+                self._total_bytes -= entry_size
+                self._evictions += 1
+                evicted.append(name)
+        for name in evicted:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self._entries is None:
+                self._load_index()
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+thumbnail_service = ThumbnailService()
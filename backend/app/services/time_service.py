@@ -66,6 +66,7 @@ class TimeShiftService:
 
         shift_delta = self._get_time_shift_delta(shift_data)
         all_metadata = exif_service.read_metadata_for_files(file_paths)
+        commands = []
 
         for metadata in all_metadata:
             source_file = metadata.get("SourceFile")
@@ -87,12 +88,14 @@ class TimeShiftService:
                 # update, we don't need to check for existing tags; we just overwrite.
                 args = exif_service.build_exiftool_args({}, update_payload)
                 if args:
-                    exif_service.run_exiftool_command(args + [source_file])
+                    commands.append(args + [source_file])
             except (ValueError, TypeError):
                 # Skip files with invalid date formats
                 continue
 
-        return True
+        # All files are written in one batched ExifTool stream.
+        results = exif_service.run_exiftool_batch(commands)
+        return all(result.status == 0 for result in results)
 
 
 time_shift_service = TimeShiftService()
@@ -0,0 +1,61 @@
+"""
+Shared helpers for the benchmarks. Run a benchmark from the backend directory,
+e.g. `python -m benchmarks.metadata_plan`.
+"""
+
+import os
+import random
+import tempfile
+import time
+import config
+
+
+def use_scratch_data_dir():
+    """
+    Points the data files at a temporary directory so a benchmark never touches
+    the real keywords, presets, settings or catalog. Call before importing app.
+    """
+    data_dir = tempfile.mkdtemp(prefix="phototagger-bench-")
+    config.KEYWORDS_PATH = os.path.join(data_dir, "keywords.json")
+    config.LOCATIONS_PATH = os.path.join(data_dir, "locations.json")
+    config.SETTINGS_PATH = os.path.join(data_dir, "settings.json")
+    config.METADATA_CATALOG_PATH = os.path.join(data_dir, "metadata_catalog.sqlite3")
+    config.THUMBNAIL_CACHE_DIR = os.path.join(data_dir, "thumbnail_cache")
+    return data_dir
+
+
+def synthetic_raw_records(count: int, seed: int = 1) -> list[dict]:
+    """
+    Returns raw '-G1 -n' ExifTool records with a value for most TAG_MAP sources.
+    Some sources disagree and some are missing, so both consolidation outcomes
+    and the Canon:TimeZone fallback are exercised.
+    """
+    from app.metadata_schema import TAG_MAP
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        record = {"SourceFile": f"/photos/{i // 500:03d}/IMG_{i:05d}.JPG"}
+        for key, details in TAG_MAP.items():
+            shared = f"{key} {i % 97}"
+            for tag, source in details.get("sources", {}).items():
+                if rng.random() < 0.15:
+                    continue
+                if source.get("value_handler") == "minutes_hhmm":
+                    record[tag] = rng.choice([-300, 0, 60, 120, 330])
+                elif details.get("handler") == "list":
+                    record[tag] = [f"keyword {rng.randrange(2000)}" for _ in range(3)]
+                else:
+                    record[tag] = shared if rng.random() < 0.9 else f"{shared}!"
+        records.append(record)
+    return records
+
+
+def measure(function, *args, repeat: int = 5) -> float:
+    """Returns the best wall time of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
@@ -0,0 +1,141 @@
+"""
+Per-query latency of keyword suggestions over a synthetic controlled vocabulary:
+KeywordService.get_suggestions (n-gram index, ranking and fuzzy tier) against
+the linear scan it replaced, both as it was (first 10 in file order) and with
+the same usage/recency ranking added. The vocabulary is measured with usage
+spread over the keywords and with no keyword used yet, where all of them share
+one rank.
+
+    python -m benchmarks.keyword_suggestions [keyword count]
+"""
+
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from benchmarks.common import use_scratch_data_dir
+
+data_dir = use_scratch_data_dir()
+
+from app.services.keyword_service import KeywordService
+from app.services.sorting_service import get_recency_settings, usage_score
+
+SYLLABLES = "ka lo mi ne ru sa ti vo be da fe gi hu ja ko li mo nu pe ri so tu".split()
+QUERIES = {
+    "1 character": ["a", "k", "s"],
+    "2 characters": ["ka", "mi", "tu"],
+    "3-4 characters": ["kal", "mine", "sor"],
+    "a word": ["kalomi", "netisa", "rubeda"],
+    "a substring": ["omine", "isabe", "edafe"],
+    "a typo": ["kalmoi", "netias", "rubdea"],
+}
+
+
+def synthetic_keywords(count: int) -> list[dict]:
+    rng = random.Random(1)
+    now = datetime.now(timezone.utc)
+    keywords = []
+    names = set()
+    while len(keywords) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            name += " " + "".join(rng.choice(SYLLABLES) for _ in range(2))
+        if name in names:
+            continue
+        names.add(name)
+        synonyms = [
+            "".join(rng.choice(SYLLABLES) for _ in range(3))
+            for _ in range(rng.choice([0, 0, 0, 1, 2]))
+        ]
+        parent = rng.choice(keywords)["id"] if keywords and rng.random() < 0.5 else None
+        last_used = None
+        if rng.random() < 0.3:
+            last_used = (now - timedelta(days=rng.randint(0, 60))).isoformat()
+        keywords.append(
+            {
+                "id": f"kw{len(keywords)}",
+                "name": name,
+                "useCount": rng.randint(0, 50),
+                "lastUsed": last_used,
+                "createdAt": now.isoformat(),
+                "data": {"parent": parent, "synonyms": synonyms},
+            }
+        )
+    keywords.sort(key=lambda kw: kw["name"].lower())
+    return keywords
+
+
+def scan_first_ten(service: KeywordService, query: str) -> list:
+    """The former get_suggestions match loop: the first 10 hits in file order."""
+    query = query.lower()
+    hits = []
+    for kw in service.keywords:
+        for term in [kw["name"]] + kw["data"].get("synonyms", []):
+            if query in term.lower():
+                hits.append((kw, term))
+                break
+        if len(hits) == 10:
+            break
+    return hits
+
+
+def scan_ranked(service: KeywordService, query: str) -> list:
+    """The same scan over every keyword, ranked by usage and recency."""
+    query = query.lower()
+    recency_bonus, recency_threshold = get_recency_settings()
+    hits = []
+    for kw in service.keywords:
+        for term in [kw["name"]] + kw["data"].get("synonyms", []):
+            if query in term.lower():
+                score = usage_score(
+                    kw["useCount"], kw["lastUsed"], recency_threshold, recency_bonus
+                )
+                hits.append((-score, kw["name"], term))
+                break
+    return heapq.nsmallest(10, hits)
+
+
+def per_query_ms(function, queries, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            function(query)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 25000
+    keywords = synthetic_keywords(count)
+    run(f"{count} keywords", keywords)
+    for keyword in keywords:
+        keyword["useCount"], keyword["lastUsed"] = 0, None
+    run(f"{count} keywords, none used yet", keywords)
+
+
+def run(label: str, keywords: list[dict]):
+    path = os.path.join(data_dir, "benchmark_keywords.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(keywords, f)
+
+    started = time.perf_counter()
+    service = KeywordService(path)
+    print(f"{label}, index built in {time.perf_counter() - started:.2f} s")
+    # Broad queries rank from structures built on first use; that is timed here.
+    started = time.perf_counter()
+    for queries in QUERIES.values():
+        for query in queries:
+            service.get_suggestions(query)
+    print(f"first query of each kind: {time.perf_counter() - started:.2f} s in total")
+    print(f"{'query':<15}{'scan, first 10':>16}{'scan, ranked':>14}{'index':>10}")
+    for label, queries in QUERIES.items():
+        first_ten = per_query_ms(lambda q: scan_first_ten(service, q), queries)
+        ranked = per_query_ms(lambda q: scan_ranked(service, q), queries)
+        indexed = per_query_ms(service.get_suggestions, queries)
+        print(f"{label:<15}{first_ten:13.2f} ms{ranked:11.2f} ms{indexed:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Per-file cost of consolidating raw ExifTool records and of building write
+arguments, with the compiled METADATA_PLAN and with the former per-file walk
+over TAG_MAP (kept below as the reference). Consolidation must produce the same
+output. build_exiftool_args is given the server's current record as well, so it
+also compares every tag with its current value and skips unchanged ones, which
+the reference does not do.
+
+    python -m benchmarks.metadata_plan [record count]
+"""
+
+import sys
+from benchmarks.common import use_scratch_data_dir, synthetic_raw_records, measure
+
+use_scratch_data_dir()
+
+from app.metadata_schema import TAG_MAP
+from app.services.exif_service import (
+    VALUE_HANDLERS,
+    _process_raw_item,
+    build_exiftool_args,
+)
+
+
+def _reference_field(exif_data: dict, sources_details: dict) -> dict:
+    present_values, primary_value = {}, None
+    for tag in sources_details:
+        if tag in exif_data:
+            value = exif_data[tag]
+            present_values[tag] = value
+            if primary_value is None:
+                primary_value = value
+    if not present_values:
+        return {"value": None, "isConsolidated": True}
+    if not primary_value:
+        return {"value": primary_value, "isConsolidated": True}
+    mandatory_sources = [
+        tag
+        for tag, details in sources_details.items()
+        if details.get("write_mode") == "always"
+    ]
+    all_mandatory_are_present = all(tag in present_values for tag in mandatory_sources)
+    all_values_are_same = len(set(str(v) for v in present_values.values())) == 1
+    return {
+        "value": primary_value,
+        "isConsolidated": all_mandatory_are_present and all_values_are_same,
+    }
+
+
+def _reference_process_raw_item(raw_item: dict) -> dict:
+    final_item = {"original": raw_item}
+    transformed_raw_item = raw_item.copy()
+    for details in TAG_MAP.values():
+        for source_tag, source_details in details.get("sources", {}).items():
+            handler_name = source_details.get("value_handler")
+            if handler_name and source_tag in transformed_raw_item:
+                read_func = VALUE_HANDLERS.get(handler_name, {}).get("read")
+                if read_func:
+                    transformed_raw_item[source_tag] = read_func(
+                        transformed_raw_item[source_tag]
+                    )
+    for app_key, details in TAG_MAP.items():
+        sources = details.get("sources")
+        if sources:
+            final_item[app_key] = _reference_field(transformed_raw_item, sources)
+    offset_field = final_item.get("OffsetTimeOriginal")
+    if offset_field and not offset_field.get("value"):
+        canon_tz_tag, handler_details = next(
+            (
+                (tag, d)
+                for tag, d in TAG_MAP["OffsetTimeOriginal"]["sources"].items()
+                if d.get("write_mode") == "if_exists"
+            ),
+            (None, None),
+        )
+        if canon_tz_tag and canon_tz_tag in raw_item and handler_details:
+            read_func = VALUE_HANDLERS.get(
+                handler_details.get("value_handler"), {}
+            ).get("read")
+            if read_func:
+                offset = read_func(raw_item[canon_tz_tag])
+                if offset:
+                    offset_field["value"] = offset
+                    offset_field["isConsolidated"] = False
+    keywords_field = final_item.get("Keywords")
+    if keywords_field and isinstance(keywords_field.get("value"), str):
+        keywords_field["value"] = [keywords_field["value"]]
+    elif keywords_field and keywords_field.get("value") is None:
+        keywords_field["value"] = []
+    if "SourceFile" in raw_item:
+        final_item["SourceFile"] = raw_item["SourceFile"]
+    return final_item
+
+
+def _reference_build_args(original_metadata: dict, new_metadata: dict) -> list[str]:
+    args = []
+    for app_key, new_value in new_metadata.items():
+        details = TAG_MAP.get(app_key)
+        if not details:
+            continue
+        handler = details.get("handler", "simple")
+        for source_tag, source_details in details.get("sources", {}).items():
+            write_mode = source_details.get("write_mode", "always")
+            if (write_mode == "always") or (
+                write_mode == "if_exists" and source_tag in original_metadata
+            ):
+                value_to_write = new_value
+                handler_name = source_details.get("value_handler")
+                if handler_name:
+                    write_func = VALUE_HANDLERS.get(handler_name, {}).get("write")
+                    if write_func:
+                        converted_value = write_func(new_value)
+                        if converted_value is not None:
+                            value_to_write = converted_value
+                if handler == "list":
+                    if isinstance(value_to_write, list):
+                        args.append(f"-{source_tag}=")
+                        for item in value_to_write:
+                            item_str = str(item).strip()
+                            if item_str:
+                                args.append(f"-{source_tag}={item_str}")
+                else:
+                    args.append(f"-{source_tag}={str(value_to_write).strip()}")
+    return args
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    records = synthetic_raw_records(count)
+    assert [_process_raw_item(r) for r in records] == [
+        _reference_process_raw_item(r) for r in records
+    ], "the compiled plan changed the processed output"
+
+    def run(process):
+        for record in records:
+            process(record)
+
+    reference = measure(run, _reference_process_raw_item)
+    compiled = measure(run, _process_raw_item)
+    print(f"Consolidation of {count} synthetic records, per file:")
+    print(
+        f"  per-file TAG_MAP walk:                  {reference / count * 1e6:6.1f} us"
+    )
+    print(f"  compiled plan:                          {compiled / count * 1e6:6.1f} us")
+
+    # A typical edit: a new keyword, a new city and a time zone offset.
+    original = {"XMP-dc:Subject": ["keyword 1"], "Canon:TimeZone": 60}
+    new = {
+        "Keywords": ["keyword 1", "keyword 2"],
+        "CityCreated": "Lisbon",
+        "OffsetTimeOriginal": "+01:00",
+    }
+    updates = 100000
+
+    def build(function):
+        for _ in range(updates):
+            function(original, new)
+
+    reference = measure(build, _reference_build_args)
+    compiled = measure(
+        build, lambda original, new: build_exiftool_args(original, new, original)
+    )
+    print("Write arguments for a three-field edit, per call:")
+    print(
+        f"  per-file TAG_MAP walk:                  {reference / updates * 1e6:6.2f} us"
+    )
+    print(
+        f"  compiled plan, skipping unchanged tags: {compiled / updates * 1e6:6.2f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Consolidating chunks of raw ExifTool records in-process versus in a process
+pool, as _iter_processed_chunks does for large reads (chunks are submitted from
+METADATA_READ_CONCURRENCY threads). Use it to decide whether enabling
+METADATA_PROCESS_WORKERS pays off on a given machine.
+
+    python -m benchmarks.metadata_process_pool [workers] [chunk count]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from benchmarks.common import use_scratch_data_dir, synthetic_raw_records
+
+use_scratch_data_dir()
+
+from config import METADATA_READ_CHUNK_SIZE, METADATA_READ_CONCURRENCY
+from app.services.exif_service import _process_raw_items
+
+
+def run(chunks, process_chunk) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=METADATA_READ_CONCURRENCY) as threads:
+        list(threads.map(process_chunk, chunks))
+    return time.perf_counter() - started
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    chunk_count = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    records = synthetic_raw_records(chunk_count * METADATA_READ_CHUNK_SIZE)
+    chunks = [
+        records[i : i + METADATA_READ_CHUNK_SIZE]
+        for i in range(0, len(records), METADATA_READ_CHUNK_SIZE)
+    ]
+
+    in_process = min(run(chunks, _process_raw_items) for _ in range(3))
+    with ProcessPoolExecutor(max_workers=workers) as processes:
+        # Starts the workers before timing.
+        list(processes.map(_process_raw_items, chunks[:workers]))
+
+        def submit(chunk):
+            return processes.submit(_process_raw_items, chunk).result()
+
+        pooled = min(run(chunks, submit) for _ in range(3))
+
+    print(
+        f"{len(chunks)} chunks of {METADATA_READ_CHUNK_SIZE} records, "
+        f"{METADATA_READ_CONCURRENCY} submitting threads:"
+    )
+    print(
+        f"  in-process:          {in_process * 1000:7.1f} ms "
+        f"({in_process / len(chunks) * 1000:5.1f} ms per chunk)"
+    )
+    print(
+        f"  {workers:2d} worker(s):        {pooled * 1000:7.1f} ms "
+        f"({pooled / len(chunks) * 1000:5.1f} ms per chunk)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,88 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # The application assumes 'exiftool' is available in the system's PATH.
 EXIFTOOL_PATH = "exiftool"
 
+# Number of long-lived ExifTool processes ('-stay_open' mode) kept by the pool.
+# Each one is a separate Perl interpreter, so there is little gain beyond the
+# number of concurrent requests the server is expected to handle.
+EXIFTOOL_POOL_SIZE = 4
+
+# Number of per-file write commands sent to one ExifTool process in a single
+# '-execute'-separated stream when saving metadata for many files at once.
+EXIFTOOL_WRITE_BATCH_SIZE = 50
+
+# Maximum number of files whose processed metadata is kept in memory. Entries are
+# validated against the file's size and modification time on every lookup.
+METADATA_CACHE_SIZE = 20000
+
+# Large metadata reads are split into chunks of this many files. Chunks are read
+# concurrently on up to METADATA_READ_CONCURRENCY pooled ExifTool processes and
+# consolidated on METADATA_PROCESS_WORKERS processes (0 or 1 keeps it in-process).
+# Sending the records to another process usually costs more than consolidating
+# them, so the process pool is off by default; measure with
+# 'python -m benchmarks.metadata_process_pool' before enabling it.
+METADATA_READ_CHUNK_SIZE = 250
+METADATA_READ_CONCURRENCY = EXIFTOOL_POOL_SIZE
+METADATA_PROCESS_WORKERS = 0
+
+# SQLite catalog persisting processed metadata across sessions, and the number of
+# new or changed files read per batch when a folder is rescanned.
+METADATA_CATALOG_PATH = os.path.join(BASE_DIR, "metadata_catalog.sqlite3")
+CATALOG_RESCAN_BATCH_SIZE = 500
+
+# Read JPEG/TIFF metadata with the in-process EXIF/XMP parser instead of ExifTool.
+# Files it cannot reproduce exactly (RAW, maker notes, extended XMP, ...) still go
+# to ExifTool. Disabled by default; tests/test_fast_metadata_reader.py compares its
+# records with ExifTool's own reads when ExifTool is installed.
+METADATA_FAST_READER = False
+
+# On-disk cache for downscaled gallery thumbnails and its size cap in bytes.
+# The least recently used thumbnails are evicted once the cap is exceeded.
+THUMBNAIL_CACHE_DIR = os.path.join(BASE_DIR, "thumbnail_cache")
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Deepest folder level visited by a recursive gallery listing (1 = the folder itself).
+LISTING_MAX_DEPTH = 10
+
+# Background warm-up of metadata and thumbnails for an opened folder. Up to
+# PREFETCH_MAX_FILES files are processed by PREFETCH_WORKERS threads (0 disables
+# it), reading metadata in chunks of PREFETCH_METADATA_CHUNK_SIZE files and
+# rendering thumbnails at the size the gallery requests.
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_FILES = 2000
+PREFETCH_METADATA_CHUNK_SIZE = 50
+PREFETCH_THUMBNAIL_SIZE = 400
+
+# Watching the opened folder for external changes. Events are collected until
+# the folder has been quiet for WATCHER_DEBOUNCE_SECONDS. Without the optional
+# 'watchdog' package the folder is polled every WATCHER_POLL_INTERVAL seconds.
+# Switching folders waits up to WATCHER_STOP_TIMEOUT_SECONDS for the previous
+# watcher thread to exit.
+WATCHER_DEBOUNCE_SECONDS = 0.5
+WATCHER_POLL_INTERVAL = 2.0
+WATCHER_STOP_TIMEOUT_SECONDS = 5.0
+WATCHER_KEEPALIVE_SECONDS = 15
+
 # Paths to our data files.
 KEYWORDS_PATH = os.path.join(BASE_DIR, "keywords.json")
 LOCATIONS_PATH = os.path.join(BASE_DIR, "locations.json")
 SETTINGS_PATH = os.path.join(BASE_DIR, "settings.json")
 
+# The data files are kept in memory and written in the background. Changes made
+# within this many seconds are coalesced into one atomic write of the file.
+JSON_STORE_FLUSH_DELAY = 1.0
+
+# How often, at most, data files that may be edited by hand (settings, location
+# presets) are checked for external changes by comparing their mtime and size.
+JSON_STORE_RELOAD_INTERVAL = 1.0
+
+# Nearest-location-preset lookup by GPS coordinates: presets returned per
+# coordinate by default, the default and largest search radius in kilometers,
+# and the most coordinates accepted in one request.
+LOCATION_NEAREST_DEFAULT_K = 3
+LOCATION_NEAREST_DEFAULT_RADIUS_KM = 1.0
+LOCATION_NEAREST_MAX_RADIUS_KM = 20000.0
+LOCATION_NEAREST_MAX_COORDINATES = 10000
+
 # User agent for making requests to external services like Nominatim (geopy).
 # This is required by their fair use policy.
 GEOPY_USER_AGENT = "PhotoTagger/1.0"
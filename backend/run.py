@@ -1,6 +1,7 @@
 from app import create_app
 
-app = create_app()
-
+# Guarded so that worker processes started with 'spawn' (the default on Windows),
+# which import this module again, do not build a second application.
 if __name__ == "__main__":
+    app = create_app()
     app.run(debug=True, port=5000)
@@ -0,0 +1,83 @@
+import json
+import os
+import shutil
+import tempfile
+import pytest
+from PIL import Image
+import config
+
+# The services load their data files when first imported, so they are pointed at
+# a scratch directory before any test imports the application.
+_DATA_DIR = tempfile.mkdtemp(prefix="phototagger-tests-")
+config.KEYWORDS_PATH = os.path.join(_DATA_DIR, "keywords.json")
+config.LOCATIONS_PATH = os.path.join(_DATA_DIR, "locations.json")
+config.SETTINGS_PATH = os.path.join(_DATA_DIR, "settings.json")
+config.METADATA_CATALOG_PATH = os.path.join(_DATA_DIR, "metadata_catalog.sqlite3")
+config.THUMBNAIL_CACHE_DIR = os.path.join(_DATA_DIR, "thumbnail_cache")
+
+requires_exiftool = pytest.mark.skipif(
+    shutil.which(config.EXIFTOOL_PATH) is None, reason="ExifTool is not installed"
+)
+
+
+@pytest.fixture
+def jpeg(tmp_path):
+    """A small JPEG without metadata."""
+    path = str(tmp_path / "photo.jpg")
+    Image.new("RGB", (16, 16), "white").save(path, "JPEG")
+    return path
+
+
+class FakeExifTool:
+    """
+    Stands in for the ExifTool pool and records the commands it is given. Reads
+    answer with one JSON record per file argument: the given record plus the
+    tags written to that file. Writes are kept per inode, so they follow a file
+    that is renamed.
+    """
+
+    def __init__(self, record=None):
+        self.record = dict(record or {})
+        self.written = {}
+        self.reads = []
+        self.writes = []
+
+    @staticmethod
+    def _key(path):
+        return os.stat(path).st_ino if os.path.exists(path) else path
+
+    def execute(self, args, check=True):
+        self.reads.append(args)
+        paths = [arg for arg in args if not arg.startswith("-")]
+        records = [
+            {"SourceFile": path, **self.record, **self.written.get(self._key(path), {})}
+            for path in paths
+        ]
+        return json.dumps(records).encode("utf-8")
+
+    def execute_many(self, commands):
+        from app.services.exiftool_pool import ExifToolResult
+
+        for args in commands:
+            self.writes.append(args)
+            values = {}
+            for arg in args:
+                tag, separator, value = arg[1:].partition("=")
+                if arg.startswith("-") and separator:
+                    values.setdefault(tag, [])
+                    if value:
+                        values[tag].append(value)
+            tags = self.written.setdefault(self._key(args[-1]), {})
+            for tag, value in values.items():
+                tags[tag] = value[0] if len(value) == 1 else value
+        return [ExifToolResult(b"", "", 0) for _ in commands]
+
+
+@pytest.fixture
+def exiftool(monkeypatch):
+    """A FakeExifTool serving the metadata reads and writes."""
+    from app.services import exif_service
+
+    fake = FakeExifTool()
+    monkeypatch.setattr(exif_service, "exiftool_pool", fake)
+    return fake
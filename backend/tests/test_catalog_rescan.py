@@ -0,0 +1,38 @@
+import os
+import shutil
+from app.services import exif_service, file_listing_service
+from app.services.catalog_service import rescan_folder
+from app.services.metadata_catalog import metadata_catalog
+
+
+def _cataloged(paths):
+    return metadata_catalog.get_many(exif_service.get_metadata_fingerprints(paths))
+
+
+def test_entries_outside_the_listing_are_kept(jpeg, exiftool, monkeypatch):
+    folder = os.path.dirname(jpeg)
+    hidden = os.path.join(folder, ".previews", "photo.jpg")
+    deep = os.path.join(folder, "a", "b", "photo.jpg")
+    for path in (hidden, deep):
+        os.makedirs(os.path.dirname(path))
+        shutil.copy(jpeg, path)
+    exif_service.read_metadata_for_files([jpeg, hidden, deep])
+    monkeypatch.setattr(file_listing_service, "LISTING_MAX_DEPTH", 2)
+
+    counters = rescan_folder(folder, recursive=True)
+
+    assert (counters["files"], counters["removed"]) == (1, 0)
+    assert set(_cataloged([hidden, deep])) == {hidden, deep}
+
+
+def test_changed_file_served_from_the_cache_is_stored(jpeg, exiftool):
+    exiftool.record["XMP-dc:Title"] = "Harbour"
+    exif_service.read_metadata_for_files([jpeg])
+    metadata_catalog.invalidate([jpeg])
+    reads = len(exiftool.reads)
+
+    counters = rescan_folder(os.path.dirname(jpeg))
+
+    assert (counters["updated"], counters["failed"]) == (1, 0)
+    assert len(exiftool.reads) == reads
+    assert _cataloged([jpeg])[jpeg]["Title"]["value"] == "Harbour"
@@ -0,0 +1,51 @@
+import subprocess
+from app.services.exiftool_pool import ExifToolPool, ExifToolResult
+
+
+class _CrashingProcess:
+    """Completes `completed` commands of the first batch, then dies."""
+
+    def __init__(self, completed):
+        self.completed = completed
+        self.batches = []
+
+    def execute_many(self, commands, results=None):
+        results = [] if results is None else results
+        self.batches.append(commands)
+        for index, args in enumerate(commands):
+            if len(self.batches) == 1 and index == self.completed:
+                raise subprocess.CalledProcessError(-9, "exiftool", stderr="killed")
+            results.append(ExifToolResult(args[-1].encode(), "", 0))
+        return results
+
+
+def _pool_with(process):
+    pool = ExifToolPool(size=1)
+    pool._created = 1
+    pool._idle.put(process)
+    return pool
+
+
+def test_read_only_commands_are_retried_after_a_crash():
+    process = _CrashingProcess(completed=1)
+    commands = [["-json", "a.jpg"], ["-json", "b.jpg"], ["-json", "c.jpg"]]
+
+    results = _pool_with(process).execute_many(commands)
+
+    assert [result.stdout for result in results] == [b"a.jpg", b"b.jpg", b"c.jpg"]
+    assert process.batches[1] == commands[1:]
+
+
+def test_write_commands_are_not_sent_twice_after_a_crash():
+    process = _CrashingProcess(completed=1)
+    commands = [
+        ["-XMP-dc:Title=one", "a.jpg"],
+        ["-XMP-dc:Title=two", "b.jpg"],
+        ["-overwrite_original", "c.jpg"],
+    ]
+
+    results = _pool_with(process).execute_many(commands)
+
+    assert len(process.batches) == 1
+    assert [result.status for result in results] == [0, 1, 1]
+    assert "killed" in results[1].stderr
@@ -0,0 +1,162 @@
+import os
+import shutil
+import subprocess
+import pytest
+from PIL import Image
+import config
+from app.services import exif_service
+from app.services.exif_service import METADATA_PLAN, _read_raw_metadata
+from app.services.fast_metadata_reader import read_fast_metadata
+from tests.conftest import requires_exiftool
+
+XMP_PACKET = """<x:xmpmeta xmlns:x="adobe:ns:meta/">
+ <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+  <rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/"
+    xmlns:exif="http://ns.adobe.com/exif/1.0/">
+   {properties}
+  </rdf:Description>
+ </rdf:RDF>
+</x:xmpmeta>"""
+
+TITLE_AND_SUBJECT = """
+   <dc:title><rdf:Alt><rdf:li xml:lang="x-default">Harbour</rdf:li></rdf:Alt></dc:title>
+   <dc:subject><rdf:Bag><rdf:li>sea</rdf:li><rdf:li>boat</rdf:li></rdf:Bag></dc:subject>"""
+
+
+XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\0"
+EXTENDED_XMP_HEADER = b"http://ns.adobe.com/xmp/extension/\0"
+
+
+def _jpeg(path, exif=None, properties=None, header=XMP_HEADER):
+    """Writes a JPEG with the given EXIF tags {id: value} and XMP properties."""
+    image_exif = Image.Exif()
+    for tag_id, value in (exif or {}).items():
+        image_exif[tag_id] = value
+    Image.new("RGB", (16, 16), "white").save(path, "JPEG", exif=image_exif)
+    if properties is not None:
+        payload = header + XMP_PACKET.format(properties=properties).encode("utf-8")
+        with open(path, "rb") as f:
+            data = f.read()
+        segment = b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload
+        with open(path, "wb") as f:
+            f.write(data[:2] + segment + data[2:])
+    return path
+
+
+def _fast_read(path):
+    return read_fast_metadata(path, METADATA_PLAN.read_tags)
+
+
+def test_exif_and_xmp_tags_are_read(tmp_path):
+    path = _jpeg(
+        str(tmp_path / "photo.jpg"),
+        exif={0x013B: "Ann", 0x8298: "2021"},
+        properties=TITLE_AND_SUBJECT,
+    )
+
+    assert _fast_read(path) == {
+        "SourceFile": path,
+        "IFD0:Artist": "Ann",
+        "IFD0:Copyright": 2021,
+        "XMP-dc:Title": "Harbour",
+        "XMP-dc:Subject": ["sea", "boat"],
+    }
+
+
+@pytest.mark.parametrize(
+    "exif, properties, header",
+    [
+        # Canon:TimeZone lives in the maker notes.
+        ({0x010F: "Canon"}, None, XMP_HEADER),
+        # Composite GPS tags combine XMP-exif with the EXIF GPS IFD.
+        (None, "<exif:GPSLatitude>38,42.6N</exif:GPSLatitude>", XMP_HEADER),
+        # Extended XMP is split across several segments.
+        (None, TITLE_AND_SUBJECT, EXTENDED_XMP_HEADER),
+    ],
+    ids=["canon", "xmp-gps", "extended-xmp"],
+)
+def test_files_needing_exiftool_are_declined(tmp_path, exif, properties, header):
+    path = _jpeg(str(tmp_path / "photo.jpg"), exif, properties, header)
+
+    assert _fast_read(path) is None
+
+
+def test_raw_files_are_declined(jpeg):
+    raw = os.path.splitext(jpeg)[0] + ".cr2"
+    shutil.copy(jpeg, raw)
+
+    assert _fast_read(raw) is None
+
+
+def test_only_declined_files_are_sent_to_exiftool(tmp_path, exiftool, monkeypatch):
+    monkeypatch.setattr(exif_service, "METADATA_FAST_READER", True)
+    path = _jpeg(str(tmp_path / "photo.jpg"), properties=TITLE_AND_SUBJECT)
+    raw = str(tmp_path / "photo.cr2")
+    shutil.copy(path, raw)
+
+    records = _read_raw_metadata([path, raw])
+
+    assert [record["SourceFile"] for record in records] == [path, raw]
+    assert records[0]["XMP-dc:Title"] == "Harbour"
+    assert [args[-1] for args in exiftool.reads] == [raw]
+
+
+# Each case is written with ExifTool, whose own read is the expected record.
+PARITY_CASES = {
+    "no-metadata": [],
+    "dublin-core": [
+        "-XMP-dc:Title=Harbour at dusk",
+        "-XMP-dc:Subject=sea",
+        "-XMP-dc:Subject=boat",
+        "-XMP-dc:Creator=Ann",
+        "-XMP-dc:Rights=CC BY 4.0",
+        "-XMP-dc:Date=2021:05:04 10:20:30+02:00",
+    ],
+    "single-keyword": ["-XMP-dc:Subject=sea"],
+    "numbers-and-unicode": [
+        "-XMP-dc:Title=2021",
+        "-XMP-dc:Subject=007",
+        "-XMP-dc:Subject=Café – Zürich",
+    ],
+    "exif": [
+        "-IFD0:Artist=Ann",
+        "-IFD0:Copyright=Ann 2021",
+        "-ExifIFD:DateTimeOriginal=2021:05:04 10:20:30",
+        "-ExifIFD:CreateDate=2021:05:04 10:20:31",
+        "-ExifIFD:OffsetTimeOriginal=+02:00",
+    ],
+    "gps": [
+        "-GPS:GPSLatitude=33.8568",
+        "-GPS:GPSLatitudeRef=S",
+        "-GPS:GPSLongitude=151.2153",
+        "-GPS:GPSLongitudeRef=E",
+    ],
+    "locations": [
+        "-XMP-iptcExt:LocationCreatedCity=Lisbon",
+        "-XMP-iptcExt:LocationCreatedCountryCode=PT",
+        "-XMP-iptcExt:LocationCreatedGPSLatitude=38.7223",
+        "-XMP-iptcExt:LocationCreatedGPSLongitude=-9.1393",
+        "-XMP-iptcExt:LocationShownSublocation=Alfama",
+        "-XMP-iptcExt:LocationShownProvinceState=Lisboa",
+        "-XMP-iptcExt:LocationShownCountryName=Portugal",
+    ],
+}
+
+
+@requires_exiftool
+@pytest.mark.parametrize("extension", [".jpg", ".tif"])
+@pytest.mark.parametrize("case", sorted(PARITY_CASES))
+def test_record_matches_exiftool(tmp_path, case, extension):
+    path = str(tmp_path / f"photo{extension}")
+    Image.new("RGB", (16, 16), "white").save(path)
+    if PARITY_CASES[case]:
+        subprocess.run(
+            [config.EXIFTOOL_PATH, "-overwrite_original", *PARITY_CASES[case], path],
+            check=True,
+            capture_output=True,
+        )
+
+    record = _fast_read(path)
+
+    assert record is not None
+    assert record == _read_raw_metadata([path])[0]
@@ -0,0 +1,49 @@
+from app.services.folder_watcher import FolderWatcher
+
+
+def _observer_thread(watcher):
+    observer = watcher._observer
+    return getattr(observer, "_thread", observer)
+
+
+def test_switching_folders_waits_for_the_previous_observer(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    watcher = FolderWatcher()
+
+    watcher.watch(str(first))
+    previous = _observer_thread(watcher)
+    watcher.watch(str(second))
+    assert not previous.is_alive()
+
+    current = _observer_thread(watcher)
+    watcher.stop()
+    assert not current.is_alive()
+    assert watcher.folder is None
+
+
+def test_sidecar_event_is_reported_for_the_raw_of_a_pair(tmp_path, monkeypatch):
+    from app.services import folder_watcher
+
+    for name in ("IMG_1.JPG", "IMG_1.CR2"):
+        (tmp_path / name).write_bytes(b"")
+    monkeypatch.setattr(folder_watcher, "get_sidecar_extensions", lambda: {".cr2"})
+    watcher = FolderWatcher()
+
+    watcher.record("changed", str(tmp_path / "IMG_1.xmp"))
+    watcher._timer.cancel()
+
+    assert list(watcher._pending) == [str(tmp_path / "IMG_1.CR2")]
+
+
+def test_sidecar_of_a_file_not_in_sidecar_mode_is_ignored(tmp_path, monkeypatch):
+    from app.services import folder_watcher
+
+    (tmp_path / "IMG_1.jpg").write_bytes(b"")
+    monkeypatch.setattr(folder_watcher, "get_sidecar_extensions", lambda: {".cr2"})
+    watcher = FolderWatcher()
+
+    watcher.record("changed", str(tmp_path / "IMG_1.xmp"))
+
+    assert watcher._pending == {}
@@ -0,0 +1,34 @@
+import json
+import threading
+from app.services.json_store import JsonStore
+
+
+def test_flush_writes_without_holding_the_lock(tmp_path):
+    store = JsonStore(str(tmp_path / "data.json"), dict, flush_delay=60)
+    store.set({"a": 1})
+    writing, release = threading.Event(), threading.Event()
+    write = store._write
+
+    def slow_write(content):
+        writing.set()
+        release.wait(5)
+        write(content)
+
+    store._write = slow_write
+    flusher = threading.Thread(target=store.flush)
+    flusher.start()
+    assert writing.wait(5)
+
+    # Readers and writers get the lock while the file is being written.
+    assert store.lock.acquire(timeout=1)
+    store.get()["b"] = 2
+    store._mark_dirty()
+    store.lock.release()
+    release.set()
+    flusher.join(5)
+
+    assert store.stats()["pending"]
+    store._write = write
+    store.flush()
+    assert json.loads((tmp_path / "data.json").read_text()) == {"a": 1, "b": 2}
+    assert not store.stats()["pending"]
@@ -0,0 +1,78 @@
+import random
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.services import keyword_index
+from app.services.keyword_index import KeywordIndex
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+SYLLABLES = "ka lo mi ne ru sa ti vo be da".split()
+
+
+def _keywords(count, used=True):
+    rng = random.Random(3)
+    names = set()
+    keywords = []
+    while len(keywords) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if name in names:
+            continue
+        names.add(name)
+        last_used = None
+        if used and rng.random() < 0.4:
+            last_used = (NOW - timedelta(days=rng.randint(0, 14))).isoformat()
+        keywords.append(
+            {
+                "id": f"kw{len(keywords)}",
+                "name": name,
+                "useCount": rng.randint(0, 5) if used else 0,
+                "lastUsed": last_used,
+                "data": {"synonyms": [rng.choice(SYLLABLES) + name[::-1]]},
+            }
+        )
+    return keywords
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Recency settings with a threshold 7 days before a movable 'now'."""
+    state = {"now": NOW}
+    monkeypatch.setattr(
+        keyword_index,
+        "get_recency_settings",
+        lambda: (100, state["now"] - timedelta(days=7)),
+    )
+    return state
+
+
+def _ranked_everything(index, query, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(keyword_index, "RANKED_WALK_MIN_MATCHES", 10**9)
+        return index.search(query, 100)
+
+
+QUERIES = ["a", "k", "o", "ka", "mi", "ok", "sal"]
+
+
+# Without any usage all keywords share one score, which is served from the
+# matches rather than walked.
+@pytest.mark.parametrize("used", [True, False])
+def test_ranked_walk_matches_ranking_every_match(used, clock, monkeypatch):
+    keywords = _keywords(3000, used)
+    index = KeywordIndex(keywords)
+
+    for query in QUERIES:
+        assert index.search(query, 100) == _ranked_everything(index, query, monkeypatch)
+
+    # Usage changes, edits, removals and a lapsing recency bonus are followed.
+    for keyword in keywords[:200:7]:
+        keyword["useCount"] += 40
+        keyword["lastUsed"] = NOW.isoformat()
+        index.update_usage(keyword["id"])
+    # Renamed to the best match for 'ka', which it did not match before.
+    renamed = next(k for k in keywords[200:] if "ka" not in k["name"] + str(k["data"]))
+    index.add({**renamed, "name": "ka"})
+    index.remove(keywords[9]["id"])
+    clock["now"] = NOW + timedelta(days=3)
+
+    for query in QUERIES:
+        assert index.search(query, 100) == _ranked_everything(index, query, monkeypatch)
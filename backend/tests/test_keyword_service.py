@@ -0,0 +1,46 @@
+from app.services.keyword_service import KeywordService
+
+
+def _service(tmp_path):
+    service = KeywordService(str(tmp_path / "keywords.json"))
+    parent = service.add("Travel", {})
+    child = service.add("Beach", {"synonyms": ["Seaside"]})
+    return service, parent, child
+
+
+def test_parent_change_keeps_the_name_maps(tmp_path, monkeypatch):
+    service, parent, child = _service(tmp_path)
+    rebuilds = []
+    monkeypatch.setattr(service, "_rebuild_maps", lambda: rebuilds.append(1))
+
+    service.update(child["id"], {"name": "Beach", "data": {"parent": parent["id"]}})
+
+    assert rebuilds == []
+    assert service.find_by_name("seaside") is child
+    assert service.get_suggestions("bea")[0]["allTermsToAdd"] == [
+        "Beach",
+        "Seaside",
+        "Travel",
+    ]
+
+
+def test_renamed_keyword_is_found_by_its_new_names_only(tmp_path):
+    service, _, child = _service(tmp_path)
+
+    service.update(child["id"], {"name": "Coast", "data": {"synonyms": ["Shore"]}})
+
+    assert service.find_by_name("beach") is None
+    assert service.find_by_name("seaside") is None
+    assert service.find_by_name("shore") is child
+    assert [s["primaryName"] for s in service.get_suggestions("coa")] == ["Coast"]
+
+
+def test_used_keyword_moves_up_in_broad_suggestions(tmp_path):
+    service = KeywordService(str(tmp_path / "keywords.json"))
+    for number in range(300):
+        service.add(f"Album {number:03d}", {})
+    assert service.get_suggestions("a")[0]["primaryName"] == "Album 000"
+
+    service.track_usage(["Album 150"])
+
+    assert service.get_suggestions("a")[0]["primaryName"] == "Album 150"
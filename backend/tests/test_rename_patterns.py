@@ -0,0 +1,60 @@
+from app.services import rename_service
+from app.services.rename_service import generate_filename_from_pattern
+from tests.conftest import FakeExifTool
+
+
+def _use_exiftool(exiftool, monkeypatch, raw_record, tag_record):
+    """Fakes the '-G1 -n' read behind the catalog and the '-json -s' tag read."""
+    exiftool.record.update(raw_record)
+    tag_read = FakeExifTool(tag_record)
+    monkeypatch.setattr(rename_service, "exiftool_pool", tag_read)
+    return tag_read
+
+
+def test_default_pattern_uses_the_exif_date_and_title(jpeg, exiftool, monkeypatch):
+    tag_read = _use_exiftool(
+        exiftool,
+        monkeypatch,
+        {
+            "ExifIFD:DateTimeOriginal": "2021:05:04 10:20:30",
+            "XMP-dc:Date": "2021:05:04 11:00:00.123+02:00",
+            "XMP-dc:Title": "Beach Day",
+        },
+        {},
+    )
+
+    name, error = generate_filename_from_pattern(
+        jpeg, "${DateTimeOriginal:%Y%m%d_%H%M%S}_${Title}"
+    )
+
+    assert (name, error) == ("20210504_102030_BeachDay", None)
+    assert tag_read.reads == []
+
+
+def test_date_missing_from_the_exif_block_is_read_with_exiftool(
+    jpeg, exiftool, monkeypatch
+):
+    tag_read = _use_exiftool(
+        exiftool,
+        monkeypatch,
+        {"XMP-dc:Date": "2021:05:04 11:00:00"},
+        {"DateTimeOriginal": "2020:01:02 03:04:05"},
+    )
+
+    name, _ = generate_filename_from_pattern(jpeg, "${DateTimeOriginal:%Y%m%d}")
+
+    assert name == "20200102"
+    assert tag_read.reads[0][:3] == ["-json", "-s", "-DateTimeOriginal"]
+
+
+def test_other_tags_keep_the_exiftool_output(jpeg, exiftool, monkeypatch):
+    _use_exiftool(
+        exiftool,
+        monkeypatch,
+        {"XMP-dc:Rights": "Rights from XMP"},
+        {"Copyright": "(c) Jane Doe", "Keywords": ["sea", "sand"]},
+    )
+
+    name, _ = generate_filename_from_pattern(jpeg, "${Copyright}_${Keywords}")
+
+    assert name == "(c)JaneDoe_['sea','sand']"
@@ -0,0 +1,35 @@
+from app.services import exif_service
+from app.services.exif_service import build_exiftool_args, get_cached_metadata
+
+
+def test_unchanged_tags_are_skipped_against_the_server_read(jpeg, exiftool):
+    exiftool.record["XMP-dc:Title"] = "Harbour"
+    exif_service.read_metadata_for_files([jpeg])
+    current = get_cached_metadata([jpeg])[jpeg]
+
+    assert build_exiftool_args(current, {"Title": "Harbour"}, current) == []
+    assert build_exiftool_args(current, {"Title": "Dock"}, current) == [
+        "-XMP-dc:Title=Dock"
+    ]
+
+
+def test_stale_client_view_does_not_hide_a_change(jpeg, exiftool):
+    exiftool.record["XMP-dc:Title"] = "Changed elsewhere"
+    exif_service.read_metadata_for_files([jpeg])
+    stale_client_view = {"original": {"XMP-dc:Title": "Harbour"}}
+
+    args = build_exiftool_args(
+        stale_client_view, {"Title": "Harbour"}, get_cached_metadata([jpeg])[jpeg]
+    )
+
+    assert args == ["-XMP-dc:Title=Harbour"]
+
+
+def test_every_tag_is_written_without_a_server_read(jpeg):
+    exif_service.invalidate_metadata([jpeg])
+    client_view = {"original": {"XMP-dc:Title": "Harbour"}}
+
+    assert get_cached_metadata([jpeg]) == {}
+    assert build_exiftool_args(client_view, {"Title": "Harbour"}, None) == [
+        "-XMP-dc:Title=Harbour"
+    ]
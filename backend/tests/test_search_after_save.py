@@ -0,0 +1,75 @@
+import os
+from app.services import exif_service
+from app.services.search_service import search_index
+from tests.conftest import requires_exiftool
+
+
+def _keyword_hits(keyword):
+    return search_index.search(keyword_query=keyword)["results"]
+
+
+def test_invalidated_file_leaves_the_search_index(jpeg):
+    search_index.update(jpeg, {"Keywords": {"value": ["beach"]}})
+    assert jpeg in _keyword_hits("beach")
+
+    exif_service.invalidate_metadata([jpeg])
+
+    assert jpeg not in _keyword_hits("beach")
+
+
+def test_saved_keyword_is_searchable_right_after_the_save(jpeg, exiftool):
+    exif_service.read_metadata_for_files([jpeg])
+    assert jpeg not in _keyword_hits("sunset")
+
+    results = exif_service.run_exiftool_batch([["-XMP-dc:Subject=sunset", jpeg]])
+
+    assert results[0].status == 0
+    assert jpeg in _keyword_hits("sunset")
+
+
+@requires_exiftool
+def test_saved_keyword_is_searchable_with_exiftool(jpeg):
+    exif_service.read_metadata_for_files([jpeg])
+    assert jpeg not in _keyword_hits("lighthouse")
+
+    results = exif_service.run_exiftool_batch([["-XMP-dc:Subject=lighthouse", jpeg]])
+
+    assert results[0].status == 0
+    assert jpeg in _keyword_hits("lighthouse")
+    assert exif_service.read_metadata_for_files([jpeg])[0]["Keywords"]["value"] == [
+        "lighthouse"
+    ]
+
+
+def test_renamed_file_is_searchable_under_its_new_name(jpeg, exiftool, monkeypatch):
+    from app import create_app
+    from app.routes import rename
+
+    monkeypatch.setattr(
+        rename,
+        "generate_filename_from_pattern",
+        lambda path, pattern: ("renamed", None),
+    )
+    exif_service.run_exiftool_batch([["-XMP-dc:Subject=harbour", jpeg]])
+
+    response = (
+        create_app().test_client().post("/api/rename_files", json={"files": [jpeg]})
+    )
+
+    assert response.get_json()[0]["status"] == "Renamed"
+    new_path = os.path.join(os.path.dirname(jpeg), "renamed.jpg")
+    assert _keyword_hits("harbour") == [os.path.normpath(new_path)]
+
+
+def test_watcher_event_for_our_own_save_keeps_the_index(jpeg, exiftool):
+    from app.services.folder_watcher import FolderWatcher
+
+    exif_service.run_exiftool_batch([["-XMP-dc:Subject=sunset", jpeg]])
+    reads = len(exiftool.reads)
+
+    watcher = FolderWatcher()
+    watcher.record("changed", jpeg)
+    watcher._flush()
+
+    assert jpeg in _keyword_hits("sunset")
+    assert len(exiftool.reads) == reads
@@ -0,0 +1,67 @@
+import os
+from app.services.search_service import SearchIndex
+
+
+def _item(date, latitude=None, longitude=None):
+    item = {"DateTimeOriginal": {"value": date}}
+    if latitude is not None:
+        item["LatitudeCreated"] = {"value": latitude}
+        item["LongitudeCreated"] = {"value": longitude}
+    return item
+
+
+def _index(entries):
+    index = SearchIndex()
+    index._loaded = True  # Not seeded from the catalog.
+    index.update_many(entries)
+    return index
+
+
+def test_reindexed_document_is_found_by_its_new_date_only():
+    index = _index([("/p/a.jpg", _item("2020:01:01 10:00:00"))])
+
+    index.update("/p/a.jpg", _item("2021:06:01 10:00:00"))
+
+    assert index.search(date_from="2020-01-01", date_to="2020-12-31")["total"] == 0
+    assert index.search(date_from="2021-01-01", date_to="2021-12-31")["total"] == 1
+    assert index.stats()["dated"] == 1
+
+
+def test_reindexing_with_unchanged_values_keeps_one_entry():
+    index = _index([("/p/a.jpg", _item("2020:01:01 10:00:00", 45.0, 7.0))])
+
+    index.update("/p/a.jpg", _item("2020:01:01 10:00:00", 45.0, 7.0))
+    index.update("/p/a.jpg", _item("2020:01:01 10:00:00", 45.0, 7.0))
+
+    assert index.search(bbox=(44, 6, 46, 8))["total"] == 1
+    stats = index.stats()
+    assert (stats["documents"], stats["dated"], stats["geotagged"]) == (1, 1, 1)
+
+
+def test_removed_document_id_is_reused_with_the_same_date():
+    index = _index([("/p/a.jpg", _item("2020:01:01 10:00:00"))])
+
+    index.remove(["/p/a.jpg"])
+    index.update("/p/b.jpg", _item("2020:01:01 10:00:00"))
+
+    result = index.search(date_from="2020-01-01", date_to="2020-01-01")
+    assert result["results"] == [os.path.normpath("/p/b.jpg")]
+
+
+def test_pages_of_one_query_do_not_overlap():
+    # Paths are indexed out of order, so document ids do not follow them. The
+    # first pages are walked from the date index, the later ones sorted.
+    names = [f"/p/{(index * 7919) % 1000:04d}.jpg" for index in range(1000)]
+    index = _index([(name, _item("2020:01:01 10:00:00")) for name in names])
+    index.update_many([(f"/p/undated{i}.jpg", _item(None)) for i in range(20)])
+
+    pages = [
+        index.search(limit=100, offset=offset)["results"]
+        for offset in range(0, 1100, 100)
+    ]
+    paths = [path for page in pages for path in page]
+
+    assert len(paths) == len(set(paths)) == 1020
+    assert paths == sorted(map(os.path.normpath, names)) + sorted(
+        os.path.normpath(f"/p/undated{i}.jpg") for i in range(20)
+    )
@@ -0,0 +1,19 @@
+import os
+from app.services import exif_service
+
+
+def test_new_sidecar_is_seeded_once_per_batch(jpeg, exiftool, monkeypatch):
+    sidecar = os.path.splitext(jpeg)[0] + ".xmp"
+    monkeypatch.setattr(
+        exif_service, "get_sidecar_paths", lambda paths: {jpeg: sidecar}
+    )
+
+    results = exif_service.run_exiftool_batch(
+        [["-XMP-dc:Title=first", jpeg], ["-XMP-dc:Description=second", jpeg]]
+    )
+
+    seeds = [args for args in exiftool.writes if "-tagsFromFile" in args]
+    assert len(seeds) == 1
+    assert exiftool.writes.index(seeds[0]) == 0
+    assert [args[-1] for args in exiftool.writes] == [sidecar] * 3
+    assert [result.status for result in results] == [0, 0]
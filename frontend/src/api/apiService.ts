@@ -2,6 +2,7 @@ import {
   ApiError,
   AppSettings,
   EnrichedCoordinate,
+  FolderChange,
   GpsCoordinate,
   GpxMatchRequest,
   GpxMatchResult,
@@ -43,6 +44,23 @@ export const getImages = (folderPath: string): Promise<string[]> =>
     (response) => handleResponse<string[]>(response)
   );
 
+/**
+ * Subscribes to server-sent change events for a folder. The caller must close the
+ * returned EventSource when the folder is no longer shown.
+ */
+export const subscribeToFolderChanges = (
+  folderPath: string,
+  onChanges: (changes: FolderChange[]) => void
+): EventSource => {
+  const source = new EventSource(
+    `${API_BASE_URL}/events?folder=${encodeURIComponent(folderPath)}`
+  );
+  source.addEventListener("changes", (event) =>
+    onChanges(JSON.parse((event as MessageEvent).data))
+  );
+  return source;
+};
+
 export const getMetadataForFiles = (
   filePaths: string[]
 ): Promise<ImageFile[]> =>
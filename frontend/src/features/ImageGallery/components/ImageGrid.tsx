@@ -31,7 +31,7 @@ const ImageGrid: React.FC<ImageGridProps> = ({
         const isSelected = selectedImages.includes(imageName);
         const reportChecks = healthReportsMap[imageName];
         const fullPath = `${folderPath}\\${imageName}`;
-        const imageUrl = `http://localhost:5000/api/image_data?path=${encodeURIComponent(
+        const imageUrl = `http://localhost:5000/api/thumbnail?size=400&path=${encodeURIComponent(
           fullPath
         )}`;
 
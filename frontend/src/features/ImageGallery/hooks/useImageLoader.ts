@@ -1,7 +1,7 @@
 import { useState, useCallback, useEffect } from "react";
 import * as apiService from "api/apiService";
 import { useSettingsContext } from "context/SettingsContext";
-import { ApiError, ImageFile } from "types";
+import { ApiError, FolderChange, ImageFile } from "types";
 
 interface ImageData {
   folder: string;
@@ -106,6 +106,53 @@ export const useImageLoader = () => {
     }
   }, []);
 
+  /**
+   * Keeps the gallery in sync with changes made outside the app. Only the files
+   * named in the pushed events are removed or re-read, instead of reloading the
+   * whole folder.
+   */
+  useEffect(() => {
+    const folder = imageData.folder;
+    if (!folder) return;
+
+    const fileName = (path: string) => path.split(/[\\/]/).pop() || path;
+    const source = apiService.subscribeToFolderChanges(
+      folder,
+      async (changes: FolderChange[]) => {
+        const goneNames = new Set<string>();
+        const pathsToRead: string[] = [];
+        changes.forEach((change) => {
+          if (change.type === "removed") goneNames.add(fileName(change.path));
+          else pathsToRead.push(`${folder}\\${fileName(change.path)}`);
+          if (change.oldPath) goneNames.add(fileName(change.oldPath));
+        });
+
+        let readFiles: ImageFile[] = [];
+        try {
+          if (pathsToRead.length > 0) {
+            readFiles = await apiService.getMetadataForFiles(pathsToRead);
+          }
+        } catch (error) {
+          console.error("Failed to read changed files:", error);
+        }
+        const readFilesMap = new Map(readFiles.map((f) => [f.filename, f]));
+
+        setImageData((prevData) => {
+          if (prevData.folder !== folder) return prevData;
+          const files = prevData.files
+            .filter((file) => !goneNames.has(file.filename))
+            .map((file) => readFilesMap.get(file.filename) || file);
+          const known = new Set(files.map((file) => file.filename));
+          readFiles.forEach((file) => {
+            if (!known.has(file.filename)) files.push(file);
+          });
+          return { ...prevData, files };
+        });
+      }
+    );
+    return () => source.close();
+  }, [imageData.folder]);
+
   const forceReload = useCallback(() => {
     if (imageData.folder) {
       loadImages(imageData.folder);
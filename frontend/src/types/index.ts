@@ -147,6 +147,15 @@ export interface RenameFileResult {
   status: string;
 }
 
+/**
+ * A change to the opened folder, pushed by the backend's folder watcher.
+ */
+export interface FolderChange {
+  type: "added" | "changed" | "removed" | "renamed";
+  path: string;
+  oldPath?: string;
+}
+
 /**
  * A generic structure for API error responses.
  */
@@ -365,7 +374,9 @@ export interface AppSettings {
     extensionRules: ExtensionRule[];
   };
   powerUser: {
+    imageExtensions: string[];
     rawExtensions: string[];
+    xmpSidecarExtensions: string[];
     sorting: {
       recencyBonus: number;
       recencyDays: number;